@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for ReqNinja.
+
+Measures the wall-clock cost of ``import reqninja`` in fresh interpreters,
+plus the cost of the first request-path setup (building the default client),
+which is now deferred until first use.
+
+Usage:
+    python benchmarks/bench_import.py [--runs 20]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+IMPORT_ONLY = (
+    "import time; t = time.perf_counter(); import reqninja; "
+    "print(time.perf_counter() - t)"
+)
+
+IMPORT_AND_CLIENT = (
+    "import time; t = time.perf_counter(); import reqninja; "
+    "reqninja.client._get_default_client(); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def _measure(snippet: str, runs: int, home: str) -> list:
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    repo_root = Path(__file__).resolve().parent.parent
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", snippet],
+            cwd=str(repo_root),
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(float(out.stdout.strip()) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list) -> None:
+    print(
+        f"{label:<28} median {statistics.median(samples):7.2f}ms  "
+        f"min {min(samples):7.2f}ms  max {max(samples):7.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        _report("import reqninja", _measure(IMPORT_ONLY, args.runs, home))
+        _report(
+            "import + default client",
+            _measure(IMPORT_AND_CLIENT, args.runs, home),
+        )
+
+    print("\nFor a per-module breakdown run:")
+    print("  python -X importtime -c 'import reqninja' 2> importtime.log")
+
+
+if __name__ == "__main__":
+    main()
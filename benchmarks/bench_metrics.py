@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Metrics recording overhead for ReqNinja.
+
+Measures the cost of MetricsRegistry.record() from one thread and from
+many threads at once, where a shared lock would serialize recording.
+
+Usage:
+    python benchmarks/bench_metrics.py [--iterations 200000] [--threads 16]
+"""
+
+import argparse
+import threading
+import time
+
+from reqninja.metrics import MetricsRegistry
+
+
+def _record(registry: MetricsRegistry, n: int) -> None:
+    record = registry.record
+    for i in range(n):
+        record('prod', 'api.example.com', 'GET', 200, 12.5 + (i & 63), 0, 128, 2048)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+    n = args.iterations
+
+    registry = MetricsRegistry()
+    started = time.perf_counter()
+    _record(registry, n)
+    elapsed = time.perf_counter() - started
+    print(f"{'record(), 1 thread':<40} {elapsed / n * 1e6:8.2f} us/call")
+
+    registry = MetricsRegistry()
+    per_thread = n // args.threads
+    threads = [
+        threading.Thread(target=_record, args=(registry, per_thread))
+        for _ in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    total = per_thread * args.threads
+    label = f"record(), {args.threads} threads"
+    print(f"{label:<40} {elapsed / total * 1e6:8.2f} us/call (wall clock)")
+
+    started = time.perf_counter()
+    registry.to_prometheus()
+    print(f"{'to_prometheus()':<40} {(time.perf_counter() - started) * 1e3:8.2f} ms")
+    assert registry.snapshot()['totals']['requests'] == total
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Per-request profile resolution overhead for ReqNinja.
+
+Compares compiling a profile from scratch on every request (merging
+defaults, copying the profile and expanding environment variables, as
+every request used to do) against the cached resolution the client now
+uses, and reports the end-to-end cost of preparing a request.
+
+Usage:
+    python benchmarks/bench_profile_resolution.py [--iterations 100000]
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+from pathlib import Path
+
+import yaml
+
+from reqninja import Config, ReqNinjaClient
+
+
+CONFIG = {
+    'default_timeout': 30,
+    'default_headers': {'User-Agent': 'ReqNinja/1.0', 'Accept': 'application/json'},
+    'retry_policy': {'total': 3, 'backoff_factor': 0.5},
+    'profiles': {
+        'prod': {
+            'base_url': 'https://api.example.com',
+            'headers': {
+                'Authorization': 'Bearer ${BENCH_TOKEN}',
+                'X-Team': '${BENCH_TEAM}',
+            },
+            'auth': {'type': 'api_key', 'key': '${BENCH_KEY}'},
+            'retry_policy': {'total': 5},
+            'timeout': 10,
+        },
+    },
+}
+
+
+def _report(label: str, seconds: float, iterations: int) -> float:
+    per_call_us = seconds / iterations * 1e6
+    print(f"{label:<40} {per_call_us:8.2f} us/call")
+    return per_call_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    os.environ.update(BENCH_TOKEN='token', BENCH_TEAM='perf', BENCH_KEY='key')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / 'config.yml'
+        path.write_text(yaml.dump(CONFIG))
+        config = Config(path)
+        client = ReqNinjaClient(config)
+
+        uncached = _report(
+            "uncached resolution (previous behaviour)",
+            timeit.timeit(lambda: config._build_resolved('prod'), number=n), n
+        )
+        cached = _report(
+            "cached resolve_profile()",
+            timeit.timeit(lambda: config.resolve_profile('prod'), number=n), n
+        )
+        _report(
+            "client._prepare_request() end to end",
+            timeit.timeit(
+                lambda: client._prepare_request('/users/1', profile='prod'), number=n
+            ),
+            n
+        )
+        print(f"\nResolution speedup: {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
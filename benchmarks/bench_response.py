@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Per-response overhead of ReqNinjaResponse.
+
+Measures memory allocated per wrapped response with tracemalloc, the
+time to create one, and the cost of reading common fields, which batch
+jobs do for every response.
+
+Usage:
+    python benchmarks/bench_response.py [--responses 100000]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from reqninja.response import ReqNinjaResponse
+from reqninja.timing import PhaseTimings
+
+
+def _raw() -> requests.Response:
+    raw = requests.Response()
+    raw.status_code = 200
+    raw.reason = 'OK'
+    raw.url = 'https://api.example.com/items/1'
+    raw.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+    raw.encoding = 'utf-8'
+    raw._content = b'{"id": 1, "name": "ninja", "tags": ["a", "b"]}'
+    return raw
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--responses", type=int, default=100000)
+    args = parser.parse_args()
+    n = args.responses
+
+    raw = _raw()
+    timings = PhaseTimings(total_ms=12.5)
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = [ReqNinjaResponse(raw, 0.0, 0.0125, timings) for _ in range(n)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The list itself holds one pointer per response
+    per_response = (after - before) / n - 8
+    print(f"{'allocated per response':<40} {per_response:8.1f} bytes")
+    del kept
+
+    started = time.perf_counter()
+    for _ in range(n):
+        ReqNinjaResponse(raw, 0.0, 0.0125, timings)
+    elapsed = time.perf_counter() - started
+    print(f"{'create':<40} {elapsed / n * 1e9:8.1f} ns/response")
+
+    response = ReqNinjaResponse(raw, 0.0, 0.0125, timings)
+    started = time.perf_counter()
+    for _ in range(n):
+        response.status_code
+        response.headers
+        response.url
+    elapsed = time.perf_counter() - started
+    print(f"{'status_code + headers + url':<40} {elapsed / n * 1e9:8.1f} ns/response")
+
+    started = time.perf_counter()
+    for _ in range(n):
+        response.json()
+    elapsed = time.perf_counter() - started
+    print(f"{'json(), repeated':<40} {elapsed / n * 1e9:8.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
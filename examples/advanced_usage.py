@@ -94,7 +94,7 @@ def example_authentication():
 
 
 def example_batch_requests():
-    """Example of making multiple requests."""
+    """Example of making multiple requests concurrently."""
     print("=== Batch Requests Example ===")
     
     client = ReqNinjaClient()
@@ -104,17 +104,13 @@ def example_batch_requests():
         "https://jsonplaceholder.typicode.com/posts/3"
     ]
     
-    responses = []
-    total_time = 0
+    run = client.map("GET", urls, concurrency=3)
+    for response in run:
+        print(f"✓ {response.url} - {response.status_code} ({response.elapsed_ms:.2f}ms)")
     
-    for url in urls:
-        response = client.get(url)
-        responses.append(response)
-        total_time += response.elapsed_ms
-        print(f"✓ {url} - {response.status_code} ({response.elapsed_ms:.2f}ms)")
-    
-    print(f"\nCompleted {len(responses)} requests in {total_time:.2f}ms total")
-    print(f"Average response time: {total_time/len(responses):.2f}ms")
+    stats = run.stats.to_dict()
+    print(f"\nCompleted {stats['total']} requests in {stats['elapsed_seconds'] * 1000:.2f}ms")
+    print(f"p50 latency: {stats['latency_ms']['p50']:.2f}ms")
     print()
 
 
@@ -8,8 +8,11 @@ from .client import (
     get, post, put, delete, patch, head, options, request, ReqNinjaClient
 )
 from .config import Config
+from .auth import AuthScheme, register_auth_scheme
 from .response import ReqNinjaResponse
-from .exceptions import ReqNinjaError, ConfigError, AuthenticationError
+from .exceptions import (
+    ReqNinjaError, ConfigError, AuthenticationError, BatchError, CircuitOpenError
+)
 
 __all__ = [
     "get",
@@ -21,13 +24,36 @@ __all__ = [
     "options",
     "request",
     "ReqNinjaClient",
+    "AsyncReqNinjaClient",
     "Config",
+    "AuthScheme",
+    "register_auth_scheme",
     "ReqNinjaResponse",
+    "RequestSpec",
     "ReqNinjaError",
     "ConfigError",
     "AuthenticationError",
+    "BatchError",
+    "CircuitOpenError",
 ]
 
+
+# Exports whose modules pull in asyncio, httpx or thread pools are loaded on
+# first access so that `import reqninja` stays cheap.
+_LAZY_EXPORTS = {
+    "AsyncReqNinjaClient": ".async_client",
+    "RequestSpec": ".batch",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Version will be written by setuptools_scm
 try:
     from ._version import version as __version__
@@ -0,0 +1,378 @@
+"""Asyncio HTTP client for ReqNinja, backed by httpx."""
+
+import asyncio
+import time
+from datetime import timedelta
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .client import _BaseClient
+from .config import Config
+from .exceptions import CircuitOpenError, ReqNinjaError
+from .hooks import RequestContext
+from .response import ReqNinjaResponse
+from .retry import RetryState
+from .timing import TimingRecorder
+from .upload import aiter_body, body_position, is_replayable
+
+if TYPE_CHECKING:
+    from .metrics import MetricsRegistry
+
+
+def _import_httpx():
+    """Import httpx, raising a helpful error when it is not installed."""
+    try:
+        import httpx
+    except ImportError:
+        raise ReqNinjaError(
+            "AsyncReqNinjaClient requires httpx. "
+            "Install it with: pip install 'reqninja[async]'"
+        )
+    return httpx
+
+
+def _trace_into(recorder: TimingRecorder):
+    """Build an httpx ``trace`` extension that feeds a TimingRecorder.
+
+    httpcore resolves DNS inside its TCP connect, so DNS is reported as
+    part of the connect phase.
+    """
+    started: Dict[str, int] = {}
+
+    async def trace(event: str, info: Dict[str, Any]) -> None:
+        now = perf_counter_ns()
+        if event.endswith('.started'):
+            started[event[: -len('.started')]] = now
+        if event == 'connection.connect_tcp.complete':
+            recorder.connect_ns += now - started.get('connection.connect_tcp', now)
+            recorder.new_connections += 1
+        elif event == 'connection.start_tls.complete':
+            recorder.tls_ns += now - started.get('connection.start_tls', now)
+        elif event.endswith('.send_request_headers.started'):
+            recorder.send_ns = now
+            recorder.headers_ns = None
+        elif event.endswith('.receive_response_headers.complete'):
+            recorder.headers_ns = now
+
+    return trace
+
+
+def _to_requests_response(response: Any, elapsed: float) -> requests.Response:
+    """Convert an ``httpx.Response`` into a ``requests.Response``."""
+    prepared = requests.PreparedRequest()
+    prepared.method = response.request.method
+    prepared.url = str(response.request.url)
+    prepared.headers = CaseInsensitiveDict(response.request.headers)
+    prepared.body = response.request.content or None
+
+    result = requests.Response()
+    result.status_code = response.status_code
+    result.reason = response.reason_phrase
+    result.headers = CaseInsensitiveDict(response.headers)
+    result.url = str(response.url)
+    result.encoding = response.charset_encoding
+    result.elapsed = timedelta(seconds=elapsed)
+    result.request = prepared
+    result._content = response.content
+    return result
+
+
+class AsyncReqNinjaClient(_BaseClient):
+    """Asyncio HTTP client with the same profile, auth and retry semantics
+    as :class:`ReqNinjaClient`.
+
+    All requests share one keep-alive connection pool. At most
+    ``max_concurrency`` requests are on the wire at any time; further
+    callers wait for a free slot, so thousands of tasks can be gathered
+    from a single thread.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        max_concurrency: int = 100,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
+        metrics: Union[bool, "MetricsRegistry"] = False,
+        **client_kwargs,
+    ):
+        super().__init__(config, metrics)
+        httpx = _import_httpx()
+        self._httpx = httpx
+        self.max_concurrency = max_concurrency
+        limits = httpx.Limits(
+            max_connections=max_concurrency,
+            max_keepalive_connections=max_keepalive_connections or max_concurrency,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client = httpx.AsyncClient(
+            limits=limits, http2=http2, follow_redirects=True, **client_kwargs
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncReqNinjaClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        await self._client.aclose()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        profile: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        auth: Optional[Dict[str, str]] = None,
+        timeout: Optional[int] = None,
+        retries: Optional[int] = None,
+        **kwargs,
+    ) -> ReqNinjaResponse:
+        """Make an HTTP request with enhanced features.
+
+        As with the sync client, ``data`` may be a file object or an iterator
+        of bytes; it is streamed, and seekable files are rewound for retries.
+        """
+
+        data = kwargs.get('data')
+        config, final_url, final_headers, final_timeout = self._prepare_request(
+            url,
+            profile,
+            headers,
+            auth,
+            timeout,
+            method,
+            data,
+            kwargs.get('json'),
+            kwargs.get('params'),
+        )
+
+        if not is_replayable(data):
+            # A one-shot stream would be resent empty on retry
+            retries = 0
+        # Retries and re-authentication rewind file bodies to here
+        position = body_position(data)
+        policy = self._retry_policy(config, retries)
+
+        method = method.upper()
+        context = None
+        if self.hooks.active:
+            context = RequestContext(method, final_url, final_headers, profile, kwargs)
+            self.hooks.before_request(context)
+            final_url, final_headers = context.url, context.headers
+        request_kwargs = self._translate_kwargs(kwargs)
+        if request_kwargs.get('params'):
+            # Send exactly the query string a signing scheme signed; httpx
+            # encodes params differently from requests
+            final_url = self._url_with_params(final_url, request_kwargs.pop('params'))
+        streamed = data is not None and not isinstance(
+            data, (str, bytes, bytearray, memoryview, Mapping, list, tuple)
+        )
+        if streamed:
+            # httpx only streams async iterables from an AsyncClient
+            del request_kwargs['data']
+            if position is not None and 'Content-Length' not in final_headers:
+                final_headers = final_headers.with_layer(
+                    {'Content-Length': str(requests.utils.super_len(data))}
+                )
+        # httpx has no notion of None meaning "drop this header"
+        send_headers = [(k, v) for k, v in final_headers.items() if v is not None]
+        semaphore = self._get_semaphore()
+
+        scheme = self._auth_scheme(config, auth)
+        reauthenticate = (
+            scheme is not None and scheme.refreshable and is_replayable(data)
+        )
+
+        breaker = self._circuit_breaker(config, final_url)
+        limiter = self._rate_limiter(config)
+        if breaker is not None:
+            try:
+                breaker.check()
+            except CircuitOpenError as e:
+                if context is not None:
+                    self.hooks.on_error(context, e)
+                raise
+
+        budget = self._retry_budget(config, final_url) if policy.total else None
+        state = RetryState(policy, method, budget)
+        start_time = time.time()
+        started_ns = perf_counter_ns()
+        recorder = TimingRecorder()
+        extensions = {'trace': _trace_into(recorder)}
+        held = breaker is not None
+        try:
+            while True:
+                if position is not None:
+                    data.seek(position)
+                if streamed:
+                    request_kwargs['content'] = aiter_body(data)
+                state.begin()
+                recorder.attempts = len(state.attempts)
+                response = None
+                error = None
+                if limiter is not None:
+                    queued = perf_counter_ns()
+                    await limiter.acquire_async()
+                    recorder.rate_limit_wait_ns += perf_counter_ns() - queued
+                try:
+                    try:
+                        async with semaphore:
+                            response = await self._client.request(
+                                method,
+                                final_url,
+                                headers=send_headers,
+                                timeout=final_timeout,
+                                extensions=extensions,
+                                **request_kwargs,
+                            )
+                    finally:
+                        if limiter is not None:
+                            limiter.release_async()
+                except self._httpx.HTTPError as e:
+                    error = e
+                    delay = state.finish(
+                        error=e,
+                        connect_error=isinstance(
+                            e, (self._httpx.ConnectError, self._httpx.ConnectTimeout)
+                        ),
+                    )
+                    if breaker is not None:
+                        breaker.record(None, state.attempts[-1].latency_ms, error=True)
+                        if delay is not None and not breaker.allow():
+                            delay = None
+                        held = delay is not None
+                    if delay is None:
+                        if self.metrics_registry is not None:
+                            self._record_metrics(
+                                config,
+                                method,
+                                final_url,
+                                None,
+                                (perf_counter_ns() - started_ns) / 1e6,
+                            )
+                        failure = ReqNinjaError(f"Request failed: {e}")
+                        if context is not None:
+                            self.hooks.on_error(context, failure)
+                        raise failure
+                else:
+                    delay = state.finish(response.status_code, response.headers)
+                    if limiter is not None:
+                        limiter.update(response.status_code, response.headers)
+                    if breaker is not None:
+                        breaker.record(
+                            response.status_code, state.attempts[-1].latency_ms
+                        )
+                        if delay is not None and not breaker.allow():
+                            # The circuit opened meanwhile: keep this response
+                            delay = None
+                        held = delay is not None
+                    if response.status_code == 401 and reauthenticate:
+                        # Expired or revoked token: refresh once (off the event
+                        # loop, the token endpoint is called synchronously)
+                        reauthenticate = False
+                        fresh = await asyncio.get_running_loop().run_in_executor(
+                            None, scheme.refresh, final_headers
+                        )
+                        # The re-sent request needs a call of its own
+                        if fresh is not None and (
+                            held or breaker is None or breaker.allow()
+                        ):
+                            held = breaker is not None
+                            await response.aclose()
+                            final_headers = final_headers.with_layer(fresh)
+                            send_headers = [
+                                (k, v)
+                                for k, v in final_headers.items()
+                                if v is not None
+                            ]
+                            continue
+                    if delay is None:
+                        break
+                    await response.aclose()
+
+                if context is not None:
+                    status = response.status_code if response is not None else None
+                    self.hooks.on_retry(context, len(state.attempts), status, error)
+                if delay:
+                    slept = perf_counter_ns()
+                    await asyncio.sleep(delay)
+                    recorder.retry_wait_ns += perf_counter_ns() - slept
+        finally:
+            if held:
+                # Ended without an outcome (cancelled, a bad argument)
+                breaker.release()
+
+        timings = recorder.finish()
+        timings.dns_ms = None
+        end_time = time.time()
+
+        result = ReqNinjaResponse(
+            _to_requests_response(response, timings.total_ms / 1000),
+            start_time,
+            end_time,
+            timings,
+            state.attempts,
+        )
+        if self.metrics_registry is not None:
+            self._record_metrics(config, method, final_url, result, timings.total_ms)
+        if context is not None:
+            result = self.hooks.after_response(context, result)
+        return result
+
+    def _translate_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Map requests-style keyword arguments onto httpx ones."""
+        if kwargs.get('stream'):
+            raise ReqNinjaError(
+                "stream=True is not supported by the async client; "
+                "use the sync client to stream response bodies"
+            )
+        kwargs = dict(kwargs)
+        kwargs.pop('stream', None)
+        data = kwargs.get('data')
+        if isinstance(data, (str, bytes)):
+            kwargs['content'] = kwargs.pop('data')
+        if 'allow_redirects' in kwargs:
+            kwargs['follow_redirects'] = kwargs.pop('allow_redirects')
+        return kwargs
+
+    async def get(self, url: str, **kwargs) -> ReqNinjaResponse:
+        """Make a GET request."""
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> ReqNinjaResponse:
+        """Make a POST request."""
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> ReqNinjaResponse:
+        """Make a PUT request."""
+        return await self.request('PUT', url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> ReqNinjaResponse:
+        """Make a DELETE request."""
+        return await self.request('DELETE', url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> ReqNinjaResponse:
+        """Make a PATCH request."""
+        return await self.request('PATCH', url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> ReqNinjaResponse:
+        """Make a HEAD request."""
+        return await self.request('HEAD', url, **kwargs)
+
+    async def options(self, url: str, **kwargs) -> ReqNinjaResponse:
+        """Make an OPTIONS request."""
+        return await self.request('OPTIONS', url, **kwargs)
@@ -1,39 +1,76 @@
 """Authentication handling for ReqNinja."""
 
 import base64
-from typing import Dict, Any, Optional
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Mapping, Optional, Type
+from urllib.parse import urlsplit
 from .exceptions import AuthenticationError
 
+if TYPE_CHECKING:
+    from .oauth2 import ClientCredentialsTokenSource
 
-class AuthHandler:
-    """Handles various authentication methods."""
+
+# Distinct auth configs whose schemes are kept; old profile versions age out
+MAX_CACHED_SCHEMES = 256
+
+
+class AuthScheme:
+    """Base class for authentication schemes.
     
-    def get_auth_headers(self, auth_config: Dict[str, Any]) -> Dict[str, str]:
-        """Get authentication headers based on configuration."""
-        if not auth_config:
-            return {}
-        
-        auth_type = auth_config.get('type', '').lower()
-        
-        if auth_type == 'bearer':
-            return self._bearer_auth(auth_config)
-        elif auth_type == 'basic':
-            return self._basic_auth(auth_config)
-        elif auth_type == 'api_key':
-            return self._api_key_auth(auth_config)
-        else:
-            raise AuthenticationError(f"Unsupported auth type: {auth_type}")
+    A scheme is built once per distinct auth config and then reused for
+    every request with that config, so validation, encoding and key setup
+    belong in ``__init__``. Static schemes set :attr:`headers` there and
+    those headers are baked into the profile's precomputed header layers.
+    Schemes whose headers depend on the request or on time set
+    ``per_request = True`` and override :meth:`sign`, which runs on each
+    request.
+    """
+    
+    # True when sign() must run for every request
+    per_request = False
+    # True when refresh() can recover from a 401
+    refreshable = False
+    
+    def __init__(self, config: Mapping[str, Any]):
+        self.config = config
+        self.headers: Mapping[str, str] = {}
+    
+    def sign(
+        self,
+        method: str,
+        url: str,
+        data: Any = None,
+        json: Any = None
+    ) -> Mapping[str, str]:
+        """Auth headers for one request; static schemes return :attr:`headers`."""
+        return self.headers
+    
+    def refresh(self, sent_headers: Mapping[str, Optional[str]]) -> Optional[Mapping[str, str]]:
+        """Fresh headers after a 401, or None if a retry would not help."""
+        return None
+
+
+class BearerAuth(AuthScheme):
+    """``Authorization: Bearer <token>``."""
     
-    def _bearer_auth(self, config: Dict[str, Any]) -> Dict[str, str]:
-        """Handle Bearer token authentication."""
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
         token = config.get('token')
         if not token:
             raise AuthenticationError("Bearer token is required")
         
-        return {'Authorization': f'Bearer {token}'}
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+
+class BasicAuth(AuthScheme):
+    """HTTP Basic authentication."""
     
-    def _basic_auth(self, config: Dict[str, Any]) -> Dict[str, str]:
-        """Handle Basic authentication."""
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
         username = config.get('username')
         password = config.get('password', '')
         
@@ -43,17 +80,220 @@ class AuthHandler:
         credentials = f"{username}:{password}"
         encoded_credentials = base64.b64encode(credentials.encode()).decode()
         
-        return {'Authorization': f'Basic {encoded_credentials}'}
+        self.headers = {'Authorization': f'Basic {encoded_credentials}'}
+
+
+class ApiKeyAuth(AuthScheme):
+    """An API key sent in a header (``X-API-Key`` by default)."""
     
-    def _api_key_auth(self, config: Dict[str, Any]) -> Dict[str, str]:
-        """Handle API key authentication."""
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
         key = config.get('key')
         header_name = config.get('header', 'X-API-Key')
         
         if not key:
             raise AuthenticationError("API key is required")
         
-        return {header_name: key}
+        self.headers = {header_name: key}
+
+
+class OAuth2Auth(AuthScheme):
+    """OAuth2 client-credentials bearer tokens, refreshed as they expire."""
+    
+    per_request = True
+    refreshable = True
+    
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
+        from .oauth2 import ClientCredentialsTokenSource
+        
+        self.source: "ClientCredentialsTokenSource" = ClientCredentialsTokenSource.from_config(config)
+    
+    def sign(self, method: str, url: str, data: Any = None, json: Any = None) -> Mapping[str, str]:
+        return {'Authorization': f'Bearer {self.source.token()}'}
+    
+    def refresh(self, sent_headers: Mapping[str, Optional[str]]) -> Optional[Mapping[str, str]]:
+        # Only tokens issued by ReqNinja are refreshed, so an Authorization
+        # header set explicitly by the caller is left alone
+        sent = sent_headers.get('Authorization') or ''
+        if not sent.startswith('Bearer '):
+            return None
+        rejected = sent[len('Bearer '):]
+        if not self.source.issued(rejected):
+            return None
+        return {'Authorization': f'Bearer {self.source.invalidate(rejected)}'}
+
+
+class HmacAuth(AuthScheme):
+    """HMAC request signing.
+    
+    Each request carries::
+        
+        Authorization: HMAC-SHA256 keyId="<key_id>", ts=<unix time>, signature=<hex>
+    
+    where the signature is the HMAC of ``METHOD\\npath?query\\nts\\nsha256(body)``.
+    Bodies that are not bytes, str or ``json=`` (files, iterators, forms)
+    are signed as ``UNSIGNED-PAYLOAD``. The keyed HMAC state and the
+    header prefix are computed once; each request only copies the state
+    and hashes its own string.
+    
+    Config: ``key_id``, ``secret``, optional ``algorithm`` (``sha256``)
+    and ``header`` (``Authorization``).
+    """
+    
+    per_request = True
+    
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
+        key_id = config.get('key_id')
+        secret = config.get('secret')
+        if not key_id or not secret:
+            raise AuthenticationError("HMAC auth requires key_id and secret")
+        algorithm = str(config.get('algorithm', 'sha256')).lower()
+        if algorithm not in hashlib.algorithms_available:
+            raise AuthenticationError(f"Unsupported HMAC algorithm: {algorithm}")
+        
+        self.header_name = config.get('header', 'Authorization')
+        self._keyed = hmac.new(str(secret).encode('utf-8'), digestmod=algorithm)
+        self._prefix = f'HMAC-{algorithm.upper()} keyId="{key_id}", ts='
+        self._empty_body_hash = hashlib.sha256(b'').hexdigest()
+    
+    def sign(self, method: str, url: str, data: Any = None, json: Any = None) -> Mapping[str, str]:
+        parts = urlsplit(url)
+        target = f'{parts.path or "/"}?{parts.query}' if parts.query else (parts.path or '/')
+        timestamp = str(int(time.time()))
+        mac = self._keyed.copy()
+        mac.update(
+            f'{method.upper()}\n{target}\n{timestamp}\n{self._body_hash(data, json)}'.encode('utf-8')
+        )
+        return {self.header_name: f'{self._prefix}{timestamp}, signature={mac.hexdigest()}'}
+    
+    def _body_hash(self, data: Any, json_body: Any) -> str:
+        if data is None and json_body is not None:
+            import json
+            
+            # Matches how requests serializes json=
+            data = json.dumps(json_body, allow_nan=False)
+        if data is None:
+            return self._empty_body_hash
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return hashlib.sha256(data).hexdigest()
+        return 'UNSIGNED-PAYLOAD'
+
+
+_AUTH_SCHEMES: Dict[str, Type[AuthScheme]] = {
+    'bearer': BearerAuth,
+    'basic': BasicAuth,
+    'api_key': ApiKeyAuth,
+    'oauth2': OAuth2Auth,
+    'hmac': HmacAuth,
+}
+
+
+def register_auth_scheme(name: str, scheme: Type[AuthScheme]) -> None:
+    """Make ``scheme`` available as ``auth: {type: <name>, ...}``."""
+    if not (isinstance(scheme, type) and issubclass(scheme, AuthScheme)):
+        raise TypeError("Auth schemes must subclass AuthScheme")
+    _AUTH_SCHEMES[name.lower()] = scheme
+
+
+def config_key(data: Any) -> Hashable:
+    """Hashable, order-independent key for an auth config."""
+    if isinstance(data, Mapping):
+        return tuple(sorted((str(k), config_key(v)) for k, v in data.items()))
+    if isinstance(data, (list, tuple)):
+        return tuple(config_key(item) for item in data)
+    return data if isinstance(data, Hashable) else repr(data)
+
+
+class AuthHandler:
+    """Handles various authentication methods.
+    
+    Schemes are memoized by the content of their auth config, so each
+    distinct config is validated and encoded once. Profile auth is
+    resolved by :class:`Config` with environment variables expanded; when
+    the config file or a referenced variable changes the new values form
+    a new key, and stale schemes age out of the bounded cache.
+    """
+    
+    def __init__(self, max_cached: int = MAX_CACHED_SCHEMES):
+        self.max_cached = max_cached
+        self._schemes: "OrderedDict[Hashable, AuthScheme]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def scheme(
+        self,
+        auth_config: Optional[Mapping[str, Any]],
+        key: Optional[Hashable] = None
+    ) -> Optional[AuthScheme]:
+        """The shared scheme for ``auth_config``, or None without auth.
+        
+        ``key`` is ``config_key(auth_config)`` if the caller already has it.
+        """
+        if not auth_config:
+            return None
+        if key is None:
+            key = config_key(auth_config)
+        with self._lock:
+            scheme = self._schemes.get(key)
+            if scheme is not None:
+                self._schemes.move_to_end(key)
+                return scheme
+        
+        auth_type = str(auth_config.get('type', '')).lower()
+        scheme_class = _AUTH_SCHEMES.get(auth_type)
+        if scheme_class is None:
+            raise AuthenticationError(f"Unsupported auth type: {auth_type}")
+        scheme = scheme_class(auth_config)
+        
+        with self._lock:
+            # Another thread may have built one meanwhile; keep a single instance
+            scheme = self._schemes.setdefault(key, scheme)
+            while len(self._schemes) > self.max_cached:
+                self._schemes.popitem(last=False)
+        return scheme
+    
+    def invalidate(self) -> None:
+        """Forget every memoized scheme (and any cached OAuth2 tokens)."""
+        with self._lock:
+            self._schemes.clear()
+    
+    def get_auth_headers(
+        self,
+        auth_config: Optional[Mapping[str, Any]],
+        method: str = 'GET',
+        url: str = '',
+        data: Any = None,
+        json: Any = None
+    ) -> Mapping[str, str]:
+        """Get authentication headers based on configuration.
+        
+        The returned mapping may be shared between requests; do not modify it.
+        """
+        scheme = self.scheme(auth_config)
+        if scheme is None:
+            return {}
+        return scheme.sign(method, url, data, json)
+    
+    def token_source(self, auth_config: Mapping[str, Any]) -> "ClientCredentialsTokenSource":
+        """The shared token source for an oauth2 auth config."""
+        scheme = self.scheme(auth_config)
+        if not isinstance(scheme, OAuth2Auth):
+            raise AuthenticationError("Token sources exist only for oauth2 auth")
+        return scheme.source
+    
+    def refresh_auth_headers(
+        self,
+        auth_config: Optional[Mapping[str, Any]],
+        sent_headers: Mapping[str, Optional[str]]
+    ) -> Optional[Mapping[str, str]]:
+        """Fresh auth headers after a 401, or None if a retry would not help."""
+        scheme = self.scheme(auth_config)
+        if scheme is None or not scheme.refreshable:
+            return None
+        return scheme.refresh(sent_headers)
 
 
 def parse_auth_string(auth_string: str) -> Dict[str, Any]:
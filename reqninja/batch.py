@@ -0,0 +1,342 @@
+"""Concurrent batch execution of request specs for ReqNinja."""
+
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .exceptions import BatchError, BatchTimeoutError, ReqNinjaError
+from .histogram import LatencyHistogram
+from .response import ReqNinjaResponse
+
+
+class RequestSpec:
+    """A single request to run as part of a batch."""
+
+    def __init__(
+        self,
+        url: str,
+        method: str = 'GET',
+        profile: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        body: Any = None,
+        **kwargs,
+    ):
+        self.url = url
+        self.method = method.upper()
+        self.profile = profile
+        self.headers = headers
+        self.body = body
+        self.kwargs = kwargs
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RequestSpec":
+        """Build a spec from a mapping such as a parsed JSONL line."""
+        if not isinstance(data, dict) or not data.get('url'):
+            raise ReqNinjaError(f"Invalid request spec, 'url' is required: {data!r}")
+        return cls(**data)
+
+    def request_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for ``ReqNinjaClient.request``."""
+        kwargs = dict(self.kwargs)
+        if self.profile is not None:
+            kwargs['profile'] = self.profile
+        if self.headers:
+            kwargs['headers'] = self.headers
+        if self.body is not None:
+            if isinstance(self.body, (dict, list)):
+                kwargs['json'] = self.body
+            else:
+                kwargs['data'] = self.body
+        return kwargs
+
+    def __repr__(self) -> str:
+        return f"<RequestSpec {self.method} {self.url}>"
+
+
+SpecLike = Union[RequestSpec, Dict[str, Any]]
+
+
+def load_specs(path: str) -> Iterator[Dict[str, Any]]:
+    """Lazily read request specs from a JSONL or YAML file.
+
+    JSONL files (or ``-`` for stdin) are read one line at a time, so memory
+    stays flat however many requests the file holds. Blank lines and lines
+    starting with ``#`` are skipped. YAML files may hold a list of specs or
+    one spec per document.
+    """
+    if path.endswith(('.yml', '.yaml')):
+        yield from _load_yaml_specs(path)
+        return
+
+    stream = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ReqNinjaError(f"{path}:{line_number}: invalid JSON: {e}")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _load_yaml_specs(path: str) -> Iterator[Dict[str, Any]]:
+    import yaml
+
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            for document in yaml.safe_load_all(f):
+                if isinstance(document, list):
+                    yield from document
+                elif document is not None:
+                    yield document
+        except yaml.YAMLError as e:
+            raise ReqNinjaError(f"{path}: invalid YAML: {e}")
+
+
+class BatchResult:
+    """Outcome of one request in a batch: a response or an error."""
+
+    def __init__(
+        self,
+        index: int,
+        spec: RequestSpec,
+        response: Optional[ReqNinjaResponse] = None,
+        error: Optional[BaseException] = None,
+    ):
+        self.index = index
+        self.spec = spec
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Whether the request completed without raising."""
+        return self.error is None
+
+    def to_dict(self, include_body: bool = False) -> Dict[str, Any]:
+        """Summarise the result as a JSON-serialisable record."""
+        record = {
+            'index': self.index,
+            'method': self.spec.method,
+            'url': self.spec.url,
+            'ok': self.ok,
+        }
+        if self.ok:
+            record['status_code'] = self.response.status_code
+            record['elapsed_ms'] = round(self.response.elapsed_ms, 3)
+            if include_body:
+                record['body'] = self.response.text
+        else:
+            record['error'] = str(self.error)
+        return record
+
+    def __repr__(self) -> str:
+        outcome = self.response if self.ok else f"error={self.error!r}"
+        return f"<BatchResult #{self.index} {outcome}>"
+
+
+class BatchStats:
+    """Aggregate timing for a batch run."""
+
+    def __init__(self):
+        self.total = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.status_counts: Dict[int, int] = {}
+        # Failures by exception type, including those not kept in BatchRun.errors
+        self.error_counts: Dict[str, int] = {}
+        self.latency = LatencyHistogram()
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+
+    def record(self, result: BatchResult) -> None:
+        self.total += 1
+        if result.ok:
+            self.succeeded += 1
+            status = result.response.status_code
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            self.latency.record(result.response.elapsed_ms)
+        else:
+            self.failed += 1
+            name = type(result.error).__name__
+            self.error_counts[name] = self.error_counts.get(name, 0) + 1
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Wall-clock duration of the batch."""
+        if self.start_time is None:
+            return 0.0
+        end = self.end_time if self.end_time is not None else time.perf_counter()
+        return end - self.start_time
+
+    @property
+    def requests_per_second(self) -> float:
+        """Completed requests per second of wall-clock time."""
+        elapsed = self.elapsed_seconds
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    def latency_percentile(self, pct: float) -> float:
+        """Latency in milliseconds at the given percentile."""
+        return self.latency.percentile(pct)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarise the batch for reporting."""
+        latency = self.latency
+        return {
+            'total': self.total,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'status_counts': dict(self.status_counts),
+            'error_counts': dict(self.error_counts),
+            'elapsed_seconds': self.elapsed_seconds,
+            'requests_per_second': self.requests_per_second,
+            'latency_ms': {
+                'min': latency.min or 0.0,
+                'mean': latency.mean,
+                'p50': latency.percentile(50),
+                'p95': latency.percentile(95),
+                'p99': latency.percentile(99),
+                'max': latency.max or 0.0,
+            },
+        }
+
+
+class BatchRun:
+    """A lazily executed batch of requests.
+
+    Specs are pulled from the input iterable only as worker slots free up,
+    so arbitrarily long (or generated) inputs run in constant memory.
+    Iterating yields ``ReqNinjaResponse`` objects; use :meth:`results` to
+    also see failures and the index of each spec. Only the first
+    ``max_errors`` failures are kept in :attr:`errors`; ``stats`` counts
+    all of them by exception type.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        specs: Iterable[SpecLike],
+        concurrency: int = 10,
+        ordered: bool = False,
+        timeout: Optional[float] = None,
+        fail_fast: bool = False,
+        max_errors: int = 100,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.client = client
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.timeout = timeout
+        self.fail_fast = fail_fast
+        self.max_errors = max_errors
+        self.stats = BatchStats()
+        self.errors: List[BatchResult] = []
+        self._specs = specs
+        self._started = False
+
+    def __iter__(self) -> Iterator[ReqNinjaResponse]:
+        for result in self.results():
+            if result.ok:
+                yield result.response
+
+    def results(self) -> Iterator[BatchResult]:
+        """Run the batch, yielding a BatchResult per spec."""
+        if self._started:
+            raise ReqNinjaError("A batch can only be iterated once")
+        self._started = True
+
+        specs = ((index, self._coerce(spec)) for index, spec in enumerate(self._specs))
+        # Keep a couple of requests queued per worker so none go idle
+        window = self.concurrency * 2
+        self.stats.start_time = time.perf_counter()
+        deadline = (
+            self.stats.start_time + self.timeout if self.timeout is not None else None
+        )
+        executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix='reqninja-batch'
+        )
+        pending: Deque[Tuple[int, RequestSpec, Future]] = deque()
+        try:
+            self._fill(executor, specs, pending, window)
+            while pending:
+                if self.ordered:
+                    done = [self._wait_head(pending, deadline)]
+                else:
+                    done = self._wait_any(pending, deadline)
+                for index, spec, future in done:
+                    result = self._collect(index, spec, future)
+                    yield result
+                self._fill(executor, specs, pending, window)
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+            self.stats.end_time = time.perf_counter()
+
+    def _coerce(self, spec: SpecLike) -> RequestSpec:
+        return spec if isinstance(spec, RequestSpec) else RequestSpec.from_dict(spec)
+
+    def _fill(self, executor, specs, pending, window: int) -> None:
+        while len(pending) < window:
+            try:
+                index, spec = next(specs)
+            except StopIteration:
+                return
+            future = executor.submit(
+                self.client.request, spec.method, spec.url, **spec.request_kwargs()
+            )
+            pending.append((index, spec, future))
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise BatchTimeoutError(f"Batch timed out after {self.timeout}s")
+        return remaining
+
+    def _wait_head(self, pending, deadline):
+        index, spec, future = pending[0]
+        wait([future], timeout=self._remaining(deadline))
+        if not future.done():
+            raise BatchTimeoutError(
+                f"Batch timed out after {self.timeout}s", index=index, spec=spec
+            )
+        return pending.popleft()
+
+    def _wait_any(self, pending, deadline):
+        futures = {item[2]: item for item in pending}
+        done, _ = wait(
+            futures, timeout=self._remaining(deadline), return_when=FIRST_COMPLETED
+        )
+        if not done:
+            raise BatchTimeoutError(f"Batch timed out after {self.timeout}s")
+        finished = [futures[future] for future in done]
+        for item in finished:
+            pending.remove(item)
+        finished.sort(key=lambda item: item[0])
+        return finished
+
+    def _collect(self, index: int, spec: RequestSpec, future: Future) -> BatchResult:
+        try:
+            result = BatchResult(index, spec, response=future.result())
+        except Exception as e:
+            result = BatchResult(index, spec, error=e)
+            if len(self.errors) < self.max_errors:
+                self.errors.append(result)
+        self.stats.record(result)
+        if not result.ok and self.fail_fast:
+            raise BatchError(
+                f"Request #{index} ({spec.method} {spec.url}) failed: {result.error}",
+                index=index,
+                spec=spec,
+            ) from result.error
+        return result
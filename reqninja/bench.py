@@ -0,0 +1,255 @@
+"""Load generation for ReqNinja, driven through profiles and auth."""
+
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .exceptions import ReqNinjaError
+from .histogram import LatencyHistogram
+
+
+class _WorkerStats:
+    """Per-thread tallies, merged once the run ends so workers never lock."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.status_counts: Dict[int, int] = {}
+        self.exceptions: Dict[str, int] = {}
+        self.bytes_received = 0
+
+
+class BenchResult:
+    """Outcome of a benchmark run."""
+
+    def __init__(
+        self,
+        mode: str,
+        concurrency: int,
+        duration: float,
+        workers: List[_WorkerStats],
+        target_rate: Optional[float] = None,
+    ):
+        self.mode = mode
+        self.concurrency = concurrency
+        self.duration = duration
+        self.target_rate = target_rate
+        self.latency = LatencyHistogram()
+        self.status_counts: Dict[int, int] = {}
+        self.exceptions: Dict[str, int] = {}
+        self.bytes_received = 0
+        for worker in workers:
+            self.latency.merge(worker.latency)
+            for status, count in worker.status_counts.items():
+                self.status_counts[status] = self.status_counts.get(status, 0) + count
+            for name, count in worker.exceptions.items():
+                self.exceptions[name] = self.exceptions.get(name, 0) + count
+            self.bytes_received += worker.bytes_received
+
+    @property
+    def requests(self) -> int:
+        """Requests attempted, including ones that raised."""
+        return sum(self.status_counts.values()) + sum(self.exceptions.values())
+
+    @property
+    def errors(self) -> int:
+        """Requests that raised or returned a 4xx/5xx status."""
+        failed = sum(c for status, c in self.status_counts.items() if status >= 400)
+        return failed + sum(self.exceptions.values())
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.duration if self.duration > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarise the run for reporting."""
+        latency = self.latency
+        return {
+            'mode': self.mode,
+            'concurrency': self.concurrency,
+            'target_rate': self.target_rate,
+            'requests': self.requests,
+            'errors': self.errors,
+            'duration_seconds': self.duration,
+            'requests_per_second': self.requests_per_second,
+            'bytes_received': self.bytes_received,
+            'status_counts': dict(sorted(self.status_counts.items())),
+            'exceptions': dict(self.exceptions),
+            'latency_ms': {
+                'min': latency.min or 0.0,
+                'mean': latency.mean,
+                'p50': latency.percentile(50),
+                'p90': latency.percentile(90),
+                'p99': latency.percentile(99),
+                'p99.9': latency.percentile(99.9),
+                'max': latency.max or 0.0,
+            },
+        }
+
+
+def run_benchmark(
+    url: str,
+    method: str = 'GET',
+    concurrency: int = 10,
+    requests_total: Optional[int] = None,
+    duration: Optional[float] = None,
+    rate: Optional[float] = None,
+    client: Optional[Any] = None,
+    profile: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    auth: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    **kwargs,
+) -> BenchResult:
+    """Drive ``url`` with load and measure latency.
+
+    Without ``rate`` the run is closed-loop: ``concurrency`` workers send
+    back to back. With ``rate`` it is open-loop: request ``i`` is scheduled
+    at ``start + i / rate`` and its latency is measured from that intended
+    start, so time spent queued behind a slow response is counted instead
+    of silently omitted.
+
+    The request is resolved (profile, base URL, headers, auth) and prepared
+    once; workers resend the same prepared request over a dedicated pool
+    sized to ``concurrency`` with retries disabled. Auth schemes that sign
+    each request (OAuth2, HMAC) are applied again for every request. File
+    and stream bodies can only be sent once and are rejected.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if requests_total is None and duration is None:
+        raise ReqNinjaError("Specify a request count or a duration")
+    if rate is not None and rate <= 0:
+        raise ValueError("rate must be positive")
+    if not _replayable(kwargs):
+        raise ReqNinjaError(
+            "Cannot benchmark a file or stream body; pass the body as bytes or str"
+        )
+
+    if client is None:
+        from .client import ReqNinjaClient
+
+        client = ReqNinjaClient()
+
+    config, final_url, final_headers, final_timeout = client._prepare_request(
+        url,
+        profile,
+        headers,
+        auth,
+        timeout,
+        method,
+        kwargs.get('data'),
+        kwargs.get('json'),
+        kwargs.get('params'),
+    )
+    scheme = client._auth_scheme(config, auth)
+    per_request = scheme is not None and scheme.per_request
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    prepared = session.prepare_request(
+        requests.Request(method.upper(), final_url, headers=final_headers, **kwargs)
+    )
+    send_kwargs = session.merge_environment_settings(
+        prepared.url, {}, False, None, None
+    )
+    send_kwargs['timeout'] = final_timeout
+    send_kwargs['allow_redirects'] = False
+
+    def sign() -> requests.PreparedRequest:
+        """Prepare the request again with fresh per-request auth headers."""
+        _, _, signed, _ = client._prepare_request(
+            url,
+            profile,
+            headers,
+            auth,
+            timeout,
+            method,
+            kwargs.get('data'),
+            kwargs.get('json'),
+            kwargs.get('params'),
+        )
+        return session.prepare_request(
+            requests.Request(method.upper(), final_url, headers=signed, **kwargs)
+        )
+
+    slots = itertools.count()
+    workers = [_WorkerStats() for _ in range(concurrency)]
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+    interval = 1.0 / rate if rate else None
+
+    def worker(stats: _WorkerStats) -> None:
+        perf_counter = time.perf_counter
+        send = session.send
+        latency = stats.latency
+        status_counts = stats.status_counts
+        while True:
+            # next() on a shared count is atomic under the GIL
+            slot = next(slots)
+            if requests_total is not None and slot >= requests_total:
+                return
+            if interval is not None:
+                intended = start + slot * interval
+                now = perf_counter()
+                if intended > now:
+                    time.sleep(intended - now)
+            else:
+                intended = perf_counter()
+            if deadline is not None and intended >= deadline:
+                return
+            try:
+                request = sign() if per_request else prepared
+                response = send(request, **send_kwargs)
+                stats.bytes_received += len(response.content)
+                status_counts[response.status_code] = (
+                    status_counts.get(response.status_code, 0) + 1
+                )
+            except Exception as e:
+                # Signing can fail too (e.g. a token fetch); count it like
+                # a transport error rather than losing the worker
+                name = type(e).__name__
+                stats.exceptions[name] = stats.exceptions.get(name, 0) + 1
+            latency.record((perf_counter() - intended) * 1000)
+
+    threads = [
+        threading.Thread(
+            target=worker, args=(stats,), name=f'reqninja-bench-{i}', daemon=True
+        )
+        for i, stats in enumerate(workers)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        session.close()
+
+    return BenchResult(
+        mode='open' if rate else 'closed',
+        concurrency=concurrency,
+        duration=time.perf_counter() - start,
+        workers=workers,
+        target_rate=rate,
+    )
+
+
+def _replayable(kwargs: Dict[str, Any]) -> bool:
+    """Whether the request body can be sent more than once."""
+    data = kwargs.get('data')
+    if data is not None and not isinstance(
+        data, (str, bytes, bytearray, dict, list, tuple)
+    ):
+        return False
+    for value in (kwargs.get('files') or {}).values():
+        if isinstance(value, tuple):
+            value = value[1] if len(value) > 1 else None
+        if hasattr(value, 'read'):
+            return False
+    return True
@@ -0,0 +1,612 @@
+"""Private HTTP response cache (RFC 9111) for ReqNinja."""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .response import ReqNinjaResponse
+from .timing import PhaseTimings
+
+DEFAULT_CACHE_DIR = Path.home() / '.reqninja' / 'cache'
+
+DEFAULT_CACHE_SETTINGS = {
+    'enabled': False,
+    'backend': 'memory',
+    'max_entries': 1024,
+    'max_bytes': 64 * 1024 * 1024,
+    'path': str(DEFAULT_CACHE_DIR),
+}
+
+# Statuses that may be stored without explicit freshness (RFC 9110 15.1)
+CACHEABLE_BY_DEFAULT = frozenset(
+    {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+)
+
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'TRACE'})
+
+# Heuristic freshness: 10% of the time since Last-Modified, capped at a day
+HEURISTIC_FRACTION = 0.1
+MAX_HEURISTIC_LIFETIME = 24 * 3600
+
+# Headers a 304 must not overwrite in the stored response (RFC 9111 3.2)
+_NOT_UPDATED_BY_304 = frozenset(
+    {'content-length', 'content-encoding', 'transfer-encoding'}
+)
+
+_DIRECTIVE_PATTERN = re.compile(
+    r'\s*([^\s=,]+)\s*(?:=\s*("(?:[^"\\]|\\.)*"|[^\s,]*))?\s*(?:,|$)'
+)
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into {directive: argument or None}."""
+    directives: Dict[str, Optional[str]] = {}
+    if not value:
+        return directives
+    for name, argument in _DIRECTIVE_PATTERN.findall(value):
+        if argument.startswith('"'):
+            argument = argument[1:-1]
+        directives[name.lower()] = argument or None
+    return directives
+
+
+def _seconds(directives: Mapping[str, Optional[str]], name: str) -> Optional[int]:
+    try:
+        return max(0, int(directives[name]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _vary_key(
+    names: Iterable[str], request_headers: Mapping[str, Optional[str]]
+) -> str:
+    """Digest of the request headers a stored response was selected by.
+
+    Authorization is always included, so responses fetched with different
+    credentials are never served to each other; hashing keeps credentials
+    out of the on-disk cache.
+    """
+    digest = hashlib.sha256()
+    for name in sorted({n.lower() for n in names} | {'authorization'}):
+        digest.update(f'{name}:{request_headers.get(name) or ""}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class CacheEntry:
+    """A stored response plus what is needed to compute its freshness."""
+
+    __slots__ = (
+        'url',
+        'status',
+        'reason',
+        'headers',
+        'body',
+        'request_time',
+        'response_time',
+        'vary_names',
+        'vary_key',
+    )
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        reason: str,
+        headers: List[Tuple[str, str]],
+        body: bytes,
+        request_time: float,
+        response_time: float,
+        vary_names: Tuple[str, ...] = (),
+        vary_key: str = '',
+    ):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.request_time = request_time
+        self.response_time = response_time
+        self.vary_names = vary_names
+        self.vary_key = vary_key
+
+    def header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    @property
+    def cache_control(self) -> Dict[str, Optional[str]]:
+        return parse_cache_control(self.header('Cache-Control'))
+
+    def matches(self, request_headers: Mapping[str, Optional[str]]) -> bool:
+        """Whether this response was selected by the same request headers."""
+        return self.vary_key == _vary_key(self.vary_names, request_headers)
+
+    def freshness_lifetime(self) -> float:
+        """Seconds the response stays fresh after it was generated (RFC 9111 4.2.1)."""
+        directives = self.cache_control
+        max_age = _seconds(directives, 'max-age')
+        if max_age is not None:
+            return max_age
+        expires = self.header('Expires')
+        if expires is not None:
+            expires_at = _parse_http_date(expires)
+            if expires_at is None:
+                # Invalid Expires values mean "already expired"
+                return 0
+            date = _parse_http_date(self.header('Date')) or self.response_time
+            return max(0.0, expires_at - date)
+        last_modified = _parse_http_date(self.header('Last-Modified'))
+        if last_modified is not None and self.status in CACHEABLE_BY_DEFAULT:
+            date = _parse_http_date(self.header('Date')) or self.response_time
+            return min(
+                MAX_HEURISTIC_LIFETIME,
+                max(0.0, (date - last_modified) * HEURISTIC_FRACTION),
+            )
+        return 0
+
+    def current_age(self, now: float) -> float:
+        """Age of the response in seconds (RFC 9111 4.2.3)."""
+        date = _parse_http_date(self.header('Date')) or self.response_time
+        try:
+            age_value = max(0, int(self.header('Age') or 0))
+        except ValueError:
+            age_value = 0
+        apparent_age = max(0.0, self.response_time - date)
+        corrected_age = age_value + (self.response_time - self.request_time)
+        return max(apparent_age, corrected_age) + (now - self.response_time)
+
+    def is_fresh(
+        self, now: float, request_directives: Mapping[str, Optional[str]]
+    ) -> bool:
+        """Whether the entry may be served without contacting the origin."""
+        if 'no-cache' in request_directives or 'no-cache' in self.cache_control:
+            return False
+        age = self.current_age(now)
+        lifetime = self.freshness_lifetime()
+        max_age = _seconds(request_directives, 'max-age')
+        if max_age is not None:
+            lifetime = min(lifetime, max_age)
+        min_fresh = _seconds(request_directives, 'min-fresh') or 0
+        return age + min_fresh < lifetime
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        conditional = {}
+        etag = self.header('ETag')
+        if etag:
+            conditional['If-None-Match'] = etag
+        last_modified = self.header('Last-Modified')
+        if last_modified:
+            conditional['If-Modified-Since'] = last_modified
+        return conditional
+
+    def refreshed(
+        self, not_modified: requests.Response, request_time: float, response_time: float
+    ) -> "CacheEntry":
+        """A copy updated with the headers of a 304 response (RFC 9111 4.3.4)."""
+        updates = {
+            key.lower(): (key, value)
+            for key, value in not_modified.headers.items()
+            if key.lower() not in _NOT_UPDATED_BY_304
+        }
+        headers = [
+            updates.pop(key.lower(), (key, value)) for key, value in self.headers
+        ]
+        headers.extend(updates.values())
+        return CacheEntry(
+            self.url,
+            self.status,
+            self.reason,
+            headers,
+            self.body,
+            request_time,
+            response_time,
+            self.vary_names,
+            self.vary_key,
+        )
+
+    def to_response(self, method: str, now: float) -> requests.Response:
+        """Build a requests.Response serving the stored body."""
+        response = requests.Response()
+        response.status_code = self.status
+        response.reason = self.reason
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.headers['Age'] = str(int(self.current_age(now)))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.body
+        response._content_consumed = True
+        response.elapsed = timedelta(0)
+        request = requests.PreparedRequest()
+        request.method = method
+        request.url = self.url
+        request.headers = CaseInsensitiveDict()
+        response.request = request
+        return response
+
+    def to_meta(self) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'status': self.status,
+            'reason': self.reason,
+            'headers': self.headers,
+            'request_time': self.request_time,
+            'response_time': self.response_time,
+            'vary_names': list(self.vary_names),
+            'vary_key': self.vary_key,
+        }
+
+    @classmethod
+    def from_meta(cls, meta: Dict[str, Any], body: bytes) -> "CacheEntry":
+        return cls(
+            meta['url'],
+            meta['status'],
+            meta['reason'],
+            [tuple(pair) for pair in meta['headers']],
+            body,
+            meta['request_time'],
+            meta['response_time'],
+            tuple(meta['vary_names']),
+            meta['vary_key'],
+        )
+
+
+class MemoryCacheBackend:
+    """In-process LRU store capped by entry count and total body bytes."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= len(previous.body)
+            self._entries[key] = entry
+            self.size_bytes += len(entry.body)
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self.size_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted.body)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size_bytes -= len(entry.body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend:
+    """Store entries as files under a directory, pruned by total size.
+
+    Each entry is one file holding a JSON metadata line followed by the
+    body, replaced atomically so concurrent readers and other processes
+    never see a partial entry. Reads touch the file's mtime, and the least
+    recently used files are removed once ``max_bytes`` is exceeded.
+    """
+
+    SUFFIX = '.entry'
+
+    def __init__(
+        self, path: str = str(DEFAULT_CACHE_DIR), max_bytes: int = 64 * 1024 * 1024
+    ):
+        self.path = Path(os.path.expanduser(path))
+        self.max_bytes = max_bytes
+        self._size_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _file(self, key: str) -> Path:
+        return self.path / (key + self.SUFFIX)
+
+    def _files(self) -> List[os.DirEntry]:
+        try:
+            with os.scandir(self.path) as it:
+                return [e for e in it if e.name.endswith(self.SUFFIX)]
+        except FileNotFoundError:
+            return []
+
+    @property
+    def size_bytes(self) -> int:
+        if self._size_bytes is None:
+            self._size_bytes = sum(e.stat().st_size for e in self._files())
+        return self._size_bytes
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._file(key)
+        try:
+            with open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                entry = CacheEntry.from_meta(meta, f.read())
+            os.utime(path)
+            return entry
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        path = self._file(key)
+        temp_path = path.with_name(
+            f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp'
+        )
+        data = json.dumps(entry.to_meta()).encode('utf-8') + b'\n'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.write(entry.body)
+        with self._lock:
+            try:
+                replaced = os.stat(path).st_size
+            except OSError:
+                replaced = 0
+            os.replace(temp_path, path)
+            self._size_bytes = self.size_bytes - replaced + len(data) + len(entry.body)
+            if self._size_bytes > self.max_bytes:
+                self._prune()
+
+    def _prune(self) -> None:
+        files = []
+        for item in self._files():
+            try:
+                stat = item.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, item.path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size_bytes = total
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            try:
+                size = os.stat(self._file(key)).st_size
+                os.remove(self._file(key))
+                if self._size_bytes is not None:
+                    self._size_bytes -= size
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for item in self._files():
+                try:
+                    os.remove(item.path)
+                except OSError:
+                    pass
+            self._size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._files())
+
+
+class HttpCache:
+    """Private cache in front of a client's requests.
+
+    Fresh responses are served without a network round trip. Stale ones
+    with an ETag or Last-Modified are revalidated with a conditional
+    request, and a 304 is answered from the stored body. Successful
+    unsafe requests (POST, PUT, ...) invalidate the stored URL. Requests
+    can opt out with ``Cache-Control: no-store`` or force revalidation
+    with ``Cache-Control: no-cache``.
+    """
+
+    def __init__(self, backend: Any):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stores = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any]) -> "HttpCache":
+        settings = {**DEFAULT_CACHE_SETTINGS, **settings}
+        if settings['backend'] == 'disk':
+            backend = DiskCacheBackend(settings['path'], int(settings['max_bytes']))
+        elif settings['backend'] == 'memory':
+            backend = MemoryCacheBackend(
+                int(settings['max_entries']), int(settings['max_bytes'])
+            )
+        else:
+            raise ValueError(f"Unknown cache backend: {settings['backend']!r}")
+        return cls(backend)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def fetch(
+        self,
+        method: str,
+        url: str,
+        headers: Any,
+        send: Callable[[Any], ReqNinjaResponse],
+    ) -> ReqNinjaResponse:
+        """Answer a request from the cache, revalidating or calling ``send``.
+
+        ``send(headers)`` performs the network request with the given
+        headers, which may include conditional ones.
+        """
+        if method != 'GET':
+            response = send(headers)
+            if method not in SAFE_METHODS and response.status_code < 400:
+                self.invalidate(url)
+            return response
+
+        request_directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in request_directives:
+            return send(headers)
+
+        key = self.key(url)
+        entry = self.backend.get(key)
+        if entry is not None and not entry.matches(headers):
+            entry = None
+
+        started = time.perf_counter()
+        now = time.time()
+        if entry is not None and entry.is_fresh(now, request_directives):
+            self._count('hits')
+            result = ReqNinjaResponse(
+                entry.to_response(method, now),
+                now,
+                time.time(),
+                PhaseTimings(
+                    attempts=0,
+                    connection_reused=True,
+                    total_ms=(time.perf_counter() - started) * 1000,
+                ),
+            )
+            result.cache_status = 'hit'
+            return result
+
+        conditional = entry.validators() if entry is not None else {}
+        request_time = time.time()
+        response = send(headers.with_layer(conditional) if conditional else headers)
+        response_time = time.time()
+
+        if conditional and response.status_code == 304:
+            self._count('revalidations')
+            entry = entry.refreshed(response._response, request_time, response_time)
+            self.backend.set(key, entry)
+            served = entry.to_response(method, response_time)
+            served.request = response.request
+            served.elapsed = response.elapsed
+            result = ReqNinjaResponse(
+                served, response.start_time, response.end_time, response.timings
+            )
+            result.cache_status = 'revalidated'
+            return result
+
+        self._count('misses')
+        response.cache_status = 'miss'
+        self._store(
+            key, url, headers, request_directives, response, request_time, response_time
+        )
+        return response
+
+    def _store(
+        self,
+        key: str,
+        url: str,
+        request_headers: Any,
+        request_directives: Mapping[str, Optional[str]],
+        response: ReqNinjaResponse,
+        request_time: float,
+        response_time: float,
+    ) -> None:
+        """Store ``response`` if RFC 9111 section 3 allows and it is reusable."""
+        if response.body_pending or 'no-store' in request_directives:
+            return
+        raw = response._response
+        vary = raw.headers.get('Vary', '')
+        vary_names = tuple(name.strip() for name in vary.split(',') if name.strip())
+        if '*' in vary_names:
+            return
+        body = raw.content
+        # The stored body is decoded, so the framing headers must describe it
+        headers = [
+            (name, value)
+            for name, value in raw.headers.items()
+            if name.lower() not in _NOT_UPDATED_BY_304
+        ]
+        headers.append(('Content-Length', str(len(body))))
+        entry = CacheEntry(
+            url,
+            raw.status_code,
+            raw.reason or '',
+            headers,
+            body,
+            request_time,
+            response_time,
+            vary_names,
+            _vary_key(vary_names, request_headers),
+        )
+        directives = entry.cache_control
+        if 'no-store' in directives:
+            return
+        explicit = 'max-age' in directives or entry.header('Expires') is not None
+        if raw.status_code not in CACHEABLE_BY_DEFAULT and not explicit:
+            return
+        if entry.freshness_lifetime() <= 0 and not entry.validators():
+            # Could neither be served nor revalidated
+            return
+        if len(entry.body) > getattr(self.backend, 'max_bytes', float('inf')):
+            return
+        self.backend.set(key, entry)
+        self._count('stores')
+
+    def invalidate(self, url: str) -> None:
+        """Drop any stored response for ``url``."""
+        self.backend.delete(self.key(url))
+        self._count('invalidations')
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters plus the number and size of stored entries."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'stores': self.stores,
+            'invalidations': self.invalidations,
+            'entries': len(self.backend),
+            'size_bytes': self.backend.size_bytes,
+        }
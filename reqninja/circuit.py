@@ -0,0 +1,216 @@
+"""Per-host circuit breakers for ReqNinja."""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Mapping, Optional, Tuple
+
+from .exceptions import CircuitOpenError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_CIRCUIT_BREAKER = {
+    'enabled': False,
+    'scope': 'host',  # host or profile
+    'window': 20,  # most recent calls considered
+    'minimum_calls': 10,  # calls needed before the circuit can open
+    'failure_rate_threshold': 0.5,  # fraction of failed calls that opens it
+    'slow_call_ms': 10000,  # calls slower than this count as slow
+    'slow_call_rate_threshold': 1.0,  # fraction of slow calls that opens it
+    'failure_status_codes': [500, 502, 503, 504],
+    'open_seconds': 30,  # time open before trial calls are let through
+    'half_open_calls': 3,  # trial calls that must succeed to close it
+}
+
+SCOPES = ('host', 'profile')
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit over a sliding window of recent calls.
+
+    While closed, the last ``window`` calls are kept. Once at least
+    ``minimum_calls`` have been seen, the circuit opens when the failure
+    rate or the slow call rate reaches its threshold. While open, calls
+    are refused without touching the network. After ``open_seconds`` it
+    turns half-open and lets ``half_open_calls`` trial calls through. One
+    failed trial reopens it; when all trials succeed it closes again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        minimum_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_ms: float = 10000,
+        slow_call_rate_threshold: float = 1.0,
+        failure_status_codes: Any = (500, 502, 503, 504),
+        open_seconds: float = 30,
+        half_open_calls: int = 3,
+    ):
+        self.name = name
+        self.window = max(1, int(window))
+        self.minimum_calls = max(1, min(int(minimum_calls), self.window))
+        self.failure_rate_threshold = float(failure_rate_threshold)
+        self.slow_call_ms = float(slow_call_ms)
+        self.slow_call_rate_threshold = float(slow_call_rate_threshold)
+        self.failure_status_codes = frozenset(failure_status_codes)
+        self.open_seconds = float(open_seconds)
+        self.half_open_calls = max(1, int(half_open_calls))
+
+        self.state = CLOSED
+        # (failed, slow) per call, newest last
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=self.window)
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._trials_started = 0
+        self._trials_passed = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.times_opened = 0
+
+    @classmethod
+    def from_settings(cls, name: str, settings: Mapping[str, Any]) -> "CircuitBreaker":
+        """Build from a ``circuit_breaker`` config section."""
+        return cls(
+            name,
+            **{
+                key: settings[key]
+                for key in DEFAULT_CIRCUIT_BREAKER
+                if key not in ('enabled', 'scope') and key in settings
+            },
+        )
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; half-open trials are reserved."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._trials_started = 0
+                self._trials_passed = 0
+            if self.state == HALF_OPEN:
+                if self._trials_started >= self.half_open_calls:
+                    self.rejected += 1
+                    return False
+                self._trials_started += 1
+            return True
+
+    def check(self) -> None:
+        """Raise :class:`CircuitOpenError` unless a call may go ahead."""
+        if not self.allow():
+            raise CircuitOpenError(
+                f"Circuit for {self.name} is open; retry in {self.retry_in():.1f}s",
+                self.name,
+                self.retry_in(),
+            )
+
+    def release(self) -> None:
+        """Give back a call allowed by :meth:`allow` that ended without an outcome.
+
+        A call that raised before it got a response or a transport error
+        (a bad argument, a cancellation) says nothing about the upstream;
+        while half-open, its trial is handed to another call.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN and self._trials_started > self._trials_passed:
+                self._trials_started -= 1
+
+    def retry_in(self) -> float:
+        """Seconds until trial calls are let through; 0 unless open."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def record(
+        self, status: Optional[int], elapsed_ms: float, error: bool = False
+    ) -> None:
+        """Record the outcome of an allowed call."""
+        failed = error or status in self.failure_status_codes
+        slow = elapsed_ms >= self.slow_call_ms
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self._trials_passed += 1
+                    if self._trials_passed >= self.half_open_calls:
+                        self._close()
+                return
+            if self.state == OPEN:
+                # A call allowed before the circuit opened finished late
+                return
+
+            if len(self._calls) == self.window:
+                old_failed, old_slow = self._calls[0]
+                self._failures -= old_failed
+                self._slow -= old_slow
+            self._calls.append((failed, slow))
+            self._failures += failed
+            self._slow += slow
+
+            calls = len(self._calls)
+            if calls >= self.minimum_calls and (
+                self._failures / calls >= self.failure_rate_threshold
+                or self._slow / calls >= self.slow_call_rate_threshold
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._calls.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State and recent failure and slow call rates, as plain data."""
+        with self._lock:
+            calls = len(self._calls)
+            return {
+                'state': self.state,
+                'calls': calls,
+                'failure_rate': self._failures / calls if calls else 0.0,
+                'slow_call_rate': self._slow / calls if calls else 0.0,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened,
+                'retry_in': self.retry_in(),
+            }
+
+    def __repr__(self) -> str:
+        return f"<CircuitBreaker {self.name} {self.state}>"
+
+
+class CircuitBreakers:
+    """Circuit breakers keyed by host or profile, created on first use."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, settings: Mapping[str, Any]) -> CircuitBreaker:
+        """The breaker for ``key``, built from ``settings`` the first time."""
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = self._breakers[key] = CircuitBreaker.from_settings(
+                        key, settings
+                    )
+        return breaker
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of every breaker, by key."""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {key: breaker.snapshot() for key, breaker in breakers}
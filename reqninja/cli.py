@@ -3,7 +3,7 @@
 import sys
 import json
 import click
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
 from .client import ReqNinjaClient
@@ -82,11 +82,15 @@ def https(ctx: click.Context, args) -> None:
 @click.option('--auth', '-a', help='Authentication (bearer <token> | basic user:pass)')
 @click.option('--timeout', '-t', type=int, help='Request timeout in seconds')
 @click.option('--retries', '-r', type=int, help='Number of retries')
-@click.option('--data', '-d', help='Request body data')
+@click.option('--data', '-d', help='Request body data (@file or @- to stream a file or stdin)')
+@click.option('--data-binary', help='Request body sent as-is (@file or @- to stream)')
+@click.option('--form', '-F', multiple=True,
+              help='Multipart field name=value or name=@file[;type=mime], streamed')
 @click.option('--json-data', '-j', help='JSON request body')
 @click.option('--raw', is_flag=True, help='Show raw response')
 @click.option('--headers-only', is_flag=True, help='Show headers only')
 @click.option('--save', '-s', help='Save response to file')
+@click.option('--stream', is_flag=True, help='Stream the body with --save/--raw instead of buffering it')
 @click.option('--debug', is_flag=True, help='Show debug information')
 @click.pass_context
 def get(ctx: click.Context, **kwargs) -> None:
@@ -101,11 +105,15 @@ def get(ctx: click.Context, **kwargs) -> None:
 @click.option('--auth', '-a', help='Authentication (bearer <token> | basic user:pass)')
 @click.option('--timeout', '-t', type=int, help='Request timeout in seconds')
 @click.option('--retries', '-r', type=int, help='Number of retries')
-@click.option('--data', '-d', help='Request body data')
+@click.option('--data', '-d', help='Request body data (@file or @- to stream a file or stdin)')
+@click.option('--data-binary', help='Request body sent as-is (@file or @- to stream)')
+@click.option('--form', '-F', multiple=True,
+              help='Multipart field name=value or name=@file[;type=mime], streamed')
 @click.option('--json-data', '-j', help='JSON request body')
 @click.option('--raw', is_flag=True, help='Show raw response')
 @click.option('--headers-only', is_flag=True, help='Show headers only')
 @click.option('--save', '-s', help='Save response to file')
+@click.option('--stream', is_flag=True, help='Stream the body with --save/--raw instead of buffering it')
 @click.option('--debug', is_flag=True, help='Show debug information')
 @click.pass_context
 def post(ctx: click.Context, **kwargs) -> None:
@@ -120,11 +128,15 @@ def post(ctx: click.Context, **kwargs) -> None:
 @click.option('--auth', '-a', help='Authentication (bearer <token> | basic user:pass)')
 @click.option('--timeout', '-t', type=int, help='Request timeout in seconds')
 @click.option('--retries', '-r', type=int, help='Number of retries')
-@click.option('--data', '-d', help='Request body data')
+@click.option('--data', '-d', help='Request body data (@file or @- to stream a file or stdin)')
+@click.option('--data-binary', help='Request body sent as-is (@file or @- to stream)')
+@click.option('--form', '-F', multiple=True,
+              help='Multipart field name=value or name=@file[;type=mime], streamed')
 @click.option('--json-data', '-j', help='JSON request body')
 @click.option('--raw', is_flag=True, help='Show raw response')
 @click.option('--headers-only', is_flag=True, help='Show headers only')
 @click.option('--save', '-s', help='Save response to file')
+@click.option('--stream', is_flag=True, help='Stream the body with --save/--raw instead of buffering it')
 @click.option('--debug', is_flag=True, help='Show debug information')
 @click.pass_context
 def put(ctx: click.Context, **kwargs) -> None:
@@ -139,11 +151,15 @@ def put(ctx: click.Context, **kwargs) -> None:
 @click.option('--auth', '-a', help='Authentication (bearer <token> | basic user:pass)')
 @click.option('--timeout', '-t', type=int, help='Request timeout in seconds')
 @click.option('--retries', '-r', type=int, help='Number of retries')
-@click.option('--data', '-d', help='Request body data')
+@click.option('--data', '-d', help='Request body data (@file or @- to stream a file or stdin)')
+@click.option('--data-binary', help='Request body sent as-is (@file or @- to stream)')
+@click.option('--form', '-F', multiple=True,
+              help='Multipart field name=value or name=@file[;type=mime], streamed')
 @click.option('--json-data', '-j', help='JSON request body')
 @click.option('--raw', is_flag=True, help='Show raw response')
 @click.option('--headers-only', is_flag=True, help='Show headers only')
 @click.option('--save', '-s', help='Save response to file')
+@click.option('--stream', is_flag=True, help='Stream the body with --save/--raw instead of buffering it')
 @click.option('--debug', is_flag=True, help='Show debug information')
 @click.pass_context
 def delete(ctx: click.Context, **kwargs) -> None:
@@ -158,11 +174,15 @@ def delete(ctx: click.Context, **kwargs) -> None:
 @click.option('--auth', '-a', help='Authentication (bearer <token> | basic user:pass)')
 @click.option('--timeout', '-t', type=int, help='Request timeout in seconds')
 @click.option('--retries', '-r', type=int, help='Number of retries')
-@click.option('--data', '-d', help='Request body data')
+@click.option('--data', '-d', help='Request body data (@file or @- to stream a file or stdin)')
+@click.option('--data-binary', help='Request body sent as-is (@file or @- to stream)')
+@click.option('--form', '-F', multiple=True,
+              help='Multipart field name=value or name=@file[;type=mime], streamed')
 @click.option('--json-data', '-j', help='JSON request body')
 @click.option('--raw', is_flag=True, help='Show raw response')
 @click.option('--headers-only', is_flag=True, help='Show headers only')
 @click.option('--save', '-s', help='Save response to file')
+@click.option('--stream', is_flag=True, help='Stream the body with --save/--raw instead of buffering it')
 @click.option('--debug', is_flag=True, help='Show debug information')
 @click.pass_context
 def patch(ctx: click.Context, **kwargs) -> None:
@@ -170,17 +190,23 @@ def patch(ctx: click.Context, **kwargs) -> None:
     _make_request(ctx, 'PATCH', **kwargs)
 
 
+def _parse_headers(raw_headers) -> Dict[str, str]:
+    """Parse repeated ``key:value`` header options into a dict."""
+    headers = {}
+    for header in raw_headers:
+        if ':' in header:
+            key, value = header.split(':', 1)
+            headers[key.strip()] = value.strip()
+    return headers
+
+
 def _make_request(ctx: click.Context, method: str, **kwargs) -> None:
     """Make an HTTP request with the given parameters."""
     try:
         client = create_client(ctx.obj.get('config'))
         
         # Parse headers
-        headers = {}
-        for header in kwargs.get('headers', []):
-            if ':' in header:
-                key, value = header.split(':', 1)
-                headers[key.strip()] = value.strip()
+        headers = _parse_headers(kwargs.get('headers', []))
         
         # Parse authentication
         auth_config = None
@@ -194,32 +220,40 @@ def _make_request(ctx: click.Context, method: str, **kwargs) -> None:
             'auth': auth_config,
             'timeout': kwargs.get('timeout'),
             'retries': kwargs.get('retries'),
+            'stream': True if kwargs.get('stream') else None,
         }
         
-        # Handle request body
-        if kwargs.get('data'):
-            request_kwargs['data'] = kwargs['data']
+        # Handle request body; files and stdin are streamed, not read in
+        body = kwargs.get('data_binary') or kwargs.get('data')
+        if body:
+            request_kwargs['data'] = _body_source(body)
+        elif kwargs.get('form'):
+            request_kwargs['data'] = _multipart_body(kwargs['form'])
         elif kwargs.get('json_data'):
             try:
                 request_kwargs['json'] = json.loads(kwargs['json_data'])
             except json.JSONDecodeError as e:
                 click.echo(f"Error: Invalid JSON data: {e}", err=True)
                 sys.exit(1)
-        
-        # Check for piped input
-        if not sys.stdin.isatty():
-            piped_data = sys.stdin.read().strip()
-            if piped_data:
-                try:
-                    request_kwargs['json'] = json.loads(piped_data)
-                except json.JSONDecodeError:
-                    request_kwargs['data'] = piped_data
+        elif not sys.stdin.isatty():
+            # Check for piped input
+            piped = _piped_body(sys.stdin.buffer)
+            if piped is not None:
+                request_kwargs['data'], is_json = piped
+                if is_json and 'content-type' not in {k.lower() for k in headers}:
+                    headers['Content-Type'] = 'application/json'
+                    request_kwargs['headers'] = headers
         
         # Remove None values
         request_kwargs = {k: v for k, v in request_kwargs.items() if v is not None}
         
         # Make the request
-        response = client.request(method, kwargs['url'], **request_kwargs)
+        try:
+            response = client.request(method, kwargs['url'], **request_kwargs)
+        finally:
+            close = getattr(request_kwargs.get('data'), 'close', None)
+            if close is not None:
+                close()
         
         # Handle debug output
         if kwargs.get('debug'):
@@ -229,6 +263,11 @@ def _make_request(ctx: click.Context, method: str, **kwargs) -> None:
         if kwargs.get('save'):
             response.save(kwargs['save'])
             click.echo(f"Response saved to {kwargs['save']}")
+        elif kwargs.get('raw') and kwargs.get('stream'):
+            stdout = click.get_binary_stream('stdout')
+            for chunk in response.iter_bytes():
+                stdout.write(chunk)
+            stdout.flush()
         elif kwargs.get('raw'):
             click.echo(response.text)
         elif kwargs.get('headers_only'):
@@ -249,6 +288,64 @@ def _make_request(ctx: click.Context, method: str, **kwargs) -> None:
         sys.exit(1)
 
 
+def _body_source(value: str) -> Any:
+    """Request body for --data/--data-binary; ``@path`` streams a file, ``@-`` stdin."""
+    from .upload import open_body
+    
+    if value.startswith('@'):
+        try:
+            return open_body(value[1:])
+        except OSError as e:
+            raise ReqNinjaError(f"Cannot read request body: {e}")
+    return value
+
+
+def _multipart_body(fields) -> Any:
+    """Streaming multipart body from repeated ``name=value`` / ``name=@file`` options."""
+    from .upload import MultipartEncoder
+    
+    parts = []
+    for field in fields:
+        name, sep, value = field.partition('=')
+        if not sep:
+            raise ReqNinjaError(f"Invalid form field (expected name=value): {field}")
+        if value.startswith('@'):
+            path, _, options = value[1:].partition(';')
+            content_type = options[5:] if options.startswith('type=') else None
+            value = (Path(path).name, Path(path), content_type)
+        parts.append((name, value))
+    try:
+        return MultipartEncoder(parts)
+    except OSError as e:
+        raise ReqNinjaError(f"Cannot read form file: {e}")
+
+
+def _piped_body(stream) -> Optional[Tuple[Any, bool]]:
+    """Stream piped stdin as the body without reading it all.
+    
+    Only the first chunk is inspected: returns None for empty input,
+    otherwise the body iterator and whether it looks like JSON.
+    """
+    from .upload import iter_chunks
+    
+    chunks = iter_chunks(stream)
+    first = next(chunks, b'')
+    while first and not first.strip():
+        # Skip leading whitespace-only chunks to find the first real byte
+        following = next(chunks, b'')
+        if not following:
+            return None
+        first = following
+    if not first:
+        return None
+    
+    def body():
+        yield first
+        yield from chunks
+    
+    return body(), first.lstrip()[:1] in (b'{', b'[')
+
+
 def _print_debug_info(response, request_kwargs: Dict[str, Any]) -> None:
     """Print debug information."""
     click.echo("=== DEBUG INFO ===", err=True)
@@ -258,14 +355,239 @@ def _print_debug_info(response, request_kwargs: Dict[str, Any]) -> None:
     for key, value in response.request.headers.items():
         click.echo(f"  {key}: {value}", err=True)
     
-    if hasattr(response.request, 'body') and response.request.body:
-        click.echo(f"Request Body: {response.request.body}", err=True)
+    body = getattr(response.request, 'body', None)
+    if isinstance(body, (str, bytes)) and body:
+        click.echo(f"Request Body: {body}", err=True)
+    elif body is not None:
+        click.echo("Request Body: <streamed>", err=True)
     
     click.echo(f"Response Status: {response.status_code} {response.reason}", err=True)
     click.echo(f"Response Time: {response.elapsed_ms:.2f}ms", err=True)
+    
+    timings = getattr(response, 'timings', None)
+    if timings is not None:
+        def phase(value):
+            return "n/a" if value is None else f"{value:.2f}ms"
+        
+        reuse = " (reused connection)" if timings.connection_reused else ""
+        click.echo(f"Timing Breakdown{reuse}:", err=True)
+        cached = " (cached)" if timings.dns_cached else ""
+        click.echo(f"  DNS Lookup:    {phase(timings.dns_ms)}{cached}", err=True)
+        click.echo(f"  TCP Connect:   {phase(timings.connect_ms)}", err=True)
+        click.echo(f"  TLS Handshake: {phase(timings.tls_ms)}", err=True)
+        click.echo(f"  First Byte:    {phase(timings.ttfb_ms)}", err=True)
+        click.echo(f"  Download:      {phase(timings.download_ms)}", err=True)
+        click.echo(f"  Retry Wait:    {phase(timings.retry_wait_ms)}", err=True)
+        if timings.rate_limit_wait_ms:
+            click.echo(f"  Rate Limited:  {phase(timings.rate_limit_wait_ms)}", err=True)
+        click.echo(f"  Attempts:      {timings.attempts}", err=True)
     click.echo("==================", err=True)
 
 
+@cli.command()
+@click.argument('file')
+@click.option('--concurrency', '-c', type=int, default=10, show_default=True,
+              help='Number of requests in flight at once')
+@click.option('--output', '-o', help='Write JSONL results to this file instead of stdout')
+@click.option('--profile', '-p', help='Profile for specs that do not name one')
+@click.option('--headers', '-H', multiple=True, help='Headers added to every request (key:value)')
+@click.option('--ordered', is_flag=True, help='Emit results in input order')
+@click.option('--fail-fast', is_flag=True, help='Stop at the first failed request')
+@click.option('--timeout', '-t', type=float, help='Timeout for the whole batch in seconds')
+@click.option('--include-body', is_flag=True, help='Include response bodies in results')
+@click.pass_context
+def batch(ctx: click.Context, file: str, concurrency: int, output: Optional[str],
+          profile: Optional[str], headers, ordered: bool, fail_fast: bool,
+          timeout: Optional[float], include_body: bool) -> None:
+    """Run request specs from a JSONL or YAML FILE ('-' for stdin).
+    
+    Each JSONL line is an object with url and optional method, profile,
+    headers and body. Results stream out as JSONL as they complete and a
+    throughput/latency summary is printed to stderr.
+    """
+    from .batch import load_specs
+    
+    common_headers = _parse_headers(headers)
+    
+    def specs():
+        for spec in load_specs(file):
+            if isinstance(spec, dict):
+                if profile and 'profile' not in spec:
+                    spec['profile'] = profile
+                if common_headers:
+                    spec['headers'] = {**common_headers, **(spec.get('headers') or {})}
+            yield spec
+    
+    out = None
+    run = None
+    try:
+        out = open(output, 'w', encoding='utf-8') if output else sys.stdout
+        client = create_client(ctx.obj.get('config'))
+        run = client.batch(specs(), concurrency=concurrency, ordered=ordered,
+                           timeout=timeout, fail_fast=fail_fast)
+        for result in run.results():
+            out.write(json.dumps(result.to_dict(include_body=include_body)) + '\n')
+            out.flush()
+    except (OSError, ValueError, ReqNinjaError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("\nBatch cancelled.", err=True)
+        sys.exit(1)
+    finally:
+        if output and out is not None:
+            out.close()
+        if run is not None:
+            _print_batch_summary(run.stats.to_dict())
+    
+    if run.stats.failed:
+        sys.exit(1)
+
+
+def _print_batch_summary(stats: Dict[str, Any]) -> None:
+    """Print a batch throughput/latency summary to stderr."""
+    latency = stats['latency_ms']
+    statuses = ', '.join(
+        f"{code}: {count}" for code, count in sorted(stats['status_counts'].items())
+    )
+    click.echo("=== BATCH SUMMARY ===", err=True)
+    click.echo(f"Requests: {stats['total']} ({stats['succeeded']} completed, "
+               f"{stats['failed']} failed)", err=True)
+    click.echo(f"Statuses: {statuses or '-'}", err=True)
+    click.echo(f"Elapsed: {stats['elapsed_seconds']:.2f}s "
+               f"({stats['requests_per_second']:.1f} req/s)", err=True)
+    click.echo(f"Latency: min {latency['min']:.2f}ms, mean {latency['mean']:.2f}ms, "
+               f"p50 {latency['p50']:.2f}ms, p95 {latency['p95']:.2f}ms, "
+               f"p99 {latency['p99']:.2f}ms, max {latency['max']:.2f}ms", err=True)
+    click.echo("=====================", err=True)
+
+
+@cli.command()
+@click.argument('url')
+@click.option('--method', '-X', default='GET', show_default=True, help='HTTP method')
+@click.option('--concurrency', '-c', type=int, default=10, show_default=True,
+              help='Concurrent workers')
+@click.option('--requests', '-n', 'requests_total', type=int,
+              help='Total requests to send')
+@click.option('--duration', '-d', help='Run for this long, e.g. 30s, 5m')
+@click.option('--rate', '-R', type=float,
+              help='Open-loop target requests/sec (latency measured from schedule)')
+@click.option('--profile', '-p', help='Configuration profile to use')
+@click.option('--headers', '-H', multiple=True, help='Custom headers (key:value)')
+@click.option('--auth', '-a', help='Authentication (bearer <token> | basic user:pass)')
+@click.option('--timeout', '-t', type=float, help='Per-request timeout in seconds')
+@click.option('--data', help='Request body data')
+@click.option('--json-data', '-j', help='JSON request body')
+@click.option('--json', 'as_json', is_flag=True, help='Print the result as JSON')
+@click.pass_context
+def bench(ctx: click.Context, url: str, method: str, concurrency: int,
+          requests_total: Optional[int], duration: Optional[str], rate: Optional[float],
+          profile: Optional[str], headers, auth: Optional[str], timeout: Optional[float],
+          data: Optional[str], json_data: Optional[str], as_json: bool) -> None:
+    """Load test URL at a fixed concurrency or an open-loop target rate.
+    
+    Runs until --requests have been sent or --duration has elapsed
+    (1000 requests if neither is given).
+    """
+    from .bench import run_benchmark
+    from .utils import parse_duration
+    
+    try:
+        duration_seconds = parse_duration(duration) if duration else None
+        if requests_total is None and duration_seconds is None:
+            requests_total = 1000
+        
+        body_kwargs = {}
+        if data:
+            body_kwargs['data'] = data
+        elif json_data:
+            body_kwargs['json'] = json.loads(json_data)
+        
+        client = create_client(ctx.obj.get('config'))
+        result = run_benchmark(
+            url,
+            method=method,
+            concurrency=concurrency,
+            requests_total=requests_total,
+            duration=duration_seconds,
+            rate=rate,
+            client=client,
+            profile=profile,
+            headers=_parse_headers(headers) or None,
+            auth=parse_auth_string(auth) if auth else None,
+            timeout=timeout,
+            **body_kwargs
+        )
+    except (ValueError, ReqNinjaError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("\nBenchmark cancelled.", err=True)
+        sys.exit(1)
+    
+    stats = result.to_dict()
+    if as_json:
+        click.echo(json.dumps(stats, indent=2))
+        return
+    
+    latency = stats['latency_ms']
+    mode = (f"open loop @ {rate:g} req/s" if rate else "closed loop")
+    click.echo(f"Benchmark: {method.upper()} {url} ({mode}, {concurrency} workers)")
+    click.echo(f"Requests:  {stats['requests']} in {stats['duration_seconds']:.2f}s "
+               f"({stats['requests_per_second']:.1f} req/s)")
+    click.echo(f"Errors:    {stats['errors']}")
+    for status, count in stats['status_counts'].items():
+        click.echo(f"  {status}: {count}")
+    for name, count in stats['exceptions'].items():
+        click.echo(f"  {name}: {count}")
+    click.echo(f"Latency:   p50 {latency['p50']:.2f}ms  p90 {latency['p90']:.2f}ms  "
+               f"p99 {latency['p99']:.2f}ms  p99.9 {latency['p99.9']:.2f}ms  "
+               f"max {latency['max']:.2f}ms")
+
+
+@cli.command()
+@click.argument('url')
+@click.option('--output', '-o', help='File to write (default: name from the URL)')
+@click.option('--parts', '-n', type=int, default=4, show_default=True,
+              help='Byte ranges to fetch in parallel')
+@click.option('--no-resume', is_flag=True, help='Ignore progress saved by an earlier attempt')
+@click.option('--profile', '-p', help='Configuration profile to use')
+@click.option('--headers', '-H', multiple=True, help='Custom headers (key:value)')
+@click.option('--auth', '-a', help='Authentication (bearer <token> | basic user:pass)')
+@click.option('--timeout', '-t', type=float, help='Per-request timeout in seconds')
+@click.pass_context
+def download(ctx: click.Context, url: str, output: Optional[str], parts: int,
+             no_resume: bool, profile: Optional[str], headers, auth: Optional[str],
+             timeout: Optional[float]) -> None:
+    """Download URL, fetching byte ranges in parallel when the server allows.
+    
+    Interrupted downloads resume from a .rninja-state file next to the output.
+    """
+    try:
+        client = create_client(ctx.obj.get('config'))
+        result = client.download(
+            url,
+            output,
+            parts=parts,
+            resume=not no_resume,
+            profile=profile,
+            headers=_parse_headers(headers) or None,
+            auth=parse_auth_string(auth) if auth else None,
+            timeout=timeout
+        )
+    except (ValueError, ReqNinjaError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("\nDownload interrupted; run again to resume.", err=True)
+        sys.exit(1)
+    
+    mode = f"{result.parts} parts" if result.ranged else "single stream"
+    resumed = f", {result.resumed_bytes} bytes resumed" if result.resumed_bytes else ""
+    click.echo(f"Saved {result.path} ({result.size} bytes, {mode}{resumed}) in "
+               f"{result.elapsed_seconds:.2f}s ({result.bytes_per_second / 1e6:.1f} MB/s)")
+
+
 @cli.group()
 def config() -> None:
     """Manage configuration and profiles."""
@@ -1,42 +1,710 @@
 """Main HTTP client for ReqNinja with enhanced features."""
 
+import copy
 import time
-import json
-from typing import Dict, Any, Optional, Union
+import threading
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+)
 from urllib.parse import urljoin, urlparse
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
 
 from .config import Config
 from .response import ReqNinjaResponse
-from .exceptions import ReqNinjaError, InvalidURLError, RetryError
-from .auth import AuthHandler
+from .exceptions import CircuitOpenError, ConfigError, InvalidURLError, ReqNinjaError
+from .auth import AuthHandler, AuthScheme, config_key
+from .circuit import DEFAULT_CIRCUIT_BREAKER, SCOPES, CircuitBreaker, CircuitBreakers
+from .headers import HeaderLayers
+from .hooks import Hooks, RequestContext, bind_current, notify_retry
+from .timing import start_recording, stop_recording
+from .transport import TimedHTTPAdapter
+from .ratelimit import RateLimiter, RateLimiters
+from .retry import RetryBudget, RetryBudgets, RetryPolicy, RetryState, budget_settings
+from .singleflight import SINGLE_FLIGHT_METHODS, SingleFlight
+from .upload import MultipartEncoder, body_position, is_replayable
 
+if TYPE_CHECKING:
+    from .batch import BatchRun
+    from .cache import HttpCache
+    from .dns import DNSCache, Resolver
+    from .download import DownloadResult
+    from .hedging import HedgePolicy
+    from .metrics import MetricsRegistry
 
-class ReqNinjaClient:
-    """Enhanced HTTP client with retry logic, timing, and configuration."""
+
+class _BaseClient:
+    """Request preparation shared by the sync and async clients."""
     
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        metrics: Union[bool, "MetricsRegistry"] = False
+    ):
         self.config = config or Config()
-        self.session = requests.Session()
         self.auth_handler = AuthHandler()
+        self.hooks = Hooks()
+        self._retry_budgets = RetryBudgets(self.config.get('retry_budget'))
+        self._circuit_breakers = CircuitBreakers()
+        self._rate_limiters = RateLimiters()
+        hook_names = self.config.get('hooks')
+        if hook_names:
+            self.hooks.load(hook_names)
+        self.metrics_registry: Optional["MetricsRegistry"] = None
+        if metrics:
+            from .metrics import MetricsRegistry
+            
+            self.metrics_registry = (
+                metrics if isinstance(metrics, MetricsRegistry) else MetricsRegistry()
+            )
+    
+    def _retry_policy(
+        self,
+        config: Mapping[str, Any],
+        retries: Optional[int] = None
+    ) -> RetryPolicy:
+        """The profile's retry policy; ``retries`` overrides its total."""
+        if retries is not None:
+            return RetryPolicy.from_config(config.get('retry_policy'), retries)
+        derived = getattr(config, 'derived', None)
+        policy = derived.get('retry_policy') if derived is not None else None
+        if policy is None:
+            policy = RetryPolicy.from_config(config.get('retry_policy'))
+            if derived is not None:
+                derived['retry_policy'] = policy
+        return policy
+    
+    def _circuit_breaker(
+        self,
+        config: Mapping[str, Any],
+        final_url: str
+    ) -> Optional[CircuitBreaker]:
+        """The circuit breaker guarding a request, or None when disabled.
+        
+        Breakers are shared per host (or per profile with ``scope: profile``)
+        and built from the settings of the first profile that uses them.
+        """
+        derived = getattr(config, 'derived', None)
+        if derived is not None and 'circuit_breaker' in derived:
+            settings = derived['circuit_breaker']
+        else:
+            settings = config.get('circuit_breaker') or {}
+            settings = (
+                {**DEFAULT_CIRCUIT_BREAKER, **settings}
+                if settings.get('enabled') else None
+            )
+            if settings is not None and settings['scope'] not in SCOPES:
+                raise ConfigError(
+                    f"circuit_breaker.scope must be one of {', '.join(SCOPES)}"
+                )
+            if derived is not None:
+                derived['circuit_breaker'] = settings
+        if settings is None:
+            return None
+        if settings['scope'] == 'profile':
+            key = f"profile:{getattr(config, 'name', None) or 'default'}"
+        else:
+            key = urlparse(final_url).netloc
+        return self._circuit_breakers.get(key, settings)
+    
+    def circuit_breaker_stats(self) -> Dict[str, Dict[str, Any]]:
+        """State, failure and slow call rates and rejections, per breaker."""
+        return self._circuit_breakers.stats()
+    
+    def _rate_limiter(self, config: Mapping[str, Any]) -> Optional[RateLimiter]:
+        """The profile's shared rate limiter, or None without a ``rate_limit``.
+        
+        Limiters belong to the client; the profile only memoizes its name
+        and settings.
+        """
+        derived = getattr(config, 'derived', None)
+        if derived is not None and 'rate_limit' in derived:
+            entry = derived['rate_limit']
+        else:
+            settings = config.get('rate_limit') or {}
+            entry = None
+            if settings.get('requests_per_second') or settings.get('max_concurrency'):
+                entry = (getattr(config, 'name', None) or 'default', dict(settings))
+            if derived is not None:
+                derived['rate_limit'] = entry
+        if entry is None:
+            return None
+        return self._rate_limiters.get(*entry)
+    
+    def rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Configured and adapted pace and time spent waiting, per profile."""
+        return self._rate_limiters.stats()
+    
+    def _retry_budget(
+        self,
+        config: Mapping[str, Any],
+        final_url: str
+    ) -> Optional[RetryBudget]:
+        """The retry budget of the request's host, or None when disabled.
+        
+        Budgets belong to the client and follow ``retry_budget`` when the
+        config file is reloaded; the profile only memoizes the settings.
+        """
+        derived = getattr(config, 'derived', None)
+        if derived is not None and 'retry_budget' in derived:
+            settings = derived['retry_budget']
+        else:
+            settings = budget_settings(config.get('retry_budget'))
+            if derived is not None:
+                derived['retry_budget'] = settings
+        return self._retry_budgets.for_host(urlparse(final_url).netloc, settings)
+    
+    def retry_budget_stats(self) -> Dict[str, Dict[str, float]]:
+        """Retry tokens left and retries refused, per host."""
+        return self._retry_budgets.stats()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Request counters and latency percentiles; empty unless metrics are on."""
+        if self.metrics_registry is None:
+            return {}
+        return self.metrics_registry.snapshot()
+    
+    def prometheus_metrics(self) -> str:
+        """Metrics in the Prometheus text format; empty unless metrics are enabled."""
+        if self.metrics_registry is None:
+            return ''
+        return self.metrics_registry.to_prometheus()
+    
+    def _record_metrics(
+        self,
+        config: Mapping[str, Any],
+        method: str,
+        final_url: str,
+        response: Optional[ReqNinjaResponse],
+        elapsed_ms: float
+    ) -> None:
+        """Record one upstream request; ``response`` is None if it failed."""
+        profile = getattr(config, 'name', None)
+        host = urlparse(final_url).netloc
+        if response is None:
+            self.metrics_registry.record(profile, host, method, None, elapsed_ms)
+            return
+        raw = response._response
+        request = raw.request
+        # Chunked bodies have no Content-Length and are not counted
+        bytes_out = 0
+        if request is not None:
+            bytes_out = int(request.headers.get('Content-Length') or 0)
+        if response.body_pending:
+            bytes_in = int(raw.headers.get('Content-Length') or 0)
+        else:
+            bytes_in = len(raw._content or b'')
+        retries = response.timings.attempts - 1 if response.timings is not None else 0
+        self.metrics_registry.record(
+            profile, host, method, raw.status_code, elapsed_ms, retries,
+            bytes_out, bytes_in
+        )
+    
+    def _prepare_request(
+        self,
+        url: str,
+        profile: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        auth: Optional[Dict[str, str]] = None,
+        timeout: Optional[int] = None,
+        method: str = 'GET',
+        data: Any = None,
+        json: Any = None,
+        params: Any = None
+    ) -> Tuple[Mapping[str, Any], str, HeaderLayers, Union[int, float]]:
+        """Resolve profile, URL, headers and timeout for a request.
+        
+        ``method``, ``data``, ``json`` and ``params`` are only used by auth
+        schemes that sign each request.
+        """
+        
+        # Resolve configuration (cached by Config until it changes)
+        config = self.config.resolve_profile(profile)
+        
+        # Prepare URL
+        final_url = self._prepare_url(url, config.get('base_url'))
+        
+        # Layer headers: defaults -> profile -> auth -> per-call. The profile
+        # layers, including static profile auth, are flattened once per
+        # resolved profile and shared; per-call auth headers are memoized by
+        # the auth handler, and only signing schemes run per request.
+        scheme = self._auth_scheme(config, auth)
+        if auth or (scheme is not None and scheme.per_request):
+            # Sign the query string the server will actually receive
+            signed_url = self._url_with_params(final_url, params)
+            final_headers = self._header_layers(config, with_auth=False).with_layer(
+                scheme.sign(method, signed_url, data, json), headers
+            )
+        else:
+            final_headers = self._header_layers(config).with_layer(headers)
+        
+        # Setup timeout
+        final_timeout = timeout or config.get('timeout', 30)
+        
+        return config, final_url, final_headers, final_timeout
+    
+    def _auth_scheme(
+        self,
+        config: Mapping[str, Any],
+        auth: Optional[Mapping[str, Any]] = None
+    ) -> Optional[AuthScheme]:
+        """The auth scheme for a request: per-call ``auth`` or the profile's."""
+        if auth:
+            return self.auth_handler.scheme(auth)
+        # Schemes belong to the client's auth handler (OAuth2 tokens, for
+        # one); the profile only memoizes the key of its auth config
+        auth_config = config.get('auth')
+        if not auth_config:
+            return None
+        derived = getattr(config, 'derived', None)
+        key = derived.get('auth_key') if derived is not None else None
+        if key is None:
+            key = config_key(auth_config)
+            if derived is not None:
+                derived['auth_key'] = key
+        return self.auth_handler.scheme(auth_config, key)
+    
+    def _header_layers(
+        self,
+        config: Mapping[str, Any],
+        with_auth: bool = True
+    ) -> HeaderLayers:
+        """Precomputed profile headers, optionally including static profile auth."""
+        key = 'header_layers' if with_auth else 'header_layers_no_auth'
+        derived = getattr(config, 'derived', None)
+        layers = derived.get(key) if derived is not None else None
+        if layers is None:
+            auth_headers = None
+            if with_auth:
+                scheme = self._auth_scheme(config)
+                if scheme is not None and not scheme.per_request:
+                    auth_headers = scheme.headers
+            layers = HeaderLayers(config.get('headers'), auth_headers)
+            if derived is not None:
+                derived[key] = layers
+        return layers
+    
+    def _prepare_url(self, url: str, base_url: Optional[str] = None) -> str:
+        """Prepare the final URL, handling relative paths and base URLs."""
+        if not url:
+            raise InvalidURLError("URL cannot be empty")
+        
+        # If URL is already absolute, return as-is
+        parsed = urlparse(url)
+        if parsed.scheme:
+            return url
+        
+        # If we have a base URL, join them
+        if base_url:
+            return urljoin(base_url.rstrip('/') + '/', url.lstrip('/'))
+        
+        # If URL starts with /, assume localhost
+        if url.startswith('/'):
+            return f"http://localhost{url}"
+        
+        raise InvalidURLError(
+            f"Invalid URL: {url}. Provide absolute URL or set base_url in profile"
+        )
+    
+    @staticmethod
+    def _url_with_params(url: str, params: Any) -> str:
+        """``url`` with ``params`` encoded into its query, as requests sends it."""
+        if not params:
+            return url
+        prepared = requests.PreparedRequest()
+        prepared.prepare_url(url, params)
+        return prepared.url
+
+
+# urllib3/requests defaults, used when config.yml does not size the pool
+DEFAULT_POOL_SETTINGS = {
+    'pool_connections': 10,
+    'pool_maxsize': 10,
+    'pool_block': False,
+}
+
+# Sessions kept warm for distinct connection pool settings, unless
+# config.yml sets session_cache_size
+DEFAULT_SESSION_CACHE_SIZE = 8
+
+# Pool sizing plus the DNS resolver its connections use, if any
+SessionKey = Tuple[int, int, bool, Optional["Resolver"]]
+
+# Hashable key of a ``dns`` section and the settings merged with defaults
+DNSSettings = Tuple[Tuple[Tuple[str, str], ...], Dict[str, Any]]
+
+
+def _pool_key(pool_config: Optional[Mapping[str, Any]]) -> Tuple[int, int, bool]:
+    """Normalise connection pool settings into a hashable key."""
+    settings = {**DEFAULT_POOL_SETTINGS, **(pool_config or {})}
+    return (
+        int(settings['pool_connections']),
+        int(settings['pool_maxsize']),
+        bool(settings['pool_block']),
+    )
+
+
+def _dns_settings(settings: Optional[Mapping[str, Any]]) -> Optional[DNSSettings]:
+    """A hashable key and the full settings of a ``dns`` section, or None when off."""
+    if not settings or not settings.get('enabled'):
+        return None
+    from .dns import DEFAULT_DNS
+    
+    settings = {**DEFAULT_DNS, **settings}
+    return tuple(sorted((k, repr(v)) for k, v in settings.items())), settings
+
+
+def _is_connect_error(error: requests.exceptions.RequestException) -> bool:
+    """Whether ``error`` happened before the request reached the server."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def _coalescible(method: str, kwargs: Mapping[str, Any]) -> bool:
+    """Whether a request may share an in-flight identical one."""
+    if method.upper() not in SINGLE_FLIGHT_METHODS or kwargs.get('stream'):
+        return False
+    return all(kwargs.get(name) is None for name in ('data', 'json', 'files'))
+
+
+def _shared_view(response: ReqNinjaResponse) -> ReqNinjaResponse:
+    """A separate ReqNinjaResponse over another caller's completed response."""
+    raw = copy.copy(response._response)
+    raw.headers = CaseInsensitiveDict(raw.headers)
+    raw.history = list(raw.history)
+    view = ReqNinjaResponse(
+        raw, response.start_time, response.end_time, response.timings, response.attempts
+    )
+    view.cache_status = response.cache_status
+    view.coalesced = True
+    return view
+
+
+class ReqNinjaClient(_BaseClient):
+    """Enhanced HTTP client with retry logic, timing, and configuration."""
+    
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        metrics: Union[bool, "MetricsRegistry"] = False
+    ):
+        super().__init__(config, metrics)
+        self._sessions: "OrderedDict[SessionKey, requests.Session]" = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self._http_caches: Dict[Tuple[Tuple[str, str], ...], "HttpCache"] = {}
+        self._single_flight = SingleFlight()
+        self._hedge_policies: Dict[Tuple[Tuple[str, str], ...], "HedgePolicy"] = {}
+        self._dns_cache: Optional["DNSCache"] = None
+        self._resolvers: Dict[Tuple[Tuple[str, str], ...], "Resolver"] = {}
+        self._session_cache_size = max(
+            1, int(self.config.get('session_cache_size', DEFAULT_SESSION_CACHE_SIZE))
+        )
         self._setup_session()
     
     def _setup_session(self) -> None:
-        """Setup session with retry policy and adapters."""
-        retry_policy = self.config.get('retry_policy', {})
-        
-        retry_strategy = Retry(
-            total=retry_policy.get('total', 3),
-            status_forcelist=retry_policy.get('status_forcelist', [429, 500, 502, 503, 504]),
-            backoff_factor=retry_policy.get('backoff_factor', 0.5),
-            raise_on_status=False
+        """Setup the default session from the global pool and DNS settings."""
+        self._default_session_key = (
+            *_pool_key(self.config.get('connection_pool', {})),
+            self._resolver(_dns_settings(self.config.get('dns'))),
         )
+        self.session = self._build_session(self._default_session_key)
+    
+    def _build_session(self, key: SessionKey) -> requests.Session:
+        """Build a session with sized connection pools.
+        
+        urllib3 never retries; retries are handled by ``_send`` so they
+        honour the retry budget and are recorded per attempt.
+        """
+        pool_connections, pool_maxsize, pool_block, resolver = key
+        adapter = TimedHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0,
+            resolver=resolver
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def _resolver(self, entry: Optional[DNSSettings]) -> Optional["Resolver"]:
+        """The resolver for ``_dns_settings`` output, or None when DNS caching is off.
+        
+        Resolvers with equal settings are shared, and all of them share
+        one cache sized by the global ``dns`` settings.
+        """
+        if entry is None:
+            return None
+        key, settings = entry
+        resolver = self._resolvers.get(key)
+        if resolver is not None:
+            return resolver
+        from .dns import DEFAULT_DNS, DNSCache, Resolver
+        
+        with self._sessions_lock:
+            resolver = self._resolvers.get(key)
+            if resolver is None:
+                if self._dns_cache is None:
+                    cache_settings = {**DEFAULT_DNS, **(self.config.get('dns') or {})}
+                    self._dns_cache = DNSCache(
+                        cache_settings['ttl'],
+                        cache_settings['negative_ttl'],
+                        cache_settings['max_entries'],
+                    )
+                resolver = self._resolvers[key] = Resolver(
+                    self._dns_cache
+                    if settings['ttl'] or settings['negative_ttl'] else None,
+                    settings['overrides'],
+                    bool(settings['happy_eyeballs']),
+                    float(settings['happy_eyeballs_delay_ms']) / 1000,
+                )
+        return resolver
+    
+    def dns_stats(self) -> Dict[str, int]:
+        """DNS cache hits, misses, cached failures and override uses."""
+        with self._sessions_lock:
+            cache = self._dns_cache
+            resolvers = list(self._resolvers.values())
+        stats = cache.stats() if cache is not None else {
+            'hits': 0, 'misses': 0, 'negative_hits': 0, 'entries': 0,
+        }
+        stats['overrides'] = sum(resolver.override_hits for resolver in resolvers)
+        return stats
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Request counters and latency percentiles, plus DNS cache counters."""
+        snapshot = super().metrics()
+        if snapshot and self._dns_cache is not None:
+            snapshot['dns'] = self.dns_stats()
+        return snapshot
+    
+    def prometheus_metrics(self) -> str:
+        """Metrics in the Prometheus text format, including DNS lookups when cached."""
+        text = super().prometheus_metrics()
+        if not text or self._dns_cache is None:
+            return text
+        stats = self.dns_stats()
+        name = 'reqninja_dns_lookups_total'
+        lines = [
+            f'# HELP {name} Address lookups for new connections, by result.',
+            f'# TYPE {name} counter',
+        ]
+        for result, field in (
+            ('hit', 'hits'), ('miss', 'misses'),
+            ('negative_hit', 'negative_hits'), ('override', 'overrides'),
+        ):
+            lines.append(f'{name}{{result="{result}"}} {stats[field]}')
+        return text + '\n'.join(lines) + '\n'
+    
+    def clear_dns_cache(self) -> None:
+        """Forget cached DNS answers; pooled connections are kept."""
+        with self._sessions_lock:
+            cache = self._dns_cache
+        if cache is not None:
+            cache.clear()
+    
+    def _session_for(self, config: Mapping[str, Any]) -> requests.Session:
+        """Return a warm session matching the effective pool and DNS settings.
+        
+        The default session is always kept. Sessions for profiles with
+        their own connection_pool or dns settings live in a small LRU
+        cache; the least recently used one is closed when the cache is full.
+        """
+        # Resolvers belong to the client; the profile only memoizes settings
+        derived = getattr(config, 'derived', None)
+        settings = derived.get('session_settings') if derived is not None else None
+        if settings is None:
+            settings = (
+                _pool_key(config.get('connection_pool')),
+                _dns_settings(config.get('dns')),
+            )
+            if derived is not None:
+                derived['session_settings'] = settings
+        pool_key, dns_settings = settings
+        key = (*pool_key, self._resolver(dns_settings))
+        if key == self._default_session_key:
+            return self.session
+        
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+            session = self._sessions[key] = self._build_session(key)
+            if len(self._sessions) > self._session_cache_size:
+                _, evicted = self._sessions.popitem(last=False)
+                # In-flight requests on the evicted session still complete;
+                # its idle connections are released
+                evicted.close()
+        return session
+    
+    def _http_cache(self, config: Mapping[str, Any]) -> Optional["HttpCache"]:
+        """The HTTP cache for a profile, or None when caching is disabled.
+        
+        Profiles with identical cache settings share one cache. Caches
+        belong to the client; the profile only memoizes the settings key.
+        """
+        derived = getattr(config, 'derived', None)
+        if derived is not None and 'http_cache_settings' in derived:
+            entry = derived['http_cache_settings']
+        else:
+            settings = config.get('cache') or {}
+            entry = None
+            if settings.get('enabled'):
+                from .cache import DEFAULT_CACHE_SETTINGS
+                
+                settings = {**DEFAULT_CACHE_SETTINGS, **settings}
+                key = tuple(sorted((k, str(v)) for k, v in settings.items()))
+                entry = (key, settings)
+            if derived is not None:
+                derived['http_cache_settings'] = entry
+        if entry is None:
+            return None
+        
+        key, settings = entry
+        cache = self._http_caches.get(key)
+        if cache is None:
+            from .cache import HttpCache
+            
+            with self._sessions_lock:
+                cache = self._http_caches.get(key)
+                if cache is None:
+                    cache = self._http_caches[key] = HttpCache.from_settings(settings)
+        return cache
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit, miss, revalidation and store counters summed over all caches."""
+        totals = {
+            'hits': 0, 'misses': 0, 'revalidations': 0, 'stores': 0,
+            'invalidations': 0, 'entries': 0, 'size_bytes': 0,
+        }
+        with self._sessions_lock:
+            caches = list(self._http_caches.values())
+        for cache in caches:
+            for name, value in cache.stats().items():
+                totals[name] += value
+        return totals
+    
+    def clear_cache(self) -> None:
+        """Remove every stored response from this client's caches."""
+        with self._sessions_lock:
+            caches = list(self._http_caches.values())
+        for cache in caches:
+            cache.clear()
+    
+    def _hedge_policy(
+        self,
+        config: Mapping[str, Any],
+        hedge: Optional[bool],
+        method: str,
+        kwargs: Mapping[str, Any]
+    ) -> Optional["HedgePolicy"]:
+        """The hedging policy for a request, or None if it is not hedged.
+        
+        Only GET and HEAD requests without a body or ``stream=True`` are
+        hedged. ``hedge`` turns hedging on or off for one call; otherwise
+        the profile's ``hedging`` settings decide. Profiles with identical
+        settings share one policy and its latency tracking.
+        """
+        if hedge is False or kwargs.get('stream'):
+            return None
+        if method.upper() not in ('GET', 'HEAD'):
+            return None
+        if any(kwargs.get(name) is not None for name in ('data', 'json', 'files')):
+            return None
+        # Policies belong to the client; the profile only memoizes settings
+        key = 'hedge_settings_forced' if hedge else 'hedge_settings'
+        derived = getattr(config, 'derived', None)
+        if derived is not None and key in derived:
+            entry = derived[key]
+        else:
+            settings = config.get('hedging') or {}
+            entry = None
+            if hedge or settings.get('enabled'):
+                from .hedging import DEFAULT_HEDGING, hedge_key
+                
+                settings = {**DEFAULT_HEDGING, **settings}
+                entry = (hedge_key(settings), settings)
+            if derived is not None:
+                derived[key] = entry
+        if entry is None:
+            return None
+        
+        policy_key, settings = entry
+        policy = self._hedge_policies.get(policy_key)
+        if policy is None:
+            from .hedging import HedgePolicy
+            
+            with self._sessions_lock:
+                policy = self._hedge_policies.get(policy_key)
+                if policy is None:
+                    policy = self._hedge_policies[policy_key] = HedgePolicy(settings)
+        return policy
+    
+    def hedge_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hedges sent and won, hedge delay and hedge tokens left, per host."""
+        with self._sessions_lock:
+            policies = list(self._hedge_policies.values())
+        stats: Dict[str, Dict[str, Any]] = {}
+        for policy in policies:
+            stats.update(policy.stats())
+        return stats
+    
+    def close(self) -> None:
+        """Close all sessions and their pooled connections."""
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            policies = list(self._hedge_policies.values())
+        for policy in policies:
+            policy.close()
+        self.session.close()
+    
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Report per-host connection pool usage across all sessions.
+        
+        For each ``scheme://host:port`` returns the number of new
+        connections opened, requests sent, idle sockets currently pooled,
+        the configured ``pool_maxsize`` and the connection reuse ratio.
+        """
+        with self._sessions_lock:
+            sessions = [self.session, *self._sessions.values()]
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        stats: Dict[str, Dict[str, Any]] = {}
+        for session in sessions:
+            adapters = {id(a): a for a in session.adapters.values()}.values()
+            for adapter in adapters:
+                pools = adapter.poolmanager.pools
+                with pools.lock:
+                    host_pools = list(pools._container.values())
+                for pool in host_pools:
+                    host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                    entry = stats.setdefault(host, {
+                        'new_connections': 0,
+                        'requests': 0,
+                        'idle_connections': 0,
+                        'pool_maxsize': 0,
+                    })
+                    entry['new_connections'] += pool.num_connections
+                    entry['requests'] += pool.num_requests
+                    if pool.pool is not None:
+                        # The queue is pre-filled with None placeholders
+                        entry['idle_connections'] += sum(
+                            1 for conn in list(pool.pool.queue) if conn is not None
+                        )
+                        entry['pool_maxsize'] += pool.pool.maxsize
+        
+        for entry in stats.values():
+            reused = max(0, entry['requests'] - entry['new_connections'])
+            requests_sent = entry['requests']
+            entry['reuse_ratio'] = reused / requests_sent if requests_sent else 0.0
+        return stats
     
     def request(
         self,
@@ -47,28 +715,212 @@ class ReqNinjaClient:
         auth: Optional[Dict[str, str]] = None,
         timeout: Optional[int] = None,
         retries: Optional[int] = None,
+        hedge: Optional[bool] = None,
         **kwargs
     ) -> ReqNinjaResponse:
-        """Make an HTTP request with enhanced features."""
+        """Make an HTTP request with enhanced features.
         
-        # Merge configuration
-        config = self.config.merge_profile_config(profile)
+        ``hedge=True`` sends a GET or HEAD a second time if it is slow and
+        returns whichever response arrives first (see ``hedging`` in
+        config.yml); ``hedge=False`` turns that off for one call.
         
-        # Prepare URL
-        final_url = self._prepare_url(url, config.get('base_url'))
+        ``data`` may be a file object, an iterator of bytes, an mmap or a
+        ``MultipartEncoder``; these are streamed rather than loaded into
+        memory. Sized, seekable bodies are sent with a Content-Length and
+        rewound for retries; iterators are sent chunked and never retried.
+        """
         
-        # Prepare headers
-        final_headers = config.get('headers', {}).copy()
-        if headers:
-            final_headers.update(headers)
+        data = kwargs.get('data')
+        config, final_url, final_headers, final_timeout = self._prepare_request(
+            url, profile, headers, auth, timeout, method,
+            data, kwargs.get('json'), kwargs.get('params')
+        )
         
-        # Setup authentication
-        if auth or config.get('auth'):
-            auth_config = auth or config.get('auth')
-            final_headers.update(self.auth_handler.get_auth_headers(auth_config))
+        if data is not None:
+            multipart = isinstance(data, MultipartEncoder)
+            if multipart and 'Content-Type' not in final_headers:
+                final_headers = final_headers.with_layer(
+                    {'Content-Type': data.content_type}
+                )
+            if not is_replayable(data):
+                # A one-shot stream would be resent empty on retry
+                retries = 0
+        # Retries and re-authentication rewind file bodies to here
+        position = body_position(data)
         
-        # Setup timeout and retries
-        final_timeout = timeout or config.get('timeout', 30)
+        context = None
+        if self.hooks.active:
+            context = RequestContext(
+                method.upper(), final_url, final_headers, profile, kwargs
+            )
+            self.hooks.before_request(context)
+            final_url, final_headers = context.url, context.headers
+        
+        session = self._session_for(config)
+        policy = self._retry_policy(config, retries)
+        breaker = self._circuit_breaker(config, final_url)
+        limiter = self._rate_limiter(config)
+        budget = self._retry_budget(config, final_url) if policy.total else None
+        
+        def send(send_headers: HeaderLayers) -> ReqNinjaResponse:
+            return self._send(
+                session, method, final_url, send_headers, final_timeout, kwargs, policy,
+                breaker, limiter, budget, position
+            )
+        
+        if self.metrics_registry is not None:
+            send = self._metered(send, config, method, final_url)
+        
+        scheme = self._auth_scheme(config, auth)
+        if scheme is not None and scheme.refreshable and is_replayable(data):
+            send = self._reauthenticating(send, scheme)
+        
+        hedge_policy = self._hedge_policy(config, hedge, method, kwargs)
+        if hedge_policy is not None:
+            send = self._hedged(send, hedge_policy, config, method, final_url)
+        
+        if config.get('single_flight') and _coalescible(method, kwargs):
+            send = self._coalesced(send, method, final_url, kwargs)
+        
+        cache = None if kwargs.get('stream') else self._http_cache(config)
+        if context is not None:
+            if cache is not None:
+                return self.hooks.run(
+                    context,
+                    lambda: cache.fetch(method.upper(), final_url, final_headers, send)
+                )
+            return self.hooks.run(context, lambda: send(final_headers))
+        if cache is not None:
+            return cache.fetch(method.upper(), final_url, final_headers, send)
+        return send(final_headers)
+    
+    def _metered(
+        self,
+        send: Callable[[HeaderLayers], ReqNinjaResponse],
+        config: Mapping[str, Any],
+        method: str,
+        final_url: str
+    ) -> Callable[[HeaderLayers], ReqNinjaResponse]:
+        """Wrap ``send`` to record each upstream request in the metrics registry."""
+        
+        def metered_send(send_headers: HeaderLayers) -> ReqNinjaResponse:
+            started = time.perf_counter()
+            try:
+                response = send(send_headers)
+            except CircuitOpenError:
+                # Refused without sending anything
+                raise
+            except ReqNinjaError:
+                self._record_metrics(
+                    config, method, final_url, None,
+                    (time.perf_counter() - started) * 1000
+                )
+                raise
+            self._record_metrics(
+                config, method, final_url, response,
+                (time.perf_counter() - started) * 1000
+            )
+            return response
+        
+        return metered_send
+    
+    def _reauthenticating(
+        self,
+        send: Callable[[HeaderLayers], ReqNinjaResponse],
+        scheme: AuthScheme
+    ) -> Callable[[HeaderLayers], ReqNinjaResponse]:
+        """Wrap ``send`` to refresh expired credentials once on a 401."""
+        
+        def reauthenticating_send(send_headers: HeaderLayers) -> ReqNinjaResponse:
+            response = send(send_headers)
+            if response.status_code == 401:
+                fresh = scheme.refresh(send_headers)
+                if fresh is not None:
+                    response.close()
+                    response = send(send_headers.with_layer(fresh))
+            return response
+        
+        return reauthenticating_send
+    
+    def _hedged(
+        self,
+        send: Callable[[HeaderLayers], ReqNinjaResponse],
+        policy: "HedgePolicy",
+        config: Mapping[str, Any],
+        method: str,
+        final_url: str
+    ) -> Callable[[HeaderLayers], ReqNinjaResponse]:
+        """Wrap ``send`` to hedge slow requests per ``policy``."""
+        host = urlparse(final_url).netloc
+        registry = self.metrics_registry
+        profile = getattr(config, 'name', None)
+        
+        def on_hedge(response: ReqNinjaResponse, won: bool) -> None:
+            if registry is not None:
+                registry.record_hedge(profile, host, method, response.status_code, won)
+        
+        def hedged_send(send_headers: HeaderLayers) -> ReqNinjaResponse:
+            # The hedge runs on another thread but is the same hooked request
+            return policy.run(host, bind_current(lambda: send(send_headers)), on_hedge)
+        
+        return hedged_send
+    
+    def _coalesced(
+        self,
+        send: Callable[[HeaderLayers], ReqNinjaResponse],
+        method: str,
+        final_url: str,
+        kwargs: Dict[str, Any]
+    ) -> Callable[[HeaderLayers], ReqNinjaResponse]:
+        """Wrap ``send`` so identical concurrent requests share one call.
+        
+        Requests are identical when method, final URL, effective headers
+        and other request options match. Callers that joined an in-flight
+        request get their own response object over the shared result.
+        """
+        options = repr(sorted(kwargs.items())) if kwargs else ''
+        
+        def coalesced_send(send_headers: HeaderLayers) -> ReqNinjaResponse:
+            key = (
+                method.upper(),
+                final_url,
+                tuple(sorted(
+                    (name.lower(), value) for name, value in send_headers.items()
+                    if value is not None
+                )),
+                options,
+            )
+            response, shared = self._single_flight.do(key, lambda: send(send_headers))
+            return _shared_view(response) if shared else response
+        
+        return coalesced_send
+    
+    def single_flight_stats(self) -> Dict[str, int]:
+        """Upstream calls made and callers served by joining one in flight."""
+        return self._single_flight.stats()
+    
+    def _send(
+        self,
+        session: requests.Session,
+        method: str,
+        final_url: str,
+        final_headers: HeaderLayers,
+        final_timeout: Union[int, float],
+        kwargs: Dict[str, Any],
+        policy: RetryPolicy,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[RateLimiter] = None,
+        budget: Optional[RetryBudget] = None,
+        body_position: Optional[int] = None
+    ) -> ReqNinjaResponse:
+        """Send a request over ``session``, retrying per ``policy``; wrap the response.
+        
+        With a ``breaker``, an open circuit raises :class:`CircuitOpenError`
+        before anything is sent, and stops retries once it opens. With a
+        ``limiter``, every attempt waits for its turn and its response
+        headers adjust the pace. Retries draw on the host's ``budget``. A
+        file body is sought to ``body_position`` before every attempt.
+        """
         
         # Prepare request kwargs
         request_kwargs = {
@@ -77,13 +929,78 @@ class ReqNinjaClient:
             **kwargs
         }
         
-        # Make the request with timing
+        state = RetryState(policy, method, budget)
+        body = kwargs.get('data')
+        
+        if breaker is not None:
+            breaker.check()
+        held = breaker is not None
+        
+        # Make the request, recording per-phase timing on this thread
         start_time = time.time()
+        recorder = start_recording()
         try:
-            response = self.session.request(method, final_url, **request_kwargs)
-        except requests.exceptions.RequestException as e:
-            raise ReqNinjaError(f"Request failed: {e}")
-        
+            while True:
+                if body_position is not None:
+                    body.seek(body_position)
+                state.begin()
+                error = None
+                if limiter is not None:
+                    queued = time.perf_counter_ns()
+                    limiter.acquire()
+                    recorder.rate_limit_wait_ns += time.perf_counter_ns() - queued
+                try:
+                    try:
+                        response = session.request(method, final_url, **request_kwargs)
+                    finally:
+                        if limiter is not None:
+                            limiter.release()
+                except (
+                    requests.exceptions.ConnectionError, requests.exceptions.Timeout
+                ) as e:
+                    error = e
+                    delay = state.finish(error=e, connect_error=_is_connect_error(e))
+                except requests.exceptions.RequestException as e:
+                    state.finish(error=e)
+                    if breaker is not None:
+                        held = False
+                        breaker.record(None, state.attempts[-1].latency_ms, error=True)
+                    raise ReqNinjaError(f"Request failed: {e}")
+                else:
+                    delay = state.finish(response.status_code, response.headers)
+                    if limiter is not None:
+                        limiter.update(response.status_code, response.headers)
+                
+                if breaker is not None:
+                    breaker.record(
+                        None if error else response.status_code,
+                        state.attempts[-1].latency_ms,
+                        error=error is not None
+                    )
+                    if delay is not None and not breaker.allow():
+                        # The circuit opened meanwhile: keep this outcome
+                        delay = None
+                    held = delay is not None
+                if delay is None:
+                    if error is not None:
+                        raise ReqNinjaError(f"Request failed: {error}")
+                    break
+                if error is None:
+                    response.close()
+                
+                status = None if error else response.status_code
+                notify_retry(len(state.attempts), status, error)
+                if delay:
+                    slept = time.perf_counter_ns()
+                    time.sleep(delay)
+                    recorder.retry_wait_ns += time.perf_counter_ns() - slept
+        finally:
+            if held:
+                # Ended without an outcome (a bad argument, an interrupt)
+                breaker.release()
+            stop_recording(recorder)
+        recorder.attempts = len(state.attempts)
+        timings = recorder.finish()
         end_time = time.time()
         
         # Check for HTTP errors
@@ -91,27 +1008,74 @@ class ReqNinjaClient:
             # Don't raise by default, let user handle
             pass
         
-        return ReqNinjaResponse(response, start_time, end_time)
+        return ReqNinjaResponse(response, start_time, end_time, timings, state.attempts)
     
-    def _prepare_url(self, url: str, base_url: Optional[str] = None) -> str:
-        """Prepare the final URL, handling relative paths and base URLs."""
-        if not url:
-            raise InvalidURLError("URL cannot be empty")
+    def batch(
+        self,
+        specs: Iterable[Any],
+        concurrency: int = 10,
+        ordered: bool = False,
+        timeout: Optional[float] = None,
+        fail_fast: bool = False,
+        max_errors: int = 100
+    ) -> "BatchRun":
+        """Run many requests concurrently over this client's session.
         
-        # If URL is already absolute, return as-is
-        parsed = urlparse(url)
-        if parsed.scheme:
-            return url
+        ``specs`` is any iterable of ``RequestSpec`` objects or dicts with
+        ``method``, ``url``, ``profile``, ``headers`` and ``body`` keys. The
+        returned ``BatchRun`` yields responses in completion order (or input
+        order when ``ordered=True``) and exposes aggregate ``stats``. The
+        first ``max_errors`` failures are kept in ``errors``.
+        """
+        from .batch import BatchRun
         
-        # If we have a base URL, join them
-        if base_url:
-            return urljoin(base_url.rstrip('/') + '/', url.lstrip('/'))
+        return BatchRun(
+            self, specs,
+            concurrency=concurrency,
+            ordered=ordered,
+            timeout=timeout,
+            fail_fast=fail_fast,
+            max_errors=max_errors
+        )
+    
+    def download(
+        self,
+        url: str,
+        path: Optional[str] = None,
+        parts: int = 4,
+        resume: bool = True,
+        **kwargs
+    ) -> "DownloadResult":
+        """Download ``url`` to ``path`` using parallel byte ranges.
         
-        # If URL starts with /, assume localhost
-        if url.startswith('/'):
-            return f"http://localhost{url}"
+        See ``reqninja.download.download`` for details; ``profile``,
+        ``headers``, ``auth`` and ``timeout`` are passed to every request.
+        """
+        from .download import download
         
-        raise InvalidURLError(f"Invalid URL: {url}. Provide absolute URL or set base_url in profile")
+        return download(self, url, path, parts=parts, resume=resume, **kwargs)
+    
+    def map(
+        self,
+        method: str,
+        urls: Iterable[str],
+        concurrency: int = 10,
+        ordered: bool = True,
+        timeout: Optional[float] = None,
+        fail_fast: bool = False,
+        max_errors: int = 100,
+        **kwargs
+    ) -> "BatchRun":
+        """Send the same kind of request to many URLs concurrently."""
+        specs = ({'method': method, 'url': url, **kwargs} for url in urls)
+        return self.batch(
+            specs,
+            concurrency=concurrency,
+            ordered=ordered,
+            timeout=timeout,
+            fail_fast=fail_fast,
+            max_errors=max_errors
+        )
     
     def get(self, url: str, **kwargs) -> ReqNinjaResponse:
         """Make a GET request."""
@@ -142,45 +1106,59 @@ class ReqNinjaClient:
         return self.request('OPTIONS', url, **kwargs)
 
 
-# Global client instance
-_default_client = ReqNinjaClient()
+# Global client instance, created on first use so that importing reqninja
+# does not read config files or build a session.
+_default_client: Optional[ReqNinjaClient] = None
+_default_client_lock = threading.Lock()
+
+
+def _get_default_client() -> ReqNinjaClient:
+    """Return the shared default client, creating it on first use."""
+    global _default_client
+    client = _default_client
+    if client is None:
+        with _default_client_lock:
+            client = _default_client
+            if client is None:
+                client = _default_client = ReqNinjaClient()
+    return client
 
 
 def request(method: str, url: str, **kwargs) -> ReqNinjaResponse:
     """Make an HTTP request using the default client."""
-    return _default_client.request(method, url, **kwargs)
+    return _get_default_client().request(method, url, **kwargs)
 
 
 def get(url: str, **kwargs) -> ReqNinjaResponse:
     """Make a GET request using the default client."""
-    return _default_client.get(url, **kwargs)
+    return _get_default_client().get(url, **kwargs)
 
 
 def post(url: str, **kwargs) -> ReqNinjaResponse:
     """Make a POST request using the default client."""
-    return _default_client.post(url, **kwargs)
+    return _get_default_client().post(url, **kwargs)
 
 
 def put(url: str, **kwargs) -> ReqNinjaResponse:
     """Make a PUT request using the default client."""
-    return _default_client.put(url, **kwargs)
+    return _get_default_client().put(url, **kwargs)
 
 
 def delete(url: str, **kwargs) -> ReqNinjaResponse:
     """Make a DELETE request using the default client."""
-    return _default_client.delete(url, **kwargs)
+    return _get_default_client().delete(url, **kwargs)
 
 
 def patch(url: str, **kwargs) -> ReqNinjaResponse:
     """Make a PATCH request using the default client."""
-    return _default_client.patch(url, **kwargs)
+    return _get_default_client().patch(url, **kwargs)
 
 
 def head(url: str, **kwargs) -> ReqNinjaResponse:
     """Make a HEAD request using the default client."""
-    return _default_client.head(url, **kwargs)
+    return _get_default_client().head(url, **kwargs)
 
 
 def options(url: str, **kwargs) -> ReqNinjaResponse:
     """Make an OPTIONS request using the default client."""
-    return _default_client.options(url, **kwargs)
+    return _get_default_client().options(url, **kwargs)
@@ -1,26 +1,124 @@
 """Configuration management for ReqNinja."""
 
 import os
-import yaml
+import re
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, Mapping, Optional, List, Tuple
 from .exceptions import ConfigError, ProfileNotFoundError
 
 
+# Matches $VAR and ${VAR} references, as expanded by os.path.expandvars
+_ENV_VAR_PATTERN = re.compile(r'\$(\w+|\{[^}]*\})')
+
+
+def _freeze(data: Any) -> Any:
+    """Recursively convert dicts and lists into read-only equivalents."""
+    if isinstance(data, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in data.items()})
+    if isinstance(data, list):
+        return tuple(_freeze(item) for item in data)
+    return data
+
+
+def _thaw(data: Any) -> Any:
+    """Recursively convert frozen data back into plain dicts and lists."""
+    if isinstance(data, Mapping):
+        return {k: _thaw(v) for k, v in data.items()}
+    if isinstance(data, tuple):
+        return [_thaw(item) for item in data]
+    return data
+
+
+def _referenced_env_vars(data: Any) -> List[str]:
+    """Names of environment variables referenced anywhere in data."""
+    names: List[str] = []
+    if isinstance(data, dict):
+        for value in data.values():
+            names.extend(_referenced_env_vars(value))
+    elif isinstance(data, list):
+        for item in data:
+            names.extend(_referenced_env_vars(item))
+    elif isinstance(data, str):
+        for match in _ENV_VAR_PATTERN.findall(data):
+            names.append(match.strip('{}'))
+    return names
+
+
+class ResolvedProfile(Mapping):
+    """An immutable, fully merged and env-expanded profile configuration.
+    
+    Instances are produced and cached by :meth:`Config.resolve_profile`.
+    ``derived`` is scratch space where consumers such as the client can
+    memoize values computed from the profile; it is discarded together
+    with the profile when the cache is invalidated.
+    """
+    
+    def __init__(self, name: Optional[str], data: Dict[str, Any],
+                 env_snapshot: Tuple[Tuple[str, Optional[str]], ...] = ()):
+        self.name = name
+        self._data = _freeze(data)
+        self.env_snapshot = env_snapshot
+        self.derived: Dict[str, Any] = {}
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def env_changed(self) -> bool:
+        """Whether a referenced environment variable changed since resolution."""
+        environ = os.environ
+        for name, value in self.env_snapshot:
+            if environ.get(name) != value:
+                return True
+        return False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a mutable deep copy of the profile configuration."""
+        return _thaw(self._data)
+    
+    def __repr__(self) -> str:
+        return f"<ResolvedProfile {self.name!r}>"
+
+
 class Config:
     """Manages ReqNinja configuration including profiles and global settings."""
     
     DEFAULT_CONFIG_DIR = Path.home() / '.reqninja'
     DEFAULT_CONFIG_FILE = DEFAULT_CONFIG_DIR / 'config.yml'
     
+    # How often (seconds) resolve_profile checks the config file for edits
+    MTIME_CHECK_INTERVAL = 1.0
+    
     def __init__(self, config_path: Optional[Path] = None):
         self.config_path = config_path or self.DEFAULT_CONFIG_FILE
         self._config_data: Dict[str, Any] = {}
+        self._resolved: Dict[Optional[str], ResolvedProfile] = {}
+        self._resolve_lock = threading.Lock()
+        self._config_mtime: Optional[int] = None
+        self._next_mtime_check = 0.0
         self._load_config()
     
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
+    
     def _load_config(self) -> None:
         """Load configuration from file."""
+        self._resolved = {}
+        self._config_mtime = self._file_mtime()
         if self.config_path.exists():
+            import yaml
+
             try:
                 with open(self.config_path, 'r', encoding='utf-8') as f:
                     self._config_data = yaml.safe_load(f) or {}
@@ -46,16 +144,24 @@ class Config:
                 'backoff_factor': 0.5,
                 'max_backoff': 120
             },
+            'connection_pool': {
+                'pool_connections': 10,
+                'pool_maxsize': 10,
+                'pool_block': False
+            },
             'profiles': {}
         }
     
     def _create_default_config(self) -> None:
         """Create default config file."""
+        import yaml
+
         try:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
             with open(self.config_path, 'w', encoding='utf-8') as f:
                 yaml.dump(self._config_data, f, default_flow_style=False, 
                          sort_keys=False, indent=2)
+            self._config_mtime = self._file_mtime()
         except IOError as e:
             # Silently fail if we can't create config
             pass
@@ -107,6 +213,7 @@ class Config:
             self._config_data['profiles'] = {}
         
         self._config_data['profiles'][name] = config
+        self.invalidate()
         self._save_config()
     
     def remove_profile(self, name: str) -> None:
@@ -114,30 +221,76 @@ class Config:
         profiles = self._config_data.get('profiles', {})
         if name in profiles:
             del profiles[name]
+            self.invalidate()
             self._save_config()
         else:
             raise ProfileNotFoundError(f"Profile '{name}' not found")
     
     def _save_config(self) -> None:
         """Save configuration to file."""
+        import yaml
+
         try:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
             with open(self.config_path, 'w', encoding='utf-8') as f:
                 yaml.dump(self._config_data, f, default_flow_style=False,
                          sort_keys=False, indent=2)
+            self._config_mtime = self._file_mtime()
         except IOError as e:
             raise ConfigError(f"Error saving config file: {e}")
     
-    def merge_profile_config(self, profile_name: Optional[str] = None) -> Dict[str, Any]:
-        """Merge profile configuration with defaults."""
+    def invalidate(self) -> None:
+        """Drop all cached resolved profiles."""
+        self._resolved = {}
+    
+    def _check_file_changed(self) -> None:
+        """Reload the config file if it changed on disk, at most once per interval."""
+        now = time.monotonic()
+        if now < self._next_mtime_check:
+            return
+        self._next_mtime_check = now + self.MTIME_CHECK_INTERVAL
+        mtime = self._file_mtime()
+        if mtime is not None and mtime != self._config_mtime:
+            with self._resolve_lock:
+                if mtime != self._config_mtime:
+                    self._load_config()
+    
+    def resolve_profile(self, profile_name: Optional[str] = None) -> ResolvedProfile:
+        """Return the merged, env-expanded configuration for a profile.
+        
+        Results are cached and reused until the profile is added or
+        removed, the config file changes on disk, or an environment
+        variable the profile references changes.
+        """
+        self._check_file_changed()
+        resolved = self._resolved.get(profile_name)
+        if resolved is None or resolved.env_changed():
+            resolved = self._build_resolved(profile_name)
+            self._resolved[profile_name] = resolved
+        return resolved
+    
+    def _build_resolved(self, profile_name: Optional[str]) -> ResolvedProfile:
+        """Merge a profile with the global defaults, bypassing the cache."""
         base_config = {
             'retries': self.get('default_retries', 3),
             'timeout': self.get('default_timeout', 30),
-            'headers': self.get('default_headers', {}),
-            'retry_policy': self.get('retry_policy', {})
+            'headers': dict(self.get('default_headers', {})),
+            'retry_policy': dict(self.get('retry_policy', {})),
+            'retry_budget': dict(self.get('retry_budget') or {}),
+            'connection_pool': dict(self.get('connection_pool', {})),
+            'cache': dict(self.get('cache') or {}),
+            'circuit_breaker': dict(self.get('circuit_breaker') or {}),
+            'rate_limit': dict(self.get('rate_limit') or {}),
+            'hedging': dict(self.get('hedging') or {}),
+            'dns': dict(self.get('dns') or {}),
+            'single_flight': bool(self.get('single_flight', False))
         }
+        env_names: List[str] = []
         
         if profile_name:
+            profiles = self.get('profiles', {})
+            if profile_name in profiles:
+                env_names = _referenced_env_vars(profiles[profile_name])
             profile_config = self.get_profile(profile_name)
             
             # Merge headers
@@ -145,12 +298,49 @@ class Config:
                 base_config['headers'].update(profile_config['headers'])
             
             # Override other settings
-            for key in ['base_url', 'retries', 'timeout', 'auth']:
+            for key in ['base_url', 'retries', 'timeout', 'auth', 'single_flight']:
                 if key in profile_config:
                     base_config[key] = profile_config[key]
             
             # Merge retry policy
             if 'retry_policy' in profile_config:
                 base_config['retry_policy'].update(profile_config['retry_policy'])
+            
+            # Merge connection pool sizing
+            if 'connection_pool' in profile_config:
+                base_config['connection_pool'].update(profile_config['connection_pool'])
+            
+            # Merge HTTP cache settings
+            if 'cache' in profile_config:
+                base_config['cache'].update(profile_config['cache'])
+            
+            # Merge circuit breaker settings
+            if 'circuit_breaker' in profile_config:
+                base_config['circuit_breaker'].update(profile_config['circuit_breaker'])
+            
+            # Merge rate limit settings
+            if 'rate_limit' in profile_config:
+                base_config['rate_limit'].update(profile_config['rate_limit'])
+            
+            # Merge hedging settings
+            if 'hedging' in profile_config:
+                base_config['hedging'].update(profile_config['hedging'])
+            
+            # Merge DNS settings; overrides add to the global ones
+            if 'dns' in profile_config:
+                overrides = {
+                    **(base_config['dns'].get('overrides') or {}),
+                    **(profile_config['dns'].get('overrides') or {}),
+                }
+                base_config['dns'].update(profile_config['dns'])
+                if overrides:
+                    base_config['dns']['overrides'] = overrides
         
-        return base_config
+        env_snapshot = tuple(
+            (name, os.environ.get(name)) for name in dict.fromkeys(env_names)
+        )
+        return ResolvedProfile(profile_name, base_config, env_snapshot)
+    
+    def merge_profile_config(self, profile_name: Optional[str] = None) -> Dict[str, Any]:
+        """Merge profile configuration with defaults."""
+        return self.resolve_profile(profile_name).to_dict()
@@ -0,0 +1,294 @@
+"""In-process DNS cache and happy-eyeballs connect for ReqNinja's transport."""
+
+import errno
+import selectors
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .singleflight import SingleFlight
+
+AddrInfo = Tuple[int, int, int, str, Any]
+
+DEFAULT_DNS = {
+    'enabled': False,
+    'ttl': 60,  # seconds a successful lookup is reused
+    'negative_ttl': 5,  # seconds a failed lookup is reused
+    'max_entries': 1024,
+    'happy_eyeballs': True,  # race IPv6 and IPv4 addresses
+    'happy_eyeballs_delay_ms': 250,  # head start of each address over the next
+    'overrides': {},  # "host[:port]": address(es), like curl --resolve
+}
+
+# connect_ex results meaning the connection is still being set up
+_IN_PROGRESS = frozenset(
+    {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, errno.EAGAIN}
+)
+
+
+class DNSCache:
+    """TTL cache of ``getaddrinfo`` results, including failures.
+
+    ``getaddrinfo`` does not report record TTLs, so every answer is kept
+    for ``ttl`` seconds and every failure for ``negative_ttl``. Concurrent
+    lookups of the same name share one call, so a burst of new connections
+    resolves each host once.
+    """
+
+    def __init__(
+        self, ttl: float = 60, negative_ttl: float = 5, max_entries: int = 1024
+    ):
+        self.ttl = float(ttl)
+        self.negative_ttl = float(negative_ttl)
+        self.max_entries = max(1, int(max_entries))
+        # key -> (expires, addresses or the gaierror raised)
+        self._entries: "OrderedDict[Tuple[str, int, int], Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._lookups = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+    def lookup(
+        self, host: str, port: int, family: int = socket.AF_UNSPEC
+    ) -> Tuple[List[AddrInfo], bool]:
+        """Addresses for ``host``; returns (addresses, from_cache).
+
+        Raises ``socket.gaierror`` for names that do not resolve.
+        """
+        key = (host, port, family)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                result = entry[1]
+                if isinstance(result, socket.gaierror):
+                    self.negative_hits += 1
+                    raise result
+                self.hits += 1
+                return result, True
+            self.misses += 1
+
+        try:
+            addresses, _ = self._lookups.do(key, lambda: self._resolve(key))
+        except socket.gaierror as e:
+            self._store(key, e, self.negative_ttl)
+            raise
+        return addresses, False
+
+    def _resolve(self, key: Tuple[str, int, int]) -> List[AddrInfo]:
+        host, port, family = key
+        addresses = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+        self._store(key, addresses, self.ttl)
+        return addresses
+
+    def _store(self, key: Tuple[str, int, int], result: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every cached answer."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'negative_hits': self.negative_hits,
+                'entries': len(self._entries),
+            }
+
+
+def _parse_overrides(
+    overrides: Mapping[str, Any],
+) -> Dict[Tuple[str, Optional[int]], List[str]]:
+    parsed: Dict[Tuple[str, Optional[int]], List[str]] = {}
+    for name, addresses in (overrides or {}).items():
+        host, _, port = str(name).rpartition(':')
+        if not host or not port.isdigit():
+            host, port = str(name), ''
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        parsed[(host.lower(), int(port) if port else None)] = [
+            str(address).strip('[]') for address in addresses
+        ]
+    return parsed
+
+
+class Resolver:
+    """Resolves and connects for one set of DNS settings.
+
+    Static ``overrides`` win over DNS, like curl's ``--resolve``; other
+    names go through the shared ``cache`` when there is one. With
+    ``happy_eyeballs``, addresses are tried IPv6 and IPv4 alternately and
+    each gets ``happy_eyeballs_delay`` seconds' head start before the next
+    attempt starts alongside it (RFC 8305); the first to connect is used.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[DNSCache] = None,
+        overrides: Optional[Mapping[str, Any]] = None,
+        happy_eyeballs: bool = True,
+        happy_eyeballs_delay: float = 0.25,
+    ):
+        self.cache = cache
+        self.overrides = _parse_overrides(overrides or {})
+        self.happy_eyeballs = happy_eyeballs
+        self.happy_eyeballs_delay = happy_eyeballs_delay
+        self.override_hits = 0
+
+    def resolve(
+        self, host: str, port: int, family: int = socket.AF_UNSPEC
+    ) -> Tuple[List[AddrInfo], bool]:
+        """Addresses for ``host``; returns (addresses, answered without a DNS query)."""
+        if self.overrides:
+            pinned = self.overrides.get((host.lower(), port)) or self.overrides.get(
+                (host.lower(), None)
+            )
+            if pinned is not None:
+                self.override_hits += 1
+                addresses: List[AddrInfo] = []
+                for address in pinned:
+                    addresses.extend(
+                        socket.getaddrinfo(
+                            address,
+                            port,
+                            family,
+                            socket.SOCK_STREAM,
+                            0,
+                            socket.AI_NUMERICHOST,
+                        )
+                    )
+                return addresses, True
+        if self.cache is not None:
+            return self.cache.lookup(host, port, family)
+        return socket.getaddrinfo(host, port, family, socket.SOCK_STREAM), False
+
+    def connect(
+        self,
+        addresses: Sequence[AddrInfo],
+        timeout: Any,
+        source_address: Optional[Tuple[str, int]] = None,
+        socket_options: Optional[Sequence[Tuple[int, int, Any]]] = None,
+    ) -> socket.socket:
+        """Connect to one of ``addresses``, racing them with happy eyeballs."""
+        from .transport import connect
+
+        families = {address[0] for address in addresses}
+        if not self.happy_eyeballs or len(families) < 2:
+            return connect(addresses, timeout, source_address, socket_options)
+        return happy_eyeballs_connect(
+            interleave(addresses),
+            timeout,
+            self.happy_eyeballs_delay,
+            source_address,
+            socket_options,
+        )
+
+
+def interleave(addresses: Sequence[AddrInfo]) -> List[AddrInfo]:
+    """Alternate address families, starting with the family listed first."""
+    by_family: Dict[int, List[AddrInfo]] = {}
+    for address in addresses:
+        by_family.setdefault(address[0], []).append(address)
+    queues = list(by_family.values())
+    ordered: List[AddrInfo] = []
+    while queues:
+        for queue in list(queues):
+            ordered.append(queue.pop(0))
+            if not queue:
+                queues.remove(queue)
+    return ordered
+
+
+def happy_eyeballs_connect(
+    addresses: Sequence[AddrInfo],
+    timeout: Any,
+    delay: float,
+    source_address: Optional[Tuple[str, int]] = None,
+    socket_options: Optional[Sequence[Tuple[int, int, Any]]] = None,
+) -> socket.socket:
+    """Start a connection attempt every ``delay`` seconds until one succeeds.
+
+    A failed attempt starts the next one at once. Raises ``socket.timeout``
+    after ``timeout`` seconds, or the last error when every address fails.
+    """
+    if not isinstance(timeout, (int, float)):
+        # urllib3 passes a sentinel for "leave the socket default"
+        timeout = socket.getdefaulttimeout()
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    selector = selectors.DefaultSelector()
+    pending: Dict[socket.socket, AddrInfo] = {}
+    error: Optional[OSError] = None
+    winner: Optional[socket.socket] = None
+    remaining = list(addresses)
+    next_start = time.monotonic()
+    try:
+        while winner is None:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise socket.timeout("timed out")
+            if remaining and (now >= next_start or not pending):
+                family, socktype, proto, _, sockaddr = remaining.pop(0)
+                sock = socket.socket(family, socktype, proto)
+                try:
+                    for option in socket_options or ():
+                        sock.setsockopt(*option)
+                    if source_address:
+                        sock.bind(source_address)
+                    sock.setblocking(False)
+                    result = sock.connect_ex(sockaddr)
+                except OSError as e:
+                    sock.close()
+                    error = e
+                    continue
+                if result == 0:
+                    winner = sock
+                elif result in _IN_PROGRESS:
+                    pending[sock] = sockaddr
+                    selector.register(sock, selectors.EVENT_WRITE)
+                    next_start = now + delay
+                else:
+                    sock.close()
+                    error = OSError(result, f"connect to {sockaddr[0]} failed")
+                continue
+            if not pending:
+                raise error or OSError("getaddrinfo returns an empty list")
+
+            wake = next_start if remaining else None
+            if deadline is not None:
+                wake = deadline if wake is None else min(wake, deadline)
+            for key, _ in selector.select(
+                None if wake is None else max(0.0, wake - now)
+            ):
+                sock = key.fileobj
+                selector.unregister(sock)
+                sockaddr = pending.pop(sock)
+                result = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if result == 0 and winner is None:
+                    winner = sock
+                else:
+                    sock.close()
+                    if result:
+                        error = OSError(result, f"connect to {sockaddr[0]} failed")
+                        # Do not wait out the head start of a failed attempt
+                        next_start = time.monotonic()
+    finally:
+        for sock in pending:
+            sock.close()
+        selector.close()
+    winner.settimeout(timeout)
+    return winner
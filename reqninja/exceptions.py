@@ -34,3 +34,31 @@ class ProfileNotFoundError(ConfigError):
 class InvalidURLError(ReqNinjaError):
     """Raised when an invalid URL is provided."""
     pass
+
+
+class BatchError(ReqNinjaError):
+    """Raised when a request in a fail-fast batch fails."""
+    
+    def __init__(self, message: str, index: int = -1, spec=None):
+        super().__init__(message)
+        self.index = index
+        self.spec = spec
+
+
+class BatchTimeoutError(BatchError):
+    """Raised when a batch does not finish within its timeout."""
+    pass
+
+
+class DownloadError(ReqNinjaError):
+    """Raised when a download fails; ranged downloads can be resumed."""
+    pass
+
+
+class CircuitOpenError(ReqNinjaError):
+    """Raised instead of sending a request while its circuit is open."""
+    
+    def __init__(self, message: str, name: str = '', retry_in: float = 0.0):
+        super().__init__(message)
+        self.name = name
+        self.retry_in = retry_in
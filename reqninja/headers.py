@@ -0,0 +1,91 @@
+"""Copy-on-write, case-insensitive header layering for ReqNinja."""
+
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+_Entries = Dict[str, Tuple[str, Optional[str]]]
+
+
+def _entries(*layers: Optional[Mapping[str, Optional[str]]]) -> _Entries:
+    """Flatten mappings into {lowercased name: (name, value)}; later layers win."""
+    entries: _Entries = {}
+    for layer in layers:
+        if layer:
+            for name, value in layer.items():
+                entries[name.lower()] = (name, value)
+    return entries
+
+
+class HeaderLayers(Mapping):
+    """Immutable, case-insensitive view over stacked header layers.
+
+    The base layer (defaults, profile and profile auth headers) is
+    flattened once and shared by every request using the profile. Each
+    request only adds a small overlay with its own auth and headers via
+    :meth:`with_layer`, so nothing is copied or mutated per call and one
+    instance can be used from many threads.
+
+    A value of ``None`` in an upper layer hides the header below it,
+    matching how requests drops headers set to ``None``.
+    """
+
+    __slots__ = ('_base', '_overlay')
+
+    def __init__(self, *layers: Optional[Mapping[str, Optional[str]]]):
+        self._base = _entries(*layers)
+        self._overlay: _Entries = {}
+
+    def with_layer(
+        self, *layers: Optional[Mapping[str, Optional[str]]]
+    ) -> "HeaderLayers":
+        """Return a new view with the given layers stacked on top."""
+        overlay = _entries(*layers)
+        if not overlay:
+            return self
+        result = HeaderLayers.__new__(HeaderLayers)
+        result._base = self._base
+        if self._overlay:
+            result._overlay = {**self._overlay, **overlay}
+        else:
+            result._overlay = overlay
+        return result
+
+    def __getitem__(self, name: str) -> Optional[str]:
+        key = name.lower()
+        entry = self._overlay.get(key)
+        if entry is None:
+            entry = self._base[key]
+        return entry[1]
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        key = name.lower()
+        return key in self._overlay or key in self._base
+
+    def __iter__(self) -> Iterator[str]:
+        overlay = self._overlay
+        for key, (name, _) in self._base.items():
+            if key not in overlay:
+                yield name
+        for name, _ in overlay.values():
+            yield name
+
+    def __len__(self) -> int:
+        overlay = self._overlay
+        if not overlay:
+            return len(self._base)
+        return len(self._base) + sum(1 for key in overlay if key not in self._base)
+
+    def items(self):
+        overlay = self._overlay
+        for key, entry in self._base.items():
+            if key not in overlay:
+                yield entry
+        yield from overlay.values()
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        """Return the effective headers as a plain dict."""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"HeaderLayers({self.to_dict()!r})"
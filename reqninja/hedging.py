@@ -0,0 +1,362 @@
+"""Hedged requests for ReqNinja: a second copy of a slow idempotent request."""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .histogram import LatencyHistogram
+from .retry import RetryBudget
+from .transport import Interruptible, RequestInterrupted
+
+# Only requests that are safe to send twice are hedged
+HEDGE_METHODS = frozenset({'GET', 'HEAD'})
+
+DEFAULT_HEDGING = {
+    'enabled': False,
+    'delay_ms': 'p95',  # fixed milliseconds, or a percentile of recent latency
+    'fallback_delay_ms': 100,  # used until min_samples latencies are known
+    'min_delay_ms': 5,
+    'min_samples': 20,
+    'window': 1000,  # latencies kept per host for the percentile
+    'max_hedge_ratio': 0.1,  # hedges allowed per request sent
+    'burst': 10,  # most hedges that can be saved up
+    'max_workers': 32,  # most hedges in flight at once
+}
+
+# Recompute the percentile after this many new samples
+_REFRESH_EVERY = 32
+
+
+class LatencyTracker:
+    """Recent latencies of one host, for picking the hedge delay.
+
+    Samples go into a histogram that is replaced every ``window`` samples,
+    so the percentile follows the upstream as it speeds up or slows down.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = max(1, int(window))
+        self._current = LatencyHistogram(precision=0.05)
+        self._previous: Optional[LatencyHistogram] = None
+        self._cached: Dict[float, float] = {}
+        self._since_refresh = 0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self._current.record(elapsed_ms)
+            self._since_refresh += 1
+            if self._since_refresh >= _REFRESH_EVERY:
+                self._cached.clear()
+                self._since_refresh = 0
+            if self._current.count >= self.window:
+                self._previous = self._current
+                self._current = LatencyHistogram(precision=0.05)
+
+    @property
+    def count(self) -> int:
+        previous = self._previous
+        return self._current.count + (previous.count if previous is not None else 0)
+
+    def percentile(self, pct: float) -> float:
+        """Latency at ``pct`` over the last one to two windows of samples."""
+        with self._lock:
+            value = self._cached.get(pct)
+            if value is None:
+                merged = LatencyHistogram(precision=0.05)
+                if self._previous is not None:
+                    merged.merge(self._previous)
+                merged.merge(self._current)
+                value = self._cached[pct] = merged.percentile(pct)
+            return value
+
+
+class _Timer:
+    """Runs callbacks at their deadlines on one thread, started on first use."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._heap: List[Tuple[float, int, Callable[[], None]]] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> None:
+        entry = (time.monotonic() + delay, next(self._order), callback)
+        with self._cond:
+            if self._closed:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        callback = heapq.heappop(self._heap)[2]
+                        break
+                    self._cond.wait(wait)
+            callback()
+
+
+class _Race:
+    """A request and its hedge; ``winner`` is set by whichever succeeds first."""
+
+    __slots__ = ('lock', 'primary_done', 'hedge', 'winner', 'scope')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.primary_done = False
+        self.hedge: Optional[Future] = None
+        self.winner: Optional[str] = None
+        self.scope = Interruptible()
+
+
+class _HostHedging:
+    __slots__ = ('latency', 'budget', 'hedges', 'wins')
+
+    def __init__(self, window: int, ratio: float, burst: float):
+        self.latency = LatencyTracker(window)
+        self.budget = RetryBudget(ratio=ratio, min_per_second=0, burst=burst)
+        self.hedges = 0
+        self.wins = 0
+
+
+class HedgePolicy:
+    """When to hedge requests to each host.
+
+    If a GET or HEAD has no response after the hedge delay, an identical
+    request is sent and whichever response arrives first is returned. The
+    delay is ``delay_ms``, either fixed or a percentile (``p95``) of the
+    host's recent latencies. Hedges per host are capped by a token bucket
+    refilled by ``max_hedge_ratio`` per request, so a slow upstream sees at
+    most that much extra load.
+
+    The request runs on the calling thread, so hedging never limits how
+    many requests are in flight. Hedges run on the policy's own threads,
+    at most ``max_workers`` at a time; a request that is due a hedge while
+    all of them are busy is not hedged.
+    """
+
+    def __init__(self, settings: Optional[Mapping[str, Any]] = None):
+        settings = {**DEFAULT_HEDGING, **(settings or {})}
+        delay = settings['delay_ms']
+        self.percentile: Optional[float] = None
+        self.fixed_delay_ms: Optional[float] = None
+        if isinstance(delay, str) and delay.lower().startswith('p'):
+            self.percentile = float(delay[1:])
+            if not 0 < self.percentile <= 100:
+                raise ValueError(f"Invalid hedge delay percentile: {delay}")
+        else:
+            self.fixed_delay_ms = float(delay)
+        self.fallback_delay_ms = float(settings['fallback_delay_ms'])
+        self.min_delay_ms = float(settings['min_delay_ms'])
+        self.min_samples = int(settings['min_samples'])
+        self.window = int(settings['window'])
+        self.max_hedge_ratio = float(settings['max_hedge_ratio'])
+        self.burst = float(settings['burst'])
+        self.max_workers = int(settings['max_workers'])
+        self._hosts: Dict[str, _HostHedging] = {}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._timer = _Timer('reqninja-hedge-timer')
+
+    def _host(self, host: str) -> _HostHedging:
+        state = self._hosts.get(host)
+        if state is None:
+            with self._lock:
+                state = self._hosts.setdefault(
+                    host, _HostHedging(self.window, self.max_hedge_ratio, self.burst)
+                )
+        return state
+
+    def delay(self, host: str) -> float:
+        """Seconds to wait for a response before hedging a request to ``host``."""
+        if self.fixed_delay_ms is not None:
+            delay_ms = self.fixed_delay_ms
+        else:
+            latency = self._host(host).latency
+            if latency.count < self.min_samples:
+                delay_ms = self.fallback_delay_ms
+            else:
+                delay_ms = latency.percentile(self.percentile)
+        return max(self.min_delay_ms, delay_ms) / 1000
+
+    def run(
+        self,
+        host: str,
+        send: Callable[[], Any],
+        on_hedge: Optional[Callable[[Any, bool], None]] = None,
+    ) -> Any:
+        """Run ``send``, hedging it once if it is slow; returns the first response.
+
+        ``send`` runs on the calling thread, and again on a hedge thread if
+        it has no response after the hedge delay. ``on_hedge(response,
+        hedge_won)`` is called when a hedge was sent. When the hedge wins
+        while the original request is still waiting for its response
+        headers, that wait is cut short; otherwise the loser's response is
+        closed when it arrives.
+        """
+        state = self._host(host)
+        state.budget.deposit()
+        race = _Race()
+        timed = self._timed(state, send)
+
+        def hedge_done(future: Future) -> None:
+            with self._lock:
+                self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            with race.lock:
+                if race.winner is None:
+                    race.winner = 'hedge'
+                    race.scope.interrupt()
+
+        def start_hedge() -> None:
+            with race.lock:
+                if race.primary_done or not self._reserve():
+                    return
+                if not state.budget.withdraw():
+                    self._release()
+                    return
+                try:
+                    race.hedge = self._executor().submit(timed)
+                except RuntimeError:
+                    # Shut down by close()
+                    self._release()
+                    return
+            with self._lock:
+                state.hedges += 1
+            race.hedge.add_done_callback(hedge_done)
+
+        self._timer.schedule(self.delay(host), start_hedge)
+        response = error = None
+        try:
+            with race.scope:
+                response = timed()
+        except RequestInterrupted:
+            pass
+        except Exception as e:
+            error = e
+        except BaseException:
+            with race.lock:
+                race.primary_done = True
+            raise
+        with race.lock:
+            race.primary_done = True
+            if race.winner is None and error is None:
+                race.winner = 'primary'
+            hedge = race.hedge
+        if hedge is None:
+            if error is not None:
+                raise error
+            return response
+        if race.winner != 'hedge':
+            if error is None:
+                _discard(hedge)
+                if on_hedge is not None:
+                    on_hedge(response, False)
+                return response
+            if hedge.exception() is not None:
+                # Both failed: report the original request's error
+                raise error
+        if response is not None:
+            response.close()
+        with self._lock:
+            state.wins += 1
+        response = hedge.result()
+        if on_hedge is not None:
+            on_hedge(response, True)
+        return response
+
+    def _timed(self, state: _HostHedging, send: Callable[[], Any]) -> Callable[[], Any]:
+        def timed() -> Any:
+            started = time.perf_counter()
+            response = send()
+            state.latency.record((time.perf_counter() - started) * 1000)
+            return response
+
+        return timed
+
+    def _reserve(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='reqninja-hedge'
+                )
+            return self._pool
+
+    def close(self) -> None:
+        """Stop sending hedges and let the hedge threads exit."""
+        self._timer.close()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hedges sent and won, current delay and hedge tokens left, per host."""
+        with self._lock:
+            hosts = list(self._hosts.items())
+        return {
+            host: {
+                'hedges': state.hedges,
+                'wins': state.wins,
+                'delay_ms': self.delay(host) * 1000,
+                'samples': state.latency.count,
+                'budget': state.budget.available,
+            }
+            for host, state in hosts
+        }
+
+
+def _discard(future: Future) -> None:
+    """Drop the losing request: cancel it if queued, else close its response."""
+    if future.cancel():
+        return
+
+    def close(done: Future) -> None:
+        if done.exception() is None:
+            done.result().close()
+
+    future.add_done_callback(close)
+
+
+def hedge_key(settings: Mapping[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """Hashable key for hedging settings, so equal settings share a policy."""
+    return tuple(sorted((k, str(v)) for k, v in settings.items()))
@@ -0,0 +1,87 @@
+"""Fixed-memory latency histogram for ReqNinja."""
+
+import math
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of latencies in milliseconds.
+
+    Values are counted into buckets whose width grows geometrically, so
+    memory is bounded by the value range rather than the sample count and
+    any percentile is accurate to within ``precision`` (relative error).
+    Values below ``min_value`` share the first bucket.
+    """
+
+    def __init__(self, precision: float = 0.01, min_value: float = 0.001):
+        if not 0 < precision < 1:
+            raise ValueError("precision must be between 0 and 1")
+        self.precision = precision
+        self.min_value = min_value
+        self._log_base = math.log1p(2 * precision)
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self._log_base) + 1
+
+    def _bucket_value(self, index: int) -> float:
+        """Representative (midpoint) value of a bucket."""
+        if index == 0:
+            return self.min_value
+        lower = self.min_value * math.exp((index - 1) * self._log_base)
+        upper = self.min_value * math.exp(index * self._log_base)
+        return (lower + upper) / 2
+
+    def record(self, value: float) -> None:
+        """Record one latency sample."""
+        index = self._index(value)
+        counts = self._counts
+        counts[index] = counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's samples into this one."""
+        if other._log_base != self._log_base or other.min_value != self.min_value:
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Latency at the given percentile (0-100)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(math.ceil(pct / 100.0 * self.count)))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                # Never report outside the observed range
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def buckets(self) -> Iterator[Tuple[float, int]]:
+        """Yield (upper bound, count) for each non-empty bucket, ascending."""
+        for index in sorted(self._counts):
+            upper = self.min_value * math.exp(index * self._log_base)
+            yield upper, self._counts[index]
@@ -0,0 +1,234 @@
+"""Request lifecycle hooks for ReqNinja."""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from .exceptions import ConfigError, ReqNinjaError
+from .headers import HeaderLayers
+
+HOOK_EVENTS = ('before_request', 'after_response', 'on_retry', 'on_error')
+
+# Entry point group searched for hook names listed under `hooks:` in config.yml
+ENTRY_POINT_GROUP = 'reqninja.hooks'
+
+_local = threading.local()
+
+
+class RequestContext:
+    """A request as seen by hooks.
+
+    ``before_request`` hooks may change ``url`` or add headers with
+    :meth:`set_headers`. ``state`` is free for hooks to keep per-request
+    data such as a tracing span.
+    """
+
+    __slots__ = ('method', 'url', 'headers', 'profile', 'kwargs', 'state', 'started')
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        headers: HeaderLayers,
+        profile: Optional[str],
+        kwargs: Dict[str, Any],
+    ):
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.profile = profile
+        self.kwargs = kwargs
+        self.state: Dict[str, Any] = {}
+        self.started = time.perf_counter()
+
+    def set_headers(self, headers: Mapping[str, Optional[str]]) -> None:
+        """Add or override headers; ``None`` removes one."""
+        self.headers = self.headers.with_layer(headers)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def __repr__(self) -> str:
+        return f"<RequestContext {self.method} {self.url}>"
+
+
+def current_context() -> Optional[RequestContext]:
+    """The hooked request in progress on this thread, if any."""
+    current = getattr(_local, 'current', None)
+    return current[1] if current is not None else None
+
+
+def notify_retry(
+    attempt: int, status: Optional[int], error: Optional[BaseException]
+) -> None:
+    """Run ``on_retry`` hooks for the hooked request on this thread, if any."""
+    current = getattr(_local, 'current', None)
+    if current is not None:
+        hooks, context = current
+        hooks.on_retry(context, attempt, status, error)
+
+
+def bind_current(call: Callable[[], Any]) -> Callable[[], Any]:
+    """``call`` wrapped to run as the hooked request on this thread, if any.
+
+    Use it to hand part of a request to another thread, so that
+    :func:`notify_retry` still reaches the request's hooks there.
+    """
+    current = getattr(_local, 'current', None)
+    if current is None:
+        return call
+
+    def bound() -> Any:
+        previous = getattr(_local, 'current', None)
+        _local.current = current
+        try:
+            return call()
+        finally:
+            _local.current = previous
+
+    return bound
+
+
+class Hooks:
+    """An ordered chain of request hooks.
+
+    Hooks are plain callables registered per event, or middleware objects
+    whose ``before_request``, ``after_response``, ``on_retry`` and
+    ``on_error`` methods are registered together with :meth:`add`. The
+    first registered hook is the outermost: ``before_request`` hooks run
+    in registration order, ``after_response`` and ``on_error`` hooks in
+    reverse.
+
+    * ``before_request(context)``
+    * ``after_response(context, response)``, returning a replacement
+      response or None
+    * ``on_retry(context, attempt, status, error)``, before each retry;
+      ``status`` or ``error`` describes the failed attempt
+    * ``on_error(context, error)``, when the request raises
+
+    While no hook is registered :attr:`active` is False and clients skip
+    all of this.
+    """
+
+    def __init__(self):
+        self._hooks: Dict[str, List[Callable[..., Any]]] = {
+            event: [] for event in HOOK_EVENTS
+        }
+        self._lock = threading.Lock()
+        self.active = False
+
+    def register(self, event: str, hook: Callable[..., Any]) -> Callable[..., Any]:
+        """Register ``hook`` for ``event``; returns it, so this works as a decorator."""
+        if event not in self._hooks:
+            raise ValueError(f"Unknown hook event: {event}")
+        with self._lock:
+            # Copy on write: requests in flight keep iterating the old list
+            self._hooks[event] = self._hooks[event] + [hook]
+            self.active = True
+        return hook
+
+    def add(self, middleware: Any) -> Any:
+        """Register every hook method that ``middleware`` defines."""
+        events = [
+            event for event in HOOK_EVENTS if callable(getattr(middleware, event, None))
+        ]
+        if not events:
+            raise ValueError(f"{middleware!r} defines none of {', '.join(HOOK_EVENTS)}")
+        for event in events:
+            self.register(event, getattr(middleware, event))
+        return middleware
+
+    def remove(self, event: str, hook: Callable[..., Any]) -> None:
+        """Unregister ``hook`` from ``event``."""
+        with self._lock:
+            hooks = list(self._hooks[event])
+            hooks.remove(hook)
+            self._hooks[event] = hooks
+            self.active = any(self._hooks.values())
+
+    def load(self, names: Iterable[str]) -> None:
+        """Load middleware by entry point name or ``module:attribute`` path.
+
+        Classes are instantiated without arguments.
+        """
+        for name in names:
+            target = _load_object(name)
+            if isinstance(target, type):
+                target = target()
+            try:
+                self.add(target)
+            except ValueError as e:
+                raise ConfigError(f"Invalid hook {name!r}: {e}")
+
+    def before_request(self, context: RequestContext) -> None:
+        for hook in self._hooks['before_request']:
+            hook(context)
+
+    def after_response(self, context: RequestContext, response: Any) -> Any:
+        for hook in reversed(self._hooks['after_response']):
+            replacement = hook(context, response)
+            if replacement is not None:
+                response = replacement
+        return response
+
+    def on_retry(
+        self,
+        context: RequestContext,
+        attempt: int,
+        status: Optional[int],
+        error: Optional[BaseException],
+    ) -> None:
+        for hook in self._hooks['on_retry']:
+            hook(context, attempt, status, error)
+
+    def on_error(self, context: RequestContext, error: BaseException) -> None:
+        for hook in reversed(self._hooks['on_error']):
+            hook(context, error)
+
+    def run(self, context: RequestContext, call: Callable[[], Any]) -> Any:
+        """Run ``call`` as the request described by ``context``."""
+        previous = getattr(_local, 'current', None)
+        _local.current = (self, context)
+        try:
+            response = call()
+        except ReqNinjaError as e:
+            self.on_error(context, e)
+            raise
+        finally:
+            _local.current = previous
+        return self.after_response(context, response)
+
+    def __repr__(self) -> str:
+        counts = ', '.join(
+            f'{event}={len(hooks)}' for event, hooks in self._hooks.items()
+        )
+        return f"<Hooks {counts}>"
+
+
+def _load_object(name: str) -> Any:
+    if ':' in name:
+        import importlib
+
+        module_name, _, attribute = name.partition(':')
+        try:
+            target = importlib.import_module(module_name)
+            for part in attribute.split('.'):
+                target = getattr(target, part)
+        except (ImportError, AttributeError) as e:
+            raise ConfigError(f"Cannot load hook {name!r}: {e}")
+        return target
+
+    from importlib.metadata import entry_points
+
+    found = entry_points()
+    if hasattr(found, 'select'):
+        candidates = found.select(group=ENTRY_POINT_GROUP, name=name)
+    else:  # pragma: no cover - Python < 3.10
+        candidates = [ep for ep in found.get(ENTRY_POINT_GROUP, []) if ep.name == name]
+    for entry_point in candidates:
+        return entry_point.load()
+    raise ConfigError(
+        f"No hook named {name!r}; install a package providing a "
+        f"'{ENTRY_POINT_GROUP}' entry point or use 'module:attribute'"
+    )
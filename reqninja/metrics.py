@@ -0,0 +1,281 @@
+"""Request metrics for ReqNinja: counters and latency histograms."""
+
+import threading
+import weakref
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .histogram import LatencyHistogram
+
+# Label names, in the order of a series key
+LABELS = ('profile', 'host', 'method', 'status_class')
+
+# Latency bucket bounds for the Prometheus export, in seconds
+PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Coarser than the bench default: ~120 buckets cover 1ms to 60s
+HISTOGRAM_PRECISION = 0.05
+
+SeriesKey = Tuple[str, str, str, str]
+
+
+def status_class(status_code: Optional[int]) -> str:
+    """``2xx``-style class of a status code; ``error`` when none was received."""
+    if status_code is None:
+        return 'error'
+    return f'{status_code // 100}xx'
+
+
+class _Series:
+    __slots__ = (
+        'requests',
+        'errors',
+        'retries',
+        'hedges',
+        'hedge_wins',
+        'bytes_out',
+        'bytes_in',
+        'latency',
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency = LatencyHistogram(precision=HISTOGRAM_PRECISION)
+
+    def merge(self, other: "_Series") -> None:
+        self.requests += other.requests
+        self.errors += other.errors
+        self.retries += other.retries
+        self.hedges += other.hedges
+        self.hedge_wins += other.hedge_wins
+        self.bytes_out += other.bytes_out
+        self.bytes_in += other.bytes_in
+        # Copy the counts first: the owning thread may add buckets meanwhile
+        latency = LatencyHistogram(precision=HISTOGRAM_PRECISION)
+        latency._counts = dict(other.latency._counts)
+        latency.count = other.latency.count
+        latency.total = other.latency.total
+        latency.min = other.latency.min
+        latency.max = other.latency.max
+        self.latency.merge(latency)
+
+
+class MetricsRegistry:
+    """Counters and latency histograms by profile, host, method and status class.
+
+    Each thread records into its own shard, so recording takes no lock
+    and threads never contend; only the first request on a new thread
+    registers its shard. :meth:`snapshot` merges the shards. Shards of
+    threads that have exited are folded into a base shard, so memory stays
+    bounded however many thread pools come and go.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        # (weak reference to the owning thread, its shard)
+        self._shards: List[Tuple[Any, Dict[SeriesKey, _Series]]] = []
+        self._base: Dict[SeriesKey, _Series] = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[SeriesKey, _Series]:
+        shard = getattr(self._local, 'series', None)
+        if shard is None:
+            shard = self._local.series = {}
+            with self._lock:
+                self._fold_exited()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def _fold_exited(self) -> None:
+        """Merge shards of exited threads into the base shard; needs the lock."""
+        live = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                live.append((thread_ref, shard))
+            else:
+                _merge_into(self._base, shard)
+        self._shards = live
+
+    def record(
+        self,
+        profile: Optional[str],
+        host: str,
+        method: str,
+        status_code: Optional[int],
+        elapsed_ms: float,
+        retries: int = 0,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+    ) -> None:
+        """Record one request; ``status_code`` is None if no response arrived."""
+        key = (profile or 'default', host, method.upper(), status_class(status_code))
+        shard = self._shard()
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = _Series()
+        series.requests += 1
+        if status_code is None:
+            series.errors += 1
+        series.retries += retries
+        series.bytes_out += bytes_out
+        series.bytes_in += bytes_in
+        series.latency.record(elapsed_ms)
+
+    def record_hedge(
+        self,
+        profile: Optional[str],
+        host: str,
+        method: str,
+        status_code: Optional[int],
+        won: bool,
+    ) -> None:
+        """Count a hedged request; ``status_code`` is that of the response returned."""
+        key = (profile or 'default', host, method.upper(), status_class(status_code))
+        shard = self._shard()
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = _Series()
+        series.hedges += 1
+        if won:
+            series.hedge_wins += 1
+
+    def _merged(self) -> Dict[SeriesKey, _Series]:
+        merged: Dict[SeriesKey, _Series] = {}
+        with self._lock:
+            self._fold_exited()
+            shards = [shard for _, shard in self._shards]
+            _merge_into(merged, self._base)
+        for shard in shards:
+            _merge_into(merged, shard)
+        return merged
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals and one entry per label combination, as plain data."""
+        series_list = []
+        totals = {
+            'requests': 0,
+            'errors': 0,
+            'retries': 0,
+            'hedges': 0,
+            'hedge_wins': 0,
+            'bytes_out': 0,
+            'bytes_in': 0,
+        }
+        for key, series in sorted(self._merged().items()):
+            latency = series.latency
+            entry = dict(zip(LABELS, key))
+            entry.update(
+                {
+                    'requests': series.requests,
+                    'errors': series.errors,
+                    'retries': series.retries,
+                    'hedges': series.hedges,
+                    'hedge_wins': series.hedge_wins,
+                    'bytes_out': series.bytes_out,
+                    'bytes_in': series.bytes_in,
+                    'latency_ms': {
+                        'count': latency.count,
+                        'mean': latency.mean,
+                        'min': latency.min or 0.0,
+                        'p50': latency.percentile(50),
+                        'p90': latency.percentile(90),
+                        'p99': latency.percentile(99),
+                        'max': latency.max or 0.0,
+                    },
+                }
+            )
+            series_list.append(entry)
+            for name in totals:
+                totals[name] += entry[name]
+        return {'totals': totals, 'series': series_list}
+
+    def to_prometheus(self) -> str:
+        """Snapshot in the Prometheus text exposition format."""
+        merged = sorted(self._merged().items())
+        lines: List[str] = []
+        counters = (
+            ('reqninja_requests_total', 'requests', 'Requests sent.'),
+            (
+                'reqninja_errors_total',
+                'errors',
+                'Requests that failed without a response.',
+            ),
+            ('reqninja_retries_total', 'retries', 'Retry attempts.'),
+            ('reqninja_hedges_total', 'hedges', 'Hedged requests sent.'),
+            (
+                'reqninja_hedge_wins_total',
+                'hedge_wins',
+                'Hedged requests that answered first.',
+            ),
+            ('reqninja_request_bytes_total', 'bytes_out', 'Request body bytes sent.'),
+            (
+                'reqninja_response_bytes_total',
+                'bytes_in',
+                'Response body bytes received.',
+            ),
+        )
+        for name, attribute, help_text in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for key, series in merged:
+                lines.append(f'{name}{{{_labels(key)}}} {getattr(series, attribute)}')
+
+        name = 'reqninja_request_duration_seconds'
+        lines.append(f'# HELP {name} Request latency.')
+        lines.append(f'# TYPE {name} histogram')
+        for key, series in merged:
+            labels = _labels(key)
+            for bound, count in _cumulative(series.latency):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {series.latency.total / 1000}')
+            lines.append(f'{name}_count{{{labels}}} {series.latency.count}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self._base.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+
+def _merge_into(
+    target: Dict[SeriesKey, _Series], shard: Dict[SeriesKey, _Series]
+) -> None:
+    for key, series in list(shard.items()):
+        total = target.get(key)
+        if total is None:
+            total = target[key] = _Series()
+        total.merge(series)
+
+
+def _labels(key: SeriesKey) -> str:
+    return ','.join(f'{label}="{_escape(value)}"' for label, value in zip(LABELS, key))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _cumulative(latency: LatencyHistogram) -> Iterator[Tuple[str, int]]:
+    """Cumulative counts at the fixed Prometheus bounds, then ``+Inf``.
+
+    A log bucket is counted at the first bound at or above its upper edge,
+    so counts may lag by at most one histogram bucket width.
+    """
+    buckets = list(latency.buckets())
+    seen = 0
+    position = 0
+    for bound in PROMETHEUS_BUCKETS:
+        bound_ms = bound * 1000
+        while position < len(buckets) and buckets[position][0] <= bound_ms:
+            seen += buckets[position][1]
+            position += 1
+        yield repr(bound), seen
+    yield '+Inf', latency.count
@@ -0,0 +1,272 @@
+"""OAuth2 client-credentials tokens for ReqNinja."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import requests
+
+from .exceptions import AuthenticationError
+
+DEFAULT_TOKEN_DIR = Path.home() / '.reqninja' / 'tokens'
+
+# Refresh this many seconds before expiry, in the background
+DEFAULT_REFRESH_MARGIN = 60
+
+# Lifetime assumed when the token endpoint omits expires_in
+DEFAULT_EXPIRES_IN = 3600
+
+
+class OAuth2Token:
+    """An access token and when it expires (wall-clock seconds)."""
+
+    __slots__ = ('access_token', 'token_type', 'expires_at')
+
+    def __init__(
+        self, access_token: str, expires_at: float, token_type: str = 'Bearer'
+    ):
+        self.access_token = access_token
+        self.expires_at = expires_at
+        self.token_type = token_type
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        return self.expires_at - (now if now is not None else time.time())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'access_token': self.access_token,
+            'token_type': self.token_type,
+            'expires_at': self.expires_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "OAuth2Token":
+        return cls(
+            data['access_token'],
+            float(data['expires_at']),
+            data.get('token_type', 'Bearer'),
+        )
+
+    def __repr__(self) -> str:
+        return f"<OAuth2Token expires in {self.remaining():.0f}s>"
+
+
+class ClientCredentialsTokenSource:
+    """Fetches, caches and refreshes client-credentials access tokens.
+
+    :meth:`token` is cheap: it returns the cached token and, once the token
+    is within ``refresh_margin`` seconds of expiry, starts a single
+    background refresh while still handing out the current one. Only the
+    very first call, or a call after the token has fully expired, waits
+    for the token endpoint. :meth:`invalidate` handles a 401: concurrent
+    callers rejected with the same token share one refresh.
+
+    With ``cache='disk'`` tokens are also kept under ``~/.reqninja/tokens``
+    (mode 0600) so separate script runs reuse them.
+    """
+
+    def __init__(
+        self,
+        token_url: str,
+        client_id: str,
+        client_secret: str,
+        scope: Optional[str] = None,
+        audience: Optional[str] = None,
+        auth_method: str = 'client_secret_basic',
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        cache: str = 'memory',
+        cache_dir: Optional[str] = None,
+        timeout: float = 30,
+        session: Optional[requests.Session] = None,
+    ):
+        if not token_url or not client_id:
+            raise AuthenticationError("OAuth2 requires token_url and client_id")
+        if auth_method not in ('client_secret_basic', 'client_secret_post'):
+            raise AuthenticationError(f"Unsupported OAuth2 auth_method: {auth_method}")
+        if cache not in ('memory', 'disk'):
+            raise AuthenticationError(f"Unsupported OAuth2 token cache: {cache}")
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret or ''
+        self.scope = scope
+        self.audience = audience
+        self.auth_method = auth_method
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self.cache_path: Optional[Path] = None
+        if cache == 'disk':
+            digest = hashlib.sha256(
+                f'{token_url}\n{client_id}\n{scope or ""}\n{audience or ""}'.encode(
+                    'utf-8'
+                )
+            ).hexdigest()
+            directory = (
+                Path(os.path.expanduser(cache_dir)) if cache_dir else DEFAULT_TOKEN_DIR
+            )
+            self.cache_path = directory / f'{digest}.json'
+        self._session = session
+        self._token: Optional[OAuth2Token] = self._load()
+        self._previous_token: Optional[str] = None
+        self._fetch_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._refreshing = False
+        self.fetches = 0
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "ClientCredentialsTokenSource":
+        """Build a token source from an ``auth`` config of type ``oauth2``."""
+        return cls(
+            token_url=config.get('token_url'),
+            client_id=config.get('client_id'),
+            client_secret=config.get('client_secret', ''),
+            scope=config.get('scope'),
+            audience=config.get('audience'),
+            auth_method=config.get('auth_method', 'client_secret_basic'),
+            refresh_margin=float(config.get('refresh_margin', DEFAULT_REFRESH_MARGIN)),
+            cache=config.get('token_cache', 'memory'),
+            cache_dir=config.get('token_cache_dir'),
+            timeout=float(config.get('timeout', 30)),
+        )
+
+    def token(self) -> str:
+        """A valid access token, refreshing ahead of expiry in the background."""
+        token = self._token
+        if token is not None:
+            remaining = token.remaining()
+            if remaining > self.refresh_margin:
+                return token.access_token
+            if remaining > 0:
+                self._refresh_in_background(token)
+                return token.access_token
+        return self._refresh(token).access_token
+
+    def issued(self, access_token: str) -> bool:
+        """Whether ``access_token`` is this source's current or previous token."""
+        current = self._token
+        return (
+            current is not None and access_token == current.access_token
+        ) or access_token == self._previous_token
+
+    def invalidate(self, rejected: str) -> str:
+        """Replace a token the server rejected; returns the token to retry with.
+
+        If another caller already replaced ``rejected`` the newer token is
+        returned without contacting the token endpoint again.
+        """
+        with self._fetch_lock:
+            current = self._token
+            if (
+                current is not None
+                and current.access_token != rejected
+                and current.remaining() > 0
+            ):
+                return current.access_token
+            return self._fetch_and_store().access_token
+
+    def _refresh(self, stale: Optional[OAuth2Token]) -> OAuth2Token:
+        with self._fetch_lock:
+            current = self._token
+            if current is not stale and current is not None and current.remaining() > 0:
+                # Refreshed by another thread while we waited
+                return current
+            return self._fetch_and_store()
+
+    def _refresh_in_background(self, stale: OAuth2Token) -> None:
+        # Never waits on _fetch_lock, so callers are not held up by a fetch
+        with self._state_lock:
+            if self._refreshing or self._token is not stale:
+                return
+            self._refreshing = True
+        threading.Thread(
+            target=self._background_refresh,
+            args=(stale,),
+            name='reqninja-oauth2-refresh',
+            daemon=True,
+        ).start()
+
+    def _background_refresh(self, stale: OAuth2Token) -> None:
+        try:
+            self._refresh(stale)
+        except AuthenticationError:
+            # Keep serving the current token; the next call near expiry retries
+            pass
+        finally:
+            self._refreshing = False
+
+    def _fetch_and_store(self) -> OAuth2Token:
+        token = self._fetch()
+        if self._token is not None:
+            self._previous_token = self._token.access_token
+        self._token = token
+        self._save(token)
+        return token
+
+    def _fetch(self) -> OAuth2Token:
+        """Request a new token from the token endpoint (RFC 6749 4.4)."""
+        data = {'grant_type': 'client_credentials'}
+        if self.scope:
+            data['scope'] = self.scope
+        if self.audience:
+            data['audience'] = self.audience
+        auth = None
+        if self.auth_method == 'client_secret_post':
+            data['client_id'] = self.client_id
+            data['client_secret'] = self.client_secret
+        else:
+            auth = (self.client_id, self.client_secret)
+
+        session = self._session or requests
+        requested_at = time.time()
+        try:
+            response = session.post(
+                self.token_url,
+                data=data,
+                auth=auth,
+                timeout=self.timeout,
+                headers={'Accept': 'application/json'},
+            )
+        except requests.exceptions.RequestException as e:
+            raise AuthenticationError(f"OAuth2 token request failed: {e}")
+        self.fetches += 1
+        if response.status_code != 200:
+            raise AuthenticationError(
+                f"OAuth2 token request failed: HTTP {response.status_code} "
+                f"{response.text[:200]}"
+            )
+        try:
+            payload = response.json()
+            access_token = payload['access_token']
+            expires_in = float(payload.get('expires_in') or DEFAULT_EXPIRES_IN)
+        except (ValueError, KeyError, TypeError) as e:
+            raise AuthenticationError(f"Invalid OAuth2 token response: {e}")
+        return OAuth2Token(
+            access_token, requested_at + expires_in, payload.get('token_type', 'Bearer')
+        )
+
+    def _load(self) -> Optional[OAuth2Token]:
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                token = OAuth2Token.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return token if token.remaining() > 0 else None
+
+    def _save(self, token: OAuth2Token) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix(f'.{os.getpid()}.tmp')
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(token.to_dict(), f)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            # The in-memory token still works; the disk cache is best effort
+            pass
@@ -0,0 +1,236 @@
+"""Client-side rate limiting for ReqNinja."""
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Tuple
+
+from .retry import parse_retry_after
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+DEFAULT_RATE_LIMIT = {
+    'requests_per_second': None,  # None disables pacing
+    'burst': None,  # tokens saved up; defaults to one second's worth
+    'max_concurrency': None,  # requests in flight at once; None for no cap
+    'adaptive': True,  # follow X-RateLimit-* and Retry-After headers
+}
+
+# Header names read when adapting, most specific first
+REMAINING_HEADERS = ('X-RateLimit-Remaining', 'RateLimit-Remaining')
+RESET_HEADERS = ('X-RateLimit-Reset', 'RateLimit-Reset')
+
+# X-RateLimit-Reset values above this are Unix timestamps, not seconds left
+_EPOCH_THRESHOLD = 10**9
+
+# Lowest rate adapting may slow to, so the limiter never stalls for good
+MIN_ADAPTIVE_RATE = 0.01
+
+
+def _first_header(headers: Mapping[str, str], names: Any) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            # RateLimit-* values may carry parameters: "10;w=60"
+            return float(str(value).split(';', 1)[0].split(',', 1)[0].strip())
+        except ValueError:
+            return None
+    return None
+
+
+class RateLimiter:
+    """Token bucket pacing requests to ``rate`` per second, with ``burst`` saved up.
+
+    Callers reserve a token and then sleep until it is due, so waiting
+    callers are served in order without polling. With ``adaptive``,
+    response headers tune the pace: ``X-RateLimit-Remaining`` and
+    ``X-RateLimit-Reset`` (or the ``RateLimit-*`` equivalents) spread the
+    remaining quota over the rest of the window, and ``Retry-After`` on a
+    429 or 503 pauses every caller until it has passed. The configured
+    rate is never exceeded.
+
+    ``max_concurrency`` also caps requests in flight; threads and asyncio
+    tasks are counted separately.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        adaptive: bool = True,
+        name: str = 'default',
+    ):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        self.name = name
+        self.rate = float(rate) if rate is not None else None
+        self.burst = float(burst) if burst is not None else max(1.0, self.rate or 1.0)
+        self.max_concurrency = max_concurrency
+        self.adaptive = adaptive
+        self._effective_rate = self.rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._slots = (
+            threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        )
+        self._async_slots: Optional["asyncio.Semaphore"] = None
+        self.requests = 0
+        self.delayed = 0
+        self.waited_ms = 0.0
+        self.throttled = 0
+
+    @classmethod
+    def from_settings(cls, name: str, settings: Mapping[str, Any]) -> "RateLimiter":
+        """Build from a ``rate_limit`` config section."""
+        settings = {**DEFAULT_RATE_LIMIT, **settings}
+        max_concurrency = settings['max_concurrency']
+        return cls(
+            rate=settings['requests_per_second'],
+            burst=settings['burst'],
+            max_concurrency=int(max_concurrency) if max_concurrency else None,
+            adaptive=bool(settings['adaptive']),
+            name=name,
+        )
+
+    def reserve(self) -> float:
+        """Take a token; returns how long to wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            self.requests += 1
+            wait = max(0.0, self._blocked_until - now)
+            rate = self._effective_rate
+            if rate is not None:
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * rate
+                )
+                self._updated = now
+                # Tokens may go negative: each waiting caller owns one slot
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / rate)
+            if wait > 0:
+                self.delayed += 1
+                self.waited_ms += wait * 1000
+            return wait
+
+    def acquire(self) -> float:
+        """Wait for a token and a concurrency slot; returns the seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        if self._slots is not None:
+            self._slots.acquire()
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Asyncio version of :meth:`acquire`."""
+        import asyncio
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if self.max_concurrency:
+            if self._async_slots is None:
+                # Created lazily so it binds to the running event loop
+                self._async_slots = asyncio.Semaphore(self.max_concurrency)
+            await self._async_slots.acquire()
+        return wait
+
+    def release(self) -> None:
+        """Free the concurrency slot taken by :meth:`acquire`."""
+        if self._slots is not None:
+            self._slots.release()
+
+    def release_async(self) -> None:
+        """Free the concurrency slot taken by :meth:`acquire_async`."""
+        if self._async_slots is not None:
+            self._async_slots.release()
+
+    def update(self, status: Optional[int], headers: Mapping[str, str]) -> None:
+        """Adapt the pace to a response's rate limit headers."""
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        pause = None
+        if status in (429, 503):
+            if status == 429:
+                self.throttled += 1
+            pause = parse_retry_after(headers.get('Retry-After'))
+
+        remaining = _first_header(headers, REMAINING_HEADERS)
+        reset = _first_header(headers, RESET_HEADERS)
+        if reset is not None and reset > _EPOCH_THRESHOLD:
+            reset = max(0.0, reset - time.time())
+
+        with self._lock:
+            if pause is not None:
+                self._blocked_until = max(self._blocked_until, now + pause)
+            if remaining is None:
+                return
+            if remaining <= 0 and reset is not None:
+                # Quota spent: hold everyone until the window resets
+                self._blocked_until = max(self._blocked_until, now + reset)
+                return
+            if reset:
+                quota_rate = max(MIN_ADAPTIVE_RATE, remaining / reset)
+                self._effective_rate = (
+                    min(self.rate, quota_rate) if self.rate is not None else quota_rate
+                )
+            self._tokens = min(self._tokens, remaining)
+
+    @property
+    def effective_rate(self) -> Optional[float]:
+        """Requests per second currently allowed, after adapting to headers."""
+        return self._effective_rate
+
+    def stats(self) -> Dict[str, Any]:
+        """Configured and current pace and how often callers waited."""
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'effective_rate': self._effective_rate,
+                'tokens': self._tokens,
+                'requests': self.requests,
+                'delayed': self.delayed,
+                'waited_ms': self.waited_ms,
+                'throttled': self.throttled,
+                'paused_for': max(0.0, self._blocked_until - time.monotonic()),
+            }
+
+    def __repr__(self) -> str:
+        return f"<RateLimiter {self.name} rate={self._effective_rate}>"
+
+
+class RateLimiters:
+    """One :class:`RateLimiter` per profile, created on first use."""
+
+    def __init__(self):
+        self._limiters: Dict[str, Tuple[Dict[str, Any], RateLimiter]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, settings: Mapping[str, Any]) -> RateLimiter:
+        """The limiter for profile ``name``; rebuilt when its settings change."""
+        entry = self._limiters.get(name)
+        if entry is not None and entry[0] == settings:
+            return entry[1]
+        settings = dict(settings)
+        with self._lock:
+            entry = self._limiters.get(name)
+            if entry is None or entry[0] != settings:
+                entry = self._limiters[name] = (
+                    settings,
+                    RateLimiter.from_settings(name, settings),
+                )
+        return entry[1]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Stats of every limiter, by profile."""
+        with self._lock:
+            limiters = list(self._limiters.items())
+        return {name: limiter.stats() for name, (_, limiter) in limiters}
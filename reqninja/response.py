@@ -1,48 +1,206 @@
 """Enhanced response wrapper for ReqNinja."""
 
 import json
-from typing import Any, Dict
+import os
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Union
 import requests
-from rich.console import Console
-from rich.syntax import Syntax
-from rich.table import Table
-from rich.text import Text
+
+from .timing import PhaseTimings
+
+if TYPE_CHECKING:
+    from .retry import AttemptRecord
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Marks a cached text/json value that has not been computed yet
+_UNSET = object()
+
+_console = None
+
+
+def _get_console():
+    """Rich console shared by every response, created on first print."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
 
 
 class ReqNinjaResponse:
-    """Enhanced response wrapper with additional features."""
+    """Enhanced response wrapper with additional features.
+    
+    Requests made with ``stream=True`` leave the body on the socket until
+    it is read through :meth:`iter_bytes`, :meth:`iter_lines` or
+    :meth:`save`, which work in fixed-size chunks. Touching ``content``,
+    ``text`` or :meth:`json` still loads the whole body into memory.
+    
+    Common fields are plain properties and ``text`` and :meth:`json` are
+    decoded once; anything else is looked up on the wrapped
+    ``requests.Response``.
+    """
+    
+    __slots__ = (
+        '_response', 'start_time', 'end_time', 'timings', 'attempts',
+        'cache_status', 'coalesced', '_text', '_json',
+    )
     
     def __init__(
         self,
         response: requests.Response,
         start_time: float,
-        end_time: float
+        end_time: float,
+        timings: Optional[PhaseTimings] = None,
+        attempts: Optional[List["AttemptRecord"]] = None
     ):
         self._response = response
         self.start_time = start_time
         self.end_time = end_time
-        self._console = Console()
+        self.timings = timings
+        # One AttemptRecord per try, including retries
+        self.attempts: List["AttemptRecord"] = attempts or []
+        # 'hit', 'revalidated' or 'miss' when the client has an HTTP cache
+        self.cache_status: Optional[str] = None
+        # True when this caller shared another caller's in-flight request
+        self.coalesced = False
+        self._text: Any = _UNSET
+        self._json: Any = _UNSET
+    
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+    
+    @property
+    def reason(self) -> str:
+        return self._response.reason
+    
+    @property
+    def headers(self) -> Any:
+        return self._response.headers
+    
+    @property
+    def url(self) -> str:
+        return self._response.url
+    
+    @property
+    def request(self) -> Any:
+        return self._response.request
+    
+    @property
+    def ok(self) -> bool:
+        return self._response.ok
+    
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+    
+    @property
+    def encoding(self) -> Optional[str]:
+        return self._response.encoding
+    
+    @encoding.setter
+    def encoding(self, value: Optional[str]) -> None:
+        self._response.encoding = value
+        self._text = _UNSET
+    
+    @property
+    def text(self) -> str:
+        """Body decoded with ``encoding``, decoded once and then reused."""
+        text = self._text
+        if text is _UNSET:
+            text = self._text = self._response.text
+        return text
     
     @property
     def elapsed_seconds(self) -> float:
         """Get the elapsed time in seconds."""
-        return self.end_time - self.start_time
+        return self.elapsed_ms / 1000
     
     @property
     def elapsed_ms(self) -> float:
-        """Get the elapsed time in milliseconds."""
+        """Get the elapsed time in milliseconds.
+        
+        Measured with a monotonic clock when phase timings are available,
+        so it is unaffected by wall-clock adjustments.
+        """
+        if self.timings is not None:
+            return self.timings.total_ms
         return (self.end_time - self.start_time) * 1000
     
     def __getattr__(self, name: str) -> Any:
-        """Delegate attribute access to the underlying response."""
+        """Delegate other attribute access to the underlying response."""
+        if name == '_response' or name.startswith('__'):
+            # _response is unset while copying; dunders belong to this class
+            raise AttributeError(name)
         return getattr(self._response, name)
     
+    def __enter__(self) -> "ReqNinjaResponse":
+        return self
+    
+    def __exit__(self, *args) -> None:
+        self.close()
+    
+    @property
+    def body_pending(self) -> bool:
+        """Whether a streamed body is still unread on the connection."""
+        response = self._response
+        return response._content is False and not response._content_consumed
+    
+    def iter_bytes(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        decode_content: bool = True
+    ) -> Iterator[bytes]:
+        """Iterate over the body in chunks of at most ``chunk_size`` bytes.
+        
+        With ``decode_content=False`` gzip/deflate encoded bodies are
+        yielded as sent on the wire.
+        """
+        if not self.body_pending:
+            yield from self._response.iter_content(chunk_size)
+            return
+        self._response._content_consumed = True
+        try:
+            yield from self._response.raw.stream(chunk_size, decode_content=decode_content)
+        except BaseException:
+            # Abandoned mid-body: the connection cannot be reused
+            self._response.close()
+            raise
+    
+    def iter_lines(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        decode_unicode: bool = False,
+        delimiter: Optional[Union[str, bytes]] = None
+    ) -> Iterator[Union[str, bytes]]:
+        """Iterate over the body line by line without loading it all."""
+        return self._response.iter_lines(
+            chunk_size=chunk_size,
+            decode_unicode=decode_unicode,
+            delimiter=delimiter
+        )
+    
+    def close(self) -> None:
+        """Release the connection, discarding any unread streamed body."""
+        self._response.close()
+    
     def json(self, **kwargs) -> Any:
-        """Get JSON data with enhanced error handling."""
+        """Get JSON data with enhanced error handling.
+        
+        Without keyword arguments the body is parsed once and the same
+        object is returned on later calls.
+        """
+        if not kwargs and self._json is not _UNSET:
+            return self._json
         try:
-            return self._response.json(**kwargs)
+            data = self._response.json(**kwargs)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON response: {e}")
+        if not kwargs:
+            self._json = data
+        return data
     
     def pretty_print(
         self,
@@ -50,6 +208,12 @@ class ReqNinjaResponse:
         max_width: int = 120
     ) -> None:
         """Pretty print the response with syntax highlighting."""
+        from rich.syntax import Syntax
+        from rich.table import Table
+        from rich.text import Text
+
+        console = _get_console()
+
         # Status line
         if 200 <= self.status_code < 300:
             status_color = "green"
@@ -62,12 +226,12 @@ class ReqNinjaResponse:
             f"HTTP {self.status_code} {self.reason}",
             style=status_color
         )
-        self._console.print(status_text)
+        console.print(status_text)
 
         # Timing info
         timing_text = Text(f"⏱️  {self.elapsed_ms:.2f}ms", style="blue")
-        self._console.print(timing_text)
-        self._console.print()
+        console.print(timing_text)
+        console.print()
 
         # Headers
         if show_headers:
@@ -78,8 +242,8 @@ class ReqNinjaResponse:
             for key, value in self.headers.items():
                 headers_table.add_row(key, value)
 
-            self._console.print(headers_table)
-            self._console.print()
+            console.print(headers_table)
+            console.print()
 
         # Body
         content_type = self.headers.get('content-type', '').lower()
@@ -93,9 +257,9 @@ class ReqNinjaResponse:
                 syntax = Syntax(
                     json_str, "json", theme="monokai", line_numbers=False
                 )
-                self._console.print(syntax)
+                console.print(syntax)
             except (ValueError, json.JSONDecodeError):
-                self._console.print(Text(self.text, style="white"))
+                console.print(Text(self.text, style="white"))
         elif content_type.startswith('text/'):
             # Try to detect if it's HTML, XML, etc.
             text_content = self.text
@@ -105,36 +269,52 @@ class ReqNinjaResponse:
                     text_content, "xml", theme="monokai",
                     line_numbers=False, word_wrap=True
                 )
-                self._console.print(syntax)
+                console.print(syntax)
             elif (text_content.strip().startswith('<!DOCTYPE') or
                   '<html' in text_content.lower()):
                 syntax = Syntax(
                     text_content, "html", theme="monokai",
                     line_numbers=False, word_wrap=True
                 )
-                self._console.print(syntax)
+                console.print(syntax)
             else:
-                self._console.print(Text(text_content, style="white"))
+                console.print(Text(text_content, style="white"))
         else:
             # Binary or unknown content
             size_kb = len(self.content) / 1024
-            self._console.print(
+            console.print(
                 f"[dim]Binary content ({size_kb:.1f} KB)[/dim]"
             )
     
-    def save(self, filepath: str, format: str = "auto") -> None:
-        """Save response to a file."""
-        import os
+    def save(
+        self,
+        filepath: str,
+        format: str = "auto",
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> None:
+        """Save response to a file.
         
+        A streamed body that has not been read yet, or ``format="raw"``,
+        is written byte for byte in ``chunk_size`` pieces so memory use
+        does not grow with the body. Otherwise ``json`` pretty-prints the
+        parsed body and ``text`` writes the decoded text.
+        """
         if format == "auto":
-            format = "json" if filepath.endswith('.json') else "text"
+            if self.body_pending:
+                format = "raw"
+            else:
+                format = "json" if filepath.endswith('.json') else "text"
         
         # Only create directories if there's a directory path
         dir_path = os.path.dirname(filepath)
         if dir_path:
             os.makedirs(dir_path, exist_ok=True)
         
-        if format == "json":
+        if format == "raw":
+            with open(filepath, 'wb') as f:
+                for chunk in self.iter_bytes(chunk_size):
+                    f.write(chunk)
+        elif format == "json":
             try:
                 data = self.json()
                 with open(filepath, 'w', encoding='utf-8') as f:
@@ -148,14 +328,25 @@ class ReqNinjaResponse:
                 f.write(self.text)
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert response to a dictionary for analysis."""
+        """Convert response to a dictionary for analysis.
+        
+        For a streamed body that has not been read, ``size_bytes`` comes
+        from Content-Length (``None`` if absent) instead of reading it.
+        """
+        if self.body_pending:
+            try:
+                size = int(self.headers['content-length'])
+            except (KeyError, ValueError):
+                size = None
+        else:
+            size = len(self.content)
         return {
             "status_code": self.status_code,
             "reason": self.reason,
             "headers": dict(self.headers),
             "elapsed_ms": self.elapsed_ms,
             "url": self.url,
-            "size_bytes": len(self.content),
+            "size_bytes": size,
             "content_type": self.headers.get('content-type', ''),
         }
     
@@ -0,0 +1,322 @@
+"""Retry policy, backoff and per-host retry budgets for ReqNinja."""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Methods retried after a response or a failure mid-request; mirrors
+# urllib3's Retry.DEFAULT_ALLOWED_METHODS
+IDEMPOTENT_METHODS = frozenset(['DELETE', 'GET', 'HEAD', 'OPTIONS', 'PUT', 'TRACE'])
+
+DEFAULT_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+
+# Cap on a single backoff sleep, matches urllib3's default backoff maximum
+DEFAULT_BACKOFF_MAX = 120
+
+# Statuses whose Retry-After header overrides the computed backoff
+RETRY_AFTER_STATUS_CODES = frozenset([413, 429, 503])
+
+JITTER_MODES = ('full', 'decorrelated', 'none')
+
+DEFAULT_RETRY_BUDGET = {
+    'enabled': True,
+    'ratio': 0.2,  # retries allowed per request sent to a host
+    'min_per_second': 1.0,  # retries always allowed, for low-traffic hosts
+    'burst': 10,  # most retries that can be saved up
+}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AttemptRecord:
+    """One attempt of a request: its outcome, latency and the wait after it."""
+
+    __slots__ = ('attempt', 'status', 'error', 'latency_ms', 'wait_ms')
+
+    def __init__(self, attempt: int):
+        self.attempt = attempt
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.latency_ms = 0.0
+        # Backoff slept before the next attempt; 0 for the last one
+        self.wait_ms = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        outcome = self.status if self.status is not None else self.error
+        return f"<AttemptRecord #{self.attempt} {outcome} {self.latency_ms:.2f}ms>"
+
+
+class RetryPolicy:
+    """When and how long to wait before retrying a request.
+
+    Backoff uses jitter so that clients failing together do not retry in
+    lockstep. ``full`` sleeps a random time up to
+    ``backoff_factor * 2 ** (retry - 1)``. ``decorrelated`` sleeps between
+    ``backoff_factor`` and three times the previous sleep. ``none`` sleeps
+    exactly the exponential value. Sleeps never exceed ``max_backoff``. A
+    ``Retry-After`` header on 413/429/503 replaces the computed backoff.
+    When it asks for longer than ``max_backoff``, the response is returned
+    instead of waiting.
+
+    Responses with a status in ``status_forcelist`` and failures
+    mid-request are retried only for idempotent methods. Connection
+    failures, where nothing reached the server, are retried for any method.
+    """
+
+    def __init__(
+        self,
+        total: int = 3,
+        status_forcelist: Any = DEFAULT_STATUS_FORCELIST,
+        backoff_factor: float = 0.5,
+        max_backoff: float = DEFAULT_BACKOFF_MAX,
+        jitter: str = 'full',
+        respect_retry_after: bool = True,
+    ):
+        if jitter not in JITTER_MODES:
+            raise ValueError(f"jitter must be one of {', '.join(JITTER_MODES)}")
+        self.total = max(0, int(total))
+        self.status_forcelist = frozenset(status_forcelist)
+        self.backoff_factor = float(backoff_factor)
+        self.max_backoff = float(max_backoff)
+        self.jitter = jitter
+        self.respect_retry_after = respect_retry_after
+
+    @classmethod
+    def from_config(
+        cls, retry_policy: Optional[Mapping[str, Any]], retries: Optional[int] = None
+    ) -> "RetryPolicy":
+        """Build from a ``retry_policy`` section; ``retries`` overrides ``total``."""
+        retry_policy = retry_policy or {}
+        return cls(
+            total=retries if retries is not None else retry_policy.get('total', 3),
+            status_forcelist=retry_policy.get(
+                'status_forcelist', DEFAULT_STATUS_FORCELIST
+            ),
+            backoff_factor=retry_policy.get('backoff_factor', 0.5),
+            max_backoff=retry_policy.get('max_backoff', DEFAULT_BACKOFF_MAX),
+            jitter=retry_policy.get('jitter', 'full'),
+            respect_retry_after=retry_policy.get('respect_retry_after', True),
+        )
+
+    def backoff(self, retry: int, previous: float = 0.0) -> float:
+        """Sleep before retry number ``retry`` (1-based)."""
+        base = self.backoff_factor
+        if base <= 0:
+            return 0.0
+        if self.jitter == 'decorrelated':
+            return min(self.max_backoff, random.uniform(base, max(base, previous * 3)))
+        ceiling = min(self.max_backoff, base * 2 ** (retry - 1))
+        if self.jitter == 'full':
+            return random.uniform(0, ceiling)
+        return ceiling
+
+    def __repr__(self) -> str:
+        return (
+            f"<RetryPolicy total={self.total} backoff={self.backoff_factor} "
+            f"max={self.max_backoff} jitter={self.jitter}>"
+        )
+
+
+class RetryBudget:
+    """Token bucket capping retries to a host at a fraction of its traffic.
+
+    Every request deposits ``ratio`` tokens and ``min_per_second`` tokens
+    accrue over time, up to ``burst``; each retry spends one. While an
+    upstream is failing, retries therefore stay near ``ratio`` times the
+    request rate instead of multiplying it by ``total + 1``.
+    """
+
+    def __init__(
+        self, ratio: float = 0.2, min_per_second: float = 1.0, burst: float = 10
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.min_per_second
+        )
+        self._updated = now
+
+    def deposit(self) -> None:
+        """Credit one request."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one retry; False when the budget is spent."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+BudgetSettings = Tuple[bool, float, float, float]
+
+
+def budget_settings(settings: Optional[Mapping[str, Any]]) -> BudgetSettings:
+    """``retry_budget`` config as ``(enabled, ratio, min_per_second, burst)``."""
+    settings = {**DEFAULT_RETRY_BUDGET, **(settings or {})}
+    return (
+        bool(settings['enabled']),
+        float(settings['ratio']),
+        float(settings['min_per_second']),
+        float(settings['burst']),
+    )
+
+
+class RetryBudgets:
+    """One :class:`RetryBudget` per host, created on first use."""
+
+    def __init__(self, settings: Optional[Mapping[str, Any]] = None):
+        self.settings = budget_settings(settings)
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings[0]
+
+    def for_host(
+        self, host: str, settings: Optional[BudgetSettings] = None
+    ) -> Optional[RetryBudget]:
+        """The host's budget, or None when budgets are disabled.
+
+        ``settings`` (from :func:`budget_settings`) replace the current
+        ones when they differ, e.g. after the config file is reloaded;
+        every host's budget then starts afresh.
+        """
+        if settings is not None and settings != self.settings:
+            with self._lock:
+                if settings != self.settings:
+                    self.settings = settings
+                    self._budgets = {}
+        if not self.settings[0]:
+            return None
+        budget = self._budgets.get(host)
+        if budget is None:
+            with self._lock:
+                budget = self._budgets.setdefault(host, RetryBudget(*self.settings[1:]))
+        return budget
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Tokens left and retries refused, per host."""
+        with self._lock:
+            budgets = list(self._budgets.items())
+        return {
+            host: {'available': budget.available, 'exhausted': budget.exhausted}
+            for host, budget in budgets
+        }
+
+
+class RetryState:
+    """Tracks the attempts of one request and decides whether to retry.
+
+    Call :meth:`begin` before each attempt and :meth:`finish` after it;
+    ``finish`` returns the time to sleep before retrying, or None when the
+    outcome should be returned (or raised) as is.
+    """
+
+    __slots__ = (
+        'policy',
+        'method',
+        'budget',
+        'attempts',
+        '_started',
+        '_previous_delay',
+    )
+
+    def __init__(
+        self, policy: RetryPolicy, method: str, budget: Optional[RetryBudget] = None
+    ):
+        self.policy = policy
+        self.method = method.upper()
+        self.budget = budget
+        self.attempts: List[AttemptRecord] = []
+        self._started = 0.0
+        self._previous_delay = policy.backoff_factor
+        if budget is not None:
+            budget.deposit()
+
+    def begin(self) -> None:
+        self.attempts.append(AttemptRecord(len(self.attempts) + 1))
+        self._started = time.perf_counter()
+
+    def finish(
+        self,
+        status: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        error: Optional[BaseException] = None,
+        connect_error: bool = False,
+    ) -> Optional[float]:
+        """Record the attempt's outcome; returns the backoff before a retry, or None."""
+        record = self.attempts[-1]
+        record.latency_ms = (time.perf_counter() - self._started) * 1000
+        record.status = status
+        if error is not None:
+            record.error = f"{type(error).__name__}: {error}"
+
+        policy = self.policy
+        retry = len(self.attempts)
+        if retry > policy.total:
+            return None
+        if error is not None:
+            retryable = connect_error or self.method in IDEMPOTENT_METHODS
+        else:
+            retryable = (
+                status in policy.status_forcelist and self.method in IDEMPOTENT_METHODS
+            )
+        if not retryable:
+            return None
+
+        delay = None
+        if (
+            policy.respect_retry_after
+            and headers is not None
+            and status in RETRY_AFTER_STATUS_CODES
+        ):
+            delay = parse_retry_after(headers.get('Retry-After'))
+            if delay is not None and delay > policy.max_backoff:
+                return None
+        if delay is None:
+            delay = policy.backoff(retry, self._previous_delay)
+        if self.budget is not None and not self.budget.withdraw():
+            return None
+        self._previous_delay = delay
+        record.wait_ms = delay * 1000
+        return delay
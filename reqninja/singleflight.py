@@ -0,0 +1,89 @@
+"""Request coalescing (single-flight) for ReqNinja."""
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+# Only requests without side effects or bodies are coalesced
+SINGLE_FLIGHT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Any = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it is in flight wait for and share its result. If the
+    leader raises, each waiter raises a copy of the same exception type,
+    so callers handle it exactly as if they had made the call. Nothing is
+    remembered once the call completes, so this never serves stale data.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run ``fn`` once per key in flight; returns (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result, False
+
+        call.done.wait()
+        if call.error is not None:
+            error = _copy_error(call.error)
+            if error is call.error:
+                raise error
+            raise error from call.error
+        return call.result, True
+
+    def stats(self) -> Dict[str, int]:
+        """Upstream calls made and callers that shared one instead."""
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'shared': self.shared,
+                'in_flight': len(self._calls),
+            }
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """A copy of ``error`` for a waiter, so tracebacks are not shared.
+
+    Falls back to the original exception if its type cannot be rebuilt
+    from its arguments.
+    """
+    try:
+        return copy.copy(error)
+    except Exception:
+        return error
@@ -0,0 +1,149 @@
+"""High-resolution per-phase request timing for ReqNinja."""
+
+import threading
+from time import perf_counter_ns
+from typing import Any, Dict, Optional
+
+_NS_PER_MS = 1_000_000
+
+_local = threading.local()
+
+
+class PhaseTimings:
+    """Breakdown of where a request spent its time, in milliseconds.
+
+    ``dns_ms``, ``connect_ms`` and ``tls_ms`` are zero when a pooled
+    connection was reused (``connection_reused``) and ``None`` when the
+    transport cannot measure the phase separately. ``ttfb_ms`` runs from
+    sending the final attempt to receiving its response headers, and
+    ``download_ms`` from the headers to the end of the body. ``total_ms``
+    covers every attempt including ``retry_wait_ms`` spent backing off
+    and ``rate_limit_wait_ms`` spent waiting for the profile's rate limit.
+    ``dns_cached`` is True when the address came from ReqNinja's DNS cache
+    or an override, False when it was looked up, and None when no
+    connection was opened or the DNS cache is off.
+    With ``stream=True`` the body is read after the request returns, so
+    ``download_ms`` and ``total_ms`` stop shortly after the headers.
+    """
+
+    __slots__ = (
+        'dns_ms',
+        'connect_ms',
+        'tls_ms',
+        'ttfb_ms',
+        'download_ms',
+        'retry_wait_ms',
+        'rate_limit_wait_ms',
+        'total_ms',
+        'attempts',
+        'connection_reused',
+        'dns_cached',
+    )
+
+    def __init__(
+        self,
+        dns_ms: Optional[float] = 0.0,
+        connect_ms: Optional[float] = 0.0,
+        tls_ms: Optional[float] = 0.0,
+        ttfb_ms: float = 0.0,
+        download_ms: float = 0.0,
+        retry_wait_ms: float = 0.0,
+        rate_limit_wait_ms: float = 0.0,
+        total_ms: float = 0.0,
+        attempts: int = 1,
+        connection_reused: bool = False,
+        dns_cached: Optional[bool] = None,
+    ):
+        self.dns_ms = dns_ms
+        self.connect_ms = connect_ms
+        self.tls_ms = tls_ms
+        self.ttfb_ms = ttfb_ms
+        self.download_ms = download_ms
+        self.retry_wait_ms = retry_wait_ms
+        self.rate_limit_wait_ms = rate_limit_wait_ms
+        self.total_ms = total_ms
+        self.attempts = attempts
+        self.connection_reused = connection_reused
+        self.dns_cached = dns_cached
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (
+            f"<PhaseTimings total={self.total_ms:.2f}ms ttfb={self.ttfb_ms:.2f}ms "
+            f"attempts={self.attempts}>"
+        )
+
+
+class TimingRecorder:
+    """Collects phase events for one logical request on the current thread."""
+
+    __slots__ = (
+        'start_ns',
+        'dns_ns',
+        'connect_ns',
+        'tls_ns',
+        'retry_wait_ns',
+        'rate_limit_wait_ns',
+        'send_ns',
+        'headers_ns',
+        'attempts',
+        'new_connections',
+        'dns_cached',
+        '_previous',
+    )
+
+    def __init__(self):
+        self.start_ns = perf_counter_ns()
+        self.dns_ns = 0
+        self.connect_ns = 0
+        self.tls_ns = 0
+        self.retry_wait_ns = 0
+        self.rate_limit_wait_ns = 0
+        self.send_ns: Optional[int] = None
+        self.headers_ns: Optional[int] = None
+        self.attempts = 0
+        self.new_connections = 0
+        self.dns_cached: Optional[bool] = None
+        self._previous: Optional["TimingRecorder"] = None
+
+    def finish(self, end_ns: Optional[int] = None) -> PhaseTimings:
+        """Build the timing breakdown, ending now unless end_ns is given."""
+        end_ns = end_ns if end_ns is not None else perf_counter_ns()
+        ttfb_ns = download_ns = 0
+        if self.send_ns is not None and self.headers_ns is not None:
+            ttfb_ns = self.headers_ns - self.send_ns
+            download_ns = max(0, end_ns - self.headers_ns)
+        return PhaseTimings(
+            dns_ms=self.dns_ns / _NS_PER_MS,
+            connect_ms=self.connect_ns / _NS_PER_MS,
+            tls_ms=self.tls_ns / _NS_PER_MS,
+            ttfb_ms=ttfb_ns / _NS_PER_MS,
+            download_ms=download_ns / _NS_PER_MS,
+            retry_wait_ms=self.retry_wait_ns / _NS_PER_MS,
+            rate_limit_wait_ms=self.rate_limit_wait_ns / _NS_PER_MS,
+            total_ms=(end_ns - self.start_ns) / _NS_PER_MS,
+            attempts=max(1, self.attempts),
+            connection_reused=self.new_connections == 0,
+            dns_cached=self.dns_cached,
+        )
+
+
+def start_recording() -> TimingRecorder:
+    """Start recording phases for a request made on this thread."""
+    recorder = TimingRecorder()
+    recorder._previous = getattr(_local, 'recorder', None)
+    _local.recorder = recorder
+    return recorder
+
+
+def stop_recording(recorder: TimingRecorder) -> None:
+    """Stop recording, restoring any recorder of an enclosing request."""
+    _local.recorder = recorder._previous
+    recorder._previous = None
+
+
+def current_recorder() -> Optional[TimingRecorder]:
+    """The recorder for the request in progress on this thread, if any."""
+    return getattr(_local, 'recorder', None)
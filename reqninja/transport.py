@@ -0,0 +1,266 @@
+"""urllib3 transport pieces that let ReqNinja observe connection phases."""
+
+import socket
+import sys
+import threading
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+from .timing import current_recorder
+
+if TYPE_CHECKING:
+    from .dns import Resolver
+
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:  # urllib3 < 2
+    NameResolutionError = None
+
+
+AddrInfo = Tuple[int, int, int, str, Any]
+
+_local = threading.local()
+
+
+class RequestInterrupted(Exception):
+    """The request on this thread was abandoned by :meth:`Interruptible.interrupt`."""
+
+
+class Interruptible:
+    """Lets another thread abandon the request this thread is waiting on.
+
+    While entered (``with``) on a thread, a connection waiting there for
+    response headers registers its socket, and :meth:`interrupt` shuts it
+    down so the wait ends with :class:`RequestInterrupted`. A request not
+    waiting for headers when interrupted fails the next time it would.
+    """
+
+    __slots__ = ('interrupted', '_sock', '_lock', '_previous')
+
+    def __init__(self):
+        self.interrupted = False
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._previous: Optional["Interruptible"] = None
+
+    def __enter__(self) -> "Interruptible":
+        self._previous = getattr(_local, 'interruptible', None)
+        _local.interruptible = self
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _local.interruptible = self._previous
+
+    def interrupt(self) -> None:
+        with self._lock:
+            self.interrupted = True
+            if self._sock is not None:
+                try:
+                    # Below any TLS layer, which the waiting thread is using
+                    socket.socket.shutdown(self._sock, socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def _watch(self, sock: Optional[socket.socket]) -> None:
+        with self._lock:
+            if self.interrupted:
+                raise RequestInterrupted("Request interrupted")
+            self._sock = sock
+
+    def _unwatch(self) -> bool:
+        # Under the lock, so a pooled connection is never shut down once
+        # this request is done with it
+        with self._lock:
+            self._sock = None
+            return self.interrupted
+
+
+def resolve(host: str, port: int) -> List[AddrInfo]:
+    """Resolve a host the way urllib3 does, honouring its IPv6 policy."""
+    if host.startswith('['):
+        host = host.strip('[]')
+    return socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+
+
+def connect(
+    addresses: Sequence[AddrInfo],
+    timeout: Any,
+    source_address: Optional[Tuple[str, int]] = None,
+    socket_options: Optional[Sequence[Tuple[int, int, Any]]] = None,
+) -> socket.socket:
+    """Connect to the first reachable address, as urllib3's create_connection."""
+    error: Optional[OSError] = None
+    for family, socktype, proto, _, sockaddr in addresses:
+        sock = None
+        try:
+            sock = socket.socket(family, socktype, proto)
+            for option in socket_options or ():
+                sock.setsockopt(*option)
+            # urllib3 passes a sentinel for "leave the socket default"
+            if timeout is None or isinstance(timeout, (int, float)):
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            error = e
+            if sock is not None:
+                sock.close()
+    if error is not None:
+        raise error
+    raise OSError("getaddrinfo returns an empty list")
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """HTTPConnection that reports DNS, connect and TTFB phases.
+
+    Pool classes made by :func:`pool_classes` set :attr:`resolver` to
+    resolve through ReqNinja's DNS cache and overrides and to connect
+    with happy eyeballs.
+    """
+
+    resolver: Optional["Resolver"] = None
+
+    def _new_conn(self) -> socket.socket:
+        recorder = current_recorder()
+        resolver = self.resolver
+        cached = None
+        started = perf_counter_ns()
+        try:
+            if resolver is None:
+                addresses = resolve(self._dns_host, self.port)
+            else:
+                addresses, cached = resolver.resolve(
+                    self._dns_host.strip('[]'), self.port, allowed_gai_family()
+                )
+        except socket.gaierror as e:
+            if NameResolutionError is not None:
+                raise NameResolutionError(self.host, self, e) from e
+            raise NewConnectionError(
+                self, f"Failed to establish a new connection: {e}"
+            ) from e
+        resolved = perf_counter_ns()
+        try:
+            sock = (resolver.connect if resolver is not None else connect)(
+                addresses, self.timeout, self.source_address, self.socket_options
+            )
+        except socket.timeout as e:
+            raise ConnectTimeoutError(
+                self,
+                f"Connection to {self.host} timed out. "
+                f"(connect timeout={self.timeout})",
+            ) from e
+        except OSError as e:
+            raise NewConnectionError(
+                self, f"Failed to establish a new connection: {e}"
+            ) from e
+        if recorder is not None:
+            recorder.dns_ns += resolved - started
+            recorder.connect_ns += perf_counter_ns() - resolved
+            recorder.new_connections += 1
+            if cached is not None:
+                recorder.dns_cached = cached
+        sys.audit("http.client.connect", self, self.host, self.port)
+        return sock
+
+    def request(self, *args, **kwargs):
+        recorder = current_recorder()
+        if recorder is not None:
+            recorder.send_ns = perf_counter_ns()
+            recorder.headers_ns = None
+        return super().request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        scope = getattr(_local, 'interruptible', None)
+        if scope is None:
+            response = super().getresponse(*args, **kwargs)
+        else:
+            scope._watch(self.sock)
+            try:
+                response = super().getresponse(*args, **kwargs)
+            except Exception:
+                if scope._unwatch():
+                    raise RequestInterrupted("Request interrupted") from None
+                raise
+            if scope._unwatch():
+                # The socket may have been shut down under the body
+                response.close()
+                raise RequestInterrupted("Request interrupted")
+        recorder = current_recorder()
+        if recorder is not None:
+            recorder.headers_ns = perf_counter_ns()
+        return response
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    """HTTPSConnection that also reports the TLS handshake."""
+
+    def connect(self) -> None:
+        recorder = current_recorder()
+        if recorder is None:
+            return super().connect()
+        before = recorder.dns_ns + recorder.connect_ns
+        started = perf_counter_ns()
+        super().connect()
+        elapsed = perf_counter_ns() - started
+        tcp = recorder.dns_ns + recorder.connect_ns - before
+        recorder.tls_ns += max(0, elapsed - tcp)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+POOL_CLASSES_BY_SCHEME = {
+    'http': TimedHTTPConnectionPool,
+    'https': TimedHTTPSConnectionPool,
+}
+
+
+def pool_classes(
+    resolver: Optional["Resolver"] = None,
+) -> Dict[str, Type[HTTPConnectionPool]]:
+    """Pool classes whose connections resolve and connect through ``resolver``."""
+    if resolver is None:
+        return POOL_CLASSES_BY_SCHEME
+    classes = {}
+    for scheme, pool_class in POOL_CLASSES_BY_SCHEME.items():
+        connection_class = type(
+            pool_class.ConnectionCls.__name__,
+            (pool_class.ConnectionCls,),
+            {'resolver': resolver},
+        )
+        classes[scheme] = type(
+            pool_class.__name__, (pool_class,), {'ConnectionCls': connection_class}
+        )
+    return classes
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools record request phases."""
+
+    def __init__(self, *args, resolver: Optional["Resolver"] = None, **kwargs):
+        # Set before HTTPAdapter.__init__ builds the pool manager
+        self.resolver = resolver
+        self._pool_classes = pool_classes(resolver)
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes
+
+    def proxy_manager_for(self, *args, **kwargs):
+        manager = super().proxy_manager_for(*args, **kwargs)
+        manager.pool_classes_by_scheme = self._pool_classes
+        return manager
@@ -0,0 +1,280 @@
+"""Streaming request bodies for ReqNinja: files, iterators and multipart."""
+
+import io
+import os
+import stat
+import sys
+from typing import (
+    Any,
+    AsyncIterator,
+    BinaryIO,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_chunks(
+    fileobj: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yield ``fileobj`` in chunks of at most ``chunk_size`` bytes.
+
+    requests sends iterators with chunked transfer encoding. Iterating a
+    file object directly would yield lines, which may be arbitrarily long.
+    """
+    read = fileobj.read
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def open_body(
+    path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Union[BinaryIO, Iterator[bytes]]:
+    """Open ``path`` as a streaming request body; ``-`` means stdin.
+
+    Regular files are returned as open binary files, so they are sent with
+    a Content-Length and can be rewound for retries. Pipes and other
+    unsized sources are returned as chunk iterators, sent with chunked
+    transfer encoding. The caller closes returned files.
+    """
+    if path == '-':
+        return iter_chunks(sys.stdin.buffer, chunk_size)
+    f = open(path, 'rb')
+    if not _is_regular(f):
+        return iter_chunks(f, chunk_size)
+    return f
+
+
+def _is_regular(fileobj: Any) -> bool:
+    try:
+        return stat.S_ISREG(os.fstat(fileobj.fileno()).st_mode)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+
+
+def is_replayable(body: Any) -> bool:
+    """Whether ``body`` can be sent again, e.g. when a request is retried."""
+    if body is None or isinstance(
+        body, (str, bytes, bytearray, memoryview, Mapping, list, tuple)
+    ):
+        return True
+    seekable = getattr(body, 'seekable', None)
+    if seekable is not None:
+        try:
+            return bool(seekable())
+        except (OSError, ValueError):
+            return False
+    return callable(getattr(body, 'seek', None)) and callable(
+        getattr(body, 'tell', None)
+    )
+
+
+def body_position(body: Any) -> Optional[int]:
+    """Where a seekable file-like ``body`` starts, so another attempt can rewind it.
+
+    None for bodies that need no rewinding or cannot be rewound.
+    """
+    if not callable(getattr(body, 'read', None)) or not is_replayable(body):
+        return None
+    try:
+        return body.tell()
+    except (OSError, ValueError):
+        return None
+
+
+async def aiter_body(
+    body: Any, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Yield a file-like or iterable sync ``body`` for an async HTTP client."""
+    if callable(getattr(body, 'read', None)):
+        for chunk in iter_chunks(body, chunk_size):
+            yield chunk
+        return
+    for chunk in body:
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def _remaining_size(fileobj: Any) -> int:
+    """Bytes left to read from a sized file-like object."""
+    if isinstance(fileobj, (bytes, bytearray, memoryview)):
+        return len(fileobj)
+    try:
+        return os.fstat(fileobj.fileno()).st_size - fileobj.tell()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    try:
+        position = fileobj.tell()
+        fileobj.seek(0, os.SEEK_END)
+        end = fileobj.tell()
+        fileobj.seek(position)
+        return end - position
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        raise ValueError(
+            f"Cannot determine the size of {fileobj!r}; "
+            "multipart files must be seekable"
+        )
+
+
+FieldValue = Union[str, bytes, os.PathLike, Tuple[Any, ...]]
+
+
+class MultipartEncoder:
+    """Lazily encoded multipart/form-data body with a known length.
+
+    ``fields`` is a mapping or list of ``(name, value)`` pairs. A value is
+    either a plain ``str``/``bytes`` field, a path (``os.PathLike``) to
+    upload, or a ``(filename, content[, content_type])`` tuple as accepted
+    by requests' ``files=``, where content is a file object, bytes or a
+    path. File contents are read in chunks as
+    the body is sent, so memory use does not depend on file sizes.
+
+    Pass the encoder as ``data=``; ReqNinja sets the Content-Type header
+    from :attr:`content_type`. ``seek``/``tell`` let urllib3 rewind it when
+    a request is retried.
+    """
+
+    def __init__(
+        self,
+        fields: Union[Mapping[str, FieldValue], Iterable[Tuple[str, FieldValue]]],
+        boundary: Optional[str] = None,
+    ):
+        self.boundary = boundary or os.urandom(16).hex()
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        # (start offset, length, bytes or (fileobj, file start position))
+        self._segments: List[Tuple[int, int, Any]] = []
+        self._opened: List[BinaryIO] = []
+        self._length = 0
+        self._position = 0
+        self._index = 0
+
+        items = fields.items() if isinstance(fields, Mapping) else fields
+        try:
+            for name, value in items:
+                self._add_field(name, value)
+        except BaseException:
+            self.close()
+            raise
+        self._add(f'--{self.boundary}--\r\n'.encode('ascii'))
+
+    def _add(self, data: Any, length: Optional[int] = None) -> None:
+        length = len(data) if length is None else length
+        self._segments.append((self._length, length, data))
+        self._length += length
+
+    def _add_field(self, name: str, value: FieldValue) -> None:
+        if isinstance(value, os.PathLike):
+            value = (os.path.basename(os.fspath(value)), value)
+
+        if isinstance(value, tuple):
+            import mimetypes
+
+            filename, content = value[0], value[1]
+            content_type = value[2] if len(value) > 2 else None
+            content_type = (
+                content_type
+                or (filename and mimetypes.guess_type(filename)[0])
+                or 'application/octet-stream'
+            )
+            disposition = f'form-data; name="{_quote(name)}"'
+            if filename:
+                disposition += f'; filename="{_quote(filename)}"'
+            self._add(
+                f'--{self.boundary}\r\nContent-Disposition: {disposition}\r\n'
+                f'Content-Type: {content_type}\r\n\r\n'.encode('utf-8')
+            )
+            if isinstance(content, os.PathLike):
+                content = open(content, 'rb')
+                self._opened.append(content)
+            elif isinstance(content, str):
+                content = content.encode('utf-8')
+            if isinstance(content, (bytes, bytearray)):
+                self._add(bytes(content))
+            else:
+                size = _remaining_size(content)
+                self._add((content, content.tell()), size)
+            self._add(b'\r\n')
+            return
+
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        self._add(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; '
+            f'name="{_quote(name)}"\r\n\r\n'.encode('utf-8') + value + b'\r\n'
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._length
+        self._position = max(0, min(offset, self._length))
+        self._index = 0
+        return self._position
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes of the encoded body (all if negative)."""
+        if size is None or size < 0:
+            size = self._length - self._position
+        parts = []
+        segments = self._segments
+        while size > 0 and self._position < self._length:
+            start, length, data = segments[self._index]
+            offset = self._position - start
+            if offset >= length:
+                self._index += 1
+                continue
+            wanted = min(size, length - offset)
+            if isinstance(data, bytes):
+                chunk = data[offset : offset + wanted]
+            else:
+                fileobj, file_start = data
+                fileobj.seek(file_start + offset)
+                chunk = fileobj.read(wanted)
+                if not chunk:
+                    raise IOError(f"{fileobj!r} ended before its expected size")
+            parts.append(chunk)
+            self._position += len(chunk)
+            size -= len(chunk)
+        return b''.join(parts)
+
+    def close(self) -> None:
+        """Close files this encoder opened from paths."""
+        for f in self._opened:
+            f.close()
+        self._opened.clear()
+
+    def __enter__(self) -> "MultipartEncoder":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<MultipartEncoder {self._length} bytes>"
+
+
+def _quote(value: str) -> str:
+    return (
+        value.replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\r', '%0D')
+        .replace('\n', '%0A')
+    )
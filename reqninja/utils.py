@@ -55,3 +55,12 @@ def truncate_text(text: str, max_length: int = 100) -> str:
     if len(text) <= max_length:
         return text
     return text[:max_length-3] + "..."
+
+
+def parse_duration(value: str) -> float:
+    """Parse a duration such as '500ms', '30s', '5m', '1h' or '90' into seconds."""
+    match = re.match(r'^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$', str(value))
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r}")
+    amount, unit = float(match.group(1)), match.group(2) or 's'
+    return amount * {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}[unit]
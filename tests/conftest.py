@@ -4,7 +4,9 @@ import pytest
 import responses
 from pathlib import Path
 import tempfile
+import threading
 import os
+from http.server import ThreadingHTTPServer
 
 from reqninja import Config, ReqNinjaClient
 
@@ -70,3 +72,23 @@ def config_with_file(temp_config_dir, sample_config):
         yaml.dump(sample_config, f)
     
     return Config(config_file)
+
+
+@pytest.fixture
+def http_server():
+    """Start local HTTP servers for a test; call with a handler class."""
+    servers = []
+    
+    def start(handler_class):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+    
+    yield start
+    
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,178 @@
+"""Test cases for the asyncio ReqNinja client."""
+
+import asyncio
+import io
+import warnings
+
+import httpx
+import pytest
+
+from reqninja import AsyncReqNinjaClient, ReqNinjaResponse
+from reqninja.exceptions import ReqNinjaError
+
+
+def _client(config, handler, **kwargs):
+    return AsyncReqNinjaClient(config, transport=httpx.MockTransport(handler), **kwargs)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestAsyncReqNinjaClient:
+    """Test the asyncio client."""
+    
+    def test_get_returns_reqninja_response(self, config_with_file):
+        """Test GET returns a ReqNinjaResponse with the decoded body."""
+        def handler(request):
+            return httpx.Response(200, json={"result": "success"})
+        
+        async def main():
+            async with _client(config_with_file, handler) as client:
+                return await client.get("https://example.com/api")
+        
+        response = _run(main())
+        assert isinstance(response, ReqNinjaResponse)
+        assert response.status_code == 200
+        assert response.json() == {"result": "success"}
+        assert response.headers['Content-Type'] == 'application/json'
+        assert response.elapsed_ms >= 0
+    
+    def test_profile_and_auth(self, config_with_file):
+        """Test profile base URL, headers and auth are applied."""
+        seen = {}
+        
+        def handler(request):
+            seen['url'] = str(request.url)
+            seen['headers'] = request.headers
+            return httpx.Response(204)
+        
+        async def main():
+            async with _client(config_with_file, handler) as client:
+                await client.get(
+                    "/users", profile="test",
+                    auth={'type': 'api_key', 'key': 'k1'}
+                )
+        
+        _run(main())
+        assert seen['url'] == "https://api.test.com/users"
+        assert seen['headers']['Authorization'] == 'Bearer test-token'
+        assert seen['headers']['X-API-Key'] == 'k1'
+    
+    def test_retries_on_status_forcelist(self, config_with_file):
+        """Test idempotent requests are retried on retryable statuses."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                return httpx.Response(503, headers={'Retry-After': '0'})
+            return httpx.Response(200)
+        
+        async def main():
+            async with _client(config_with_file, handler) as client:
+                return await client.get("https://example.com/flaky")
+        
+        response = _run(main())
+        assert response.status_code == 200
+        assert len(calls) == 3
+    
+    def test_retries_argument_and_post(self, config_with_file):
+        """Test retries= caps attempts and POST is not retried on status."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(503, headers={'Retry-After': '0'})
+        
+        async def main():
+            async with _client(config_with_file, handler) as client:
+                first = await client.get("https://example.com/x", retries=1)
+                second = await client.post("https://example.com/x", json={})
+                return first, second
+        
+        first, second = _run(main())
+        assert first.status_code == 503
+        assert second.status_code == 503
+        assert calls == ['GET', 'GET', 'POST']
+    
+    def test_transport_error_wrapped(self, config_with_file):
+        """Test transport errors surface as ReqNinjaError."""
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+        
+        async def main():
+            async with _client(config_with_file, handler) as client:
+                await client.get("https://example.com/api", retries=0)
+        
+        with pytest.raises(ReqNinjaError):
+            _run(main())
+    
+    def test_bounded_concurrency(self, config_with_file):
+        """Test no more than max_concurrency requests run at once."""
+        in_flight = 0
+        peak = 0
+        
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200)
+        
+        async def main():
+            async with _client(config_with_file, handler, max_concurrency=5) as client:
+                return await asyncio.gather(*[
+                    client.get(f"https://example.com/{i}") for i in range(50)
+                ])
+        
+        responses = _run(main())
+        assert len(responses) == 50
+        assert peak == 5
+    
+    def test_file_body_rewound_for_retries(self, config_with_file):
+        """Test a seekable file body is streamed in full on every attempt."""
+        bodies = []
+        
+        async def handler(request):
+            bodies.append((await request.aread(), request.headers.get('Content-Length')))
+            if len(bodies) < 2:
+                return httpx.Response(503, headers={'Retry-After': '0'})
+            return httpx.Response(200)
+        
+        async def main():
+            async with _client(config_with_file, handler) as client:
+                body = io.BytesIO(b'skip:payload')
+                body.seek(5)
+                return await client.put("https://example.com/upload", data=body)
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            response = _run(main())
+        assert response.status_code == 200
+        assert bodies == [(b'payload', '7'), (b'payload', '7')]
+    
+    def test_iterator_body_streamed_once(self, config_with_file):
+        """Test an iterator body is sent chunked and not retried."""
+        bodies = []
+        
+        async def handler(request):
+            bodies.append(await request.aread())
+            return httpx.Response(503, headers={'Retry-After': '0'})
+        
+        async def main():
+            async with _client(config_with_file, handler) as client:
+                return await client.put("https://example.com/upload", data=iter([b'a', 'b']))
+        
+        assert _run(main()).status_code == 503
+        assert bodies == [b'ab']
+    
+    def test_stream_rejected(self, config_with_file):
+        """Test stream=True raises a ReqNinjaError instead of a TypeError."""
+        async def main():
+            async with _client(config_with_file, lambda r: httpx.Response(200)) as client:
+                await client.get("https://example.com/big", stream=True)
+        
+        with pytest.raises(ReqNinjaError, match='stream=True'):
+            _run(main())
@@ -0,0 +1,231 @@
+"""Test cases for authentication schemes."""
+
+import base64
+import hashlib
+import hmac
+import time
+
+import pytest
+import responses
+import yaml
+
+from reqninja import AuthScheme, Config, ReqNinjaClient, register_auth_scheme
+from reqninja.auth import AuthHandler, parse_auth_string
+from reqninja.exceptions import AuthenticationError
+
+
+class CountingScheme(AuthScheme):
+    """Static scheme that counts how often it is built."""
+    
+    built = 0
+    
+    def __init__(self, config):
+        super().__init__(config)
+        type(self).built += 1
+        self.headers = {'X-Token': config['token']}
+
+
+class TestAuthHandler:
+    """Test scheme memoization and the built-in schemes."""
+    
+    def test_basic_auth_headers(self):
+        """Test basic auth encodes the credentials."""
+        headers = AuthHandler().get_auth_headers(
+            {'type': 'basic', 'username': 'user', 'password': 'pass'}
+        )
+        expected = base64.b64encode(b'user:pass').decode()
+        assert headers == {'Authorization': f'Basic {expected}'}
+    
+    def test_schemes_are_memoized_by_content(self):
+        """Test equal auth configs share one scheme and headers mapping."""
+        handler = AuthHandler()
+        first = handler.get_auth_headers({'type': 'bearer', 'token': 'abc'})
+        second = handler.get_auth_headers({'token': 'abc', 'type': 'bearer'})
+        other = handler.get_auth_headers({'type': 'bearer', 'token': 'xyz'})
+        
+        assert first is second
+        assert other == {'Authorization': 'Bearer xyz'}
+    
+    def test_cache_is_bounded(self):
+        """Test the least recently used schemes are evicted."""
+        handler = AuthHandler(max_cached=2)
+        schemes = [handler.scheme({'type': 'bearer', 'token': str(i)}) for i in range(3)]
+        
+        assert handler.scheme({'type': 'bearer', 'token': '2'}) is schemes[2]
+        assert handler.scheme({'type': 'bearer', 'token': '0'}) is not schemes[0]
+    
+    def test_unknown_type_raises(self):
+        """Test an unsupported auth type raises AuthenticationError."""
+        with pytest.raises(AuthenticationError, match='Unsupported auth type'):
+            AuthHandler().get_auth_headers({'type': 'kerberos'})
+    
+    def test_missing_credentials_raise(self):
+        """Test schemes validate their config."""
+        with pytest.raises(AuthenticationError):
+            AuthHandler().get_auth_headers({'type': 'bearer'})
+    
+    def test_register_custom_scheme(self):
+        """Test a registered scheme is built once per config."""
+        register_auth_scheme('counting', CountingScheme)
+        handler = AuthHandler()
+        
+        for _ in range(3):
+            headers = handler.get_auth_headers({'type': 'counting', 'token': 't'})
+        
+        assert headers == {'X-Token': 't'}
+        assert CountingScheme.built == 1
+    
+    def test_register_rejects_non_schemes(self):
+        """Test only AuthScheme subclasses can be registered."""
+        with pytest.raises(TypeError):
+            register_auth_scheme('bad', object)
+    
+    def test_parse_auth_string(self):
+        """Test CLI auth strings are parsed into configs."""
+        assert parse_auth_string('bearer abc') == {'type': 'bearer', 'token': 'abc'}
+        assert parse_auth_string('basic u:p') == {
+            'type': 'basic', 'username': 'u', 'password': 'p'
+        }
+
+
+class TestHmacAuth:
+    """Test HMAC request signing."""
+    
+    def _verify(self, header, method, target, body):
+        prefix, rest = header.split(' ', 1)
+        fields = dict(part.split('=', 1) for part in rest.split(', '))
+        body_hash = hashlib.sha256(body).hexdigest()
+        message = f'{method}\n{target}\n{fields["ts"]}\n{body_hash}'.encode()
+        expected = hmac.new(b'secret', message, 'sha256').hexdigest()
+        assert prefix == 'HMAC-SHA256'
+        assert fields['keyId'] == '"key-1"'
+        assert abs(int(fields['ts']) - time.time()) < 5
+        assert fields['signature'] == expected
+    
+    def test_signs_method_target_and_body(self):
+        """Test the signature covers method, path, query and body."""
+        handler = AuthHandler()
+        config = {'type': 'hmac', 'key_id': 'key-1', 'secret': 'secret'}
+        
+        headers = handler.get_auth_headers(
+            config, 'post', 'https://api.example.com/v1/items?page=2', data=b'payload'
+        )
+        
+        self._verify(headers['Authorization'], 'POST', '/v1/items?page=2', b'payload')
+    
+    def test_json_body_is_signed_as_sent(self):
+        """Test json= bodies are hashed the way requests serializes them."""
+        handler = AuthHandler()
+        config = {'type': 'hmac', 'key_id': 'key-1', 'secret': 'secret'}
+        
+        headers = handler.get_auth_headers(
+            config, 'PUT', 'https://api.example.com/x', json={'a': 1}
+        )
+        
+        self._verify(headers['Authorization'], 'PUT', '/x', b'{"a": 1}')
+    
+    @responses.activate
+    def test_client_signs_each_request(self, temp_config_dir):
+        """Test the client signs requests on an hmac profile."""
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({'profiles': {'signed': {
+            'base_url': 'https://api.example.com',
+            'auth': {'type': 'hmac', 'key_id': 'key-1', 'secret': 'secret'},
+        }}}))
+        responses.add(responses.POST, 'https://api.example.com/orders', status=201)
+        client = ReqNinjaClient(Config(config_file))
+        
+        client.post('/orders', profile='signed', data=b'{"qty": 1}')
+        
+        sent = responses.calls[0].request
+        self._verify(sent.headers['Authorization'], 'POST', '/orders', b'{"qty": 1}')
+    
+    @responses.activate
+    def test_params_are_signed(self, temp_config_dir):
+        """Test params= are covered by the signature, as the server receives them."""
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({'profiles': {'signed': {
+            'base_url': 'https://api.example.com',
+            'auth': {'type': 'hmac', 'key_id': 'key-1', 'secret': 'secret'},
+        }}}))
+        responses.add(responses.GET, 'https://api.example.com/orders', status=200)
+        client = ReqNinjaClient(Config(config_file))
+        
+        client.get('/orders?page=2', profile='signed', params={'q': 'a b', 'tag': ['x', 'y']})
+        
+        sent = responses.calls[0].request
+        assert sent.path_url == '/orders?page=2&q=a+b&tag=x&tag=y'
+        self._verify(sent.headers['Authorization'], 'GET', sent.path_url, b'')
+    
+    def test_async_params_are_signed(self, temp_config_dir):
+        """Test the async client sends the signed query string."""
+        import asyncio
+        
+        import httpx
+        
+        from reqninja import AsyncReqNinjaClient
+        
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({'profiles': {'signed': {
+            'auth': {'type': 'hmac', 'key_id': 'key-1', 'secret': 'secret'},
+        }}}))
+        sent = []
+        
+        def handler(request):
+            sent.append(request)
+            return httpx.Response(200)
+        
+        async def main():
+            transport = httpx.MockTransport(handler)
+            async with AsyncReqNinjaClient(Config(config_file), transport=transport) as client:
+                await client.get(
+                    'https://api.example.com/orders', profile='signed', params={'q': 'a b'}
+                )
+        
+        asyncio.run(main())
+        
+        target = sent[0].url.raw_path.decode()
+        assert target == '/orders?q=a+b'
+        self._verify(sent[0].headers['Authorization'], 'GET', target, b'')
+
+
+class TestProfileAuthCaching:
+    """Test profile auth is resolved once and follows config changes."""
+    
+    @responses.activate
+    def test_env_change_refreshes_profile_auth(self, temp_config_dir, monkeypatch):
+        """Test a changed environment variable yields new auth headers."""
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({'profiles': {'svc': {
+            'base_url': 'https://api.example.com',
+            'auth': {'type': 'bearer', 'token': '${SVC_TOKEN}'},
+        }}}))
+        responses.add(responses.GET, 'https://api.example.com/me', status=200)
+        client = ReqNinjaClient(Config(config_file))
+        
+        monkeypatch.setenv('SVC_TOKEN', 'first')
+        client.get('/me', profile='svc')
+        client.get('/me', profile='svc')
+        monkeypatch.setenv('SVC_TOKEN', 'second')
+        client.get('/me', profile='svc')
+        
+        sent = [call.request.headers['Authorization'] for call in responses.calls]
+        assert sent == ['Bearer first', 'Bearer first', 'Bearer second']
+    
+    def test_clients_sharing_config_have_own_schemes(self, temp_config_dir):
+        """Test each client resolves profile auth through its own handler."""
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({'profiles': {'svc': {
+            'auth': {'type': 'bearer', 'token': 'tok'},
+        }}}))
+        config = Config(config_file)
+        first = ReqNinjaClient(config)
+        second = ReqNinjaClient(config)
+        profile = config.resolve_profile('svc')
+        
+        scheme = first._auth_scheme(profile)
+        
+        assert first._auth_scheme(profile) is scheme
+        assert second._auth_scheme(profile) is not scheme
+        first.auth_handler.invalidate()
+        assert first._auth_scheme(profile) is not scheme
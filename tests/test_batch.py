@@ -0,0 +1,222 @@
+"""Test cases for concurrent batch execution."""
+
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from reqninja import ReqNinjaClient, RequestSpec
+from reqninja.batch import load_specs
+from reqninja.cli import cli
+from reqninja.exceptions import BatchError, BatchTimeoutError, ReqNinjaError
+
+
+def _fake_request(delays=None, fail_urls=()):
+    """Build a Session.request replacement that echoes the URL."""
+    delays = delays or {}
+    
+    def fake(self, method, url, **kwargs):
+        time.sleep(delays.get(url, 0))
+        if url in fail_urls:
+            from requests.exceptions import ConnectionError
+            raise ConnectionError("boom")
+        response = Mock()
+        response.status_code = 200
+        response.url = url
+        response.method = method
+        return response
+    
+    return fake
+
+
+class TestRequestSpec:
+    """Test request spec parsing."""
+    
+    def test_from_dict_body_mapping(self):
+        """Test dict bodies become json= and strings become data=."""
+        spec = RequestSpec.from_dict({'method': 'post', 'url': '/a', 'body': {'x': 1}})
+        assert spec.method == 'POST'
+        assert spec.request_kwargs() == {'json': {'x': 1}}
+        
+        spec = RequestSpec.from_dict({'url': '/a', 'body': 'raw', 'profile': 'test'})
+        assert spec.request_kwargs() == {'data': 'raw', 'profile': 'test'}
+    
+    def test_from_dict_requires_url(self):
+        """Test specs without a URL are rejected."""
+        with pytest.raises(ReqNinjaError):
+            RequestSpec.from_dict({'method': 'GET'})
+
+
+class TestBatch:
+    """Test ReqNinjaClient.batch and map."""
+    
+    def test_ordered_results(self, config_with_file):
+        """Test ordered batches yield in input order."""
+        urls = [f"https://example.com/{i}" for i in range(20)]
+        delays = {urls[0]: 0.05}
+        with patch('requests.Session.request', _fake_request(delays)):
+            client = ReqNinjaClient(config_with_file)
+            run = client.map('GET', urls, concurrency=4)
+            assert [r.url for r in run] == urls
+        assert run.stats.total == 20
+        assert run.stats.succeeded == 20
+        assert run.stats.status_counts == {200: 20}
+    
+    def test_completion_order(self, config_with_file):
+        """Test unordered batches yield fast responses first."""
+        slow, fast = "https://example.com/slow", "https://example.com/fast"
+        with patch('requests.Session.request', _fake_request({slow: 0.1})):
+            client = ReqNinjaClient(config_with_file)
+            run = client.batch([{'url': slow}, {'url': fast}], concurrency=2)
+            assert [r.url for r in run] == [fast, slow]
+    
+    def test_runs_concurrently(self, config_with_file):
+        """Test requests overlap up to the concurrency limit."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+        
+        def fake(self, method, url, **kwargs):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            return Mock(status_code=200)
+        
+        with patch('requests.Session.request', fake):
+            client = ReqNinjaClient(config_with_file)
+            urls = (f"https://example.com/{i}" for i in range(24))
+            assert len(list(client.map('GET', urls, concurrency=6))) == 24
+        assert peak == 6
+    
+    def test_collect_all_errors(self, config_with_file):
+        """Test failures are collected without stopping the batch."""
+        bad = "https://example.com/bad"
+        with patch('requests.Session.request', _fake_request(fail_urls={bad})):
+            client = ReqNinjaClient(config_with_file)
+            run = client.map('GET', ["https://example.com/ok", bad])
+            results = list(run.results())
+        assert [r.ok for r in results] == [True, False]
+        assert run.errors[0].index == 1
+        assert isinstance(run.errors[0].error, ReqNinjaError)
+        assert run.stats.failed == 1
+    
+    def test_kept_errors_capped(self, config_with_file):
+        """Test only the first max_errors failures are kept; all are counted."""
+        urls = [f"https://example.com/bad{i}" for i in range(10)]
+        with patch('requests.Session.request', _fake_request(fail_urls=set(urls))):
+            client = ReqNinjaClient(config_with_file)
+            run = client.map('GET', urls, max_errors=3)
+            results = list(run.results())
+        assert not any(r.ok for r in results)
+        assert [e.index for e in run.errors] == [0, 1, 2]
+        assert run.stats.failed == 10
+        assert run.stats.to_dict()['error_counts'] == {'ReqNinjaError': 10}
+    
+    def test_fail_fast(self, config_with_file):
+        """Test fail_fast raises on the first failure."""
+        bad = "https://example.com/bad"
+        with patch('requests.Session.request', _fake_request(fail_urls={bad})):
+            client = ReqNinjaClient(config_with_file)
+            run = client.map('GET', [bad, "https://example.com/ok"], fail_fast=True)
+            with pytest.raises(BatchError) as excinfo:
+                list(run)
+        assert excinfo.value.index == 0
+    
+    def test_batch_timeout(self, config_with_file):
+        """Test the per-batch timeout."""
+        slow = "https://example.com/slow"
+        with patch('requests.Session.request', _fake_request({slow: 0.5})):
+            client = ReqNinjaClient(config_with_file)
+            run = client.batch([{'url': slow}], timeout=0.05)
+            with pytest.raises(BatchTimeoutError):
+                list(run)
+
+
+class TestLoadSpecs:
+    """Test reading request specs from files."""
+    
+    def test_jsonl_is_read_lazily(self, temp_config_dir):
+        """Test JSONL specs are yielded line by line, skipping comments."""
+        path = temp_config_dir / 'specs.jsonl'
+        path.write_text(
+            '# comment\n'
+            '{"url": "https://example.com/1"}\n'
+            '\n'
+            '{"method": "POST", "url": "https://example.com/2", "body": {"a": 1}}\n'
+        )
+        specs = load_specs(str(path))
+        assert next(specs) == {'url': 'https://example.com/1'}
+        assert next(specs)['method'] == 'POST'
+        assert list(specs) == []
+    
+    def test_jsonl_invalid_line(self, temp_config_dir):
+        """Test invalid JSON reports the line number."""
+        path = temp_config_dir / 'specs.jsonl'
+        path.write_text('{"url": "/a"}\nnot json\n')
+        with pytest.raises(ReqNinjaError, match=':2:'):
+            list(load_specs(str(path)))
+    
+    def test_yaml_list_and_documents(self, temp_config_dir):
+        """Test YAML files with a list or multiple documents."""
+        path = temp_config_dir / 'specs.yml'
+        path.write_text('- url: /a\n- url: /b\n---\nurl: /c\n')
+        assert [s['url'] for s in load_specs(str(path))] == ['/a', '/b', '/c']
+
+
+class TestBatchCommand:
+    """Test the `reqninja batch` CLI command."""
+    
+    def test_streams_results_and_summary(self, config_with_file, temp_config_dir):
+        """Test results are written as JSONL with a summary on stderr."""
+        specs = temp_config_dir / 'specs.jsonl'
+        specs.write_text('\n'.join(
+            json.dumps({'url': f'/items/{i}'}) for i in range(5)
+        ))
+        output = temp_config_dir / 'out.jsonl'
+        
+        runner = CliRunner()
+        with patch('requests.Session.request', _fake_request()):
+            result = runner.invoke(cli, [
+                '--config', str(config_with_file.config_path),
+                'batch', str(specs), '-c', '2', '-p', 'test',
+                '-o', str(output), '--ordered',
+            ])
+        
+        assert result.exit_code == 0, result.output
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [r['index'] for r in records] == list(range(5))
+        assert all(r['status_code'] == 200 for r in records)
+        assert 'BATCH SUMMARY' in result.output
+        assert 'Requests: 5 (5 completed, 0 failed)' in result.output
+    
+    def test_missing_file(self, config_with_file, temp_config_dir):
+        """Test a missing spec file is a one-line error, not a traceback."""
+        result = CliRunner().invoke(cli, [
+            '--config', str(config_with_file.config_path),
+            'batch', str(temp_config_dir / 'missing.jsonl'),
+        ])
+        
+        assert result.exit_code == 1
+        assert result.output.startswith('Error: ')
+        assert 'Traceback' not in result.output
+        assert not isinstance(result.exception, OSError)
+    
+    def test_invalid_concurrency(self, config_with_file, temp_config_dir):
+        """Test -c 0 is a one-line error, not a traceback."""
+        specs = temp_config_dir / 'specs.jsonl'
+        specs.write_text(json.dumps({'url': 'https://example.com/1'}))
+        
+        result = CliRunner().invoke(cli, [
+            '--config', str(config_with_file.config_path), 'batch', str(specs), '-c', '0',
+        ])
+        
+        assert result.exit_code == 1
+        assert result.output.startswith('Error: ')
+        assert not isinstance(result.exception, ValueError)
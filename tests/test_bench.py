@@ -0,0 +1,160 @@
+"""Test cases for the load generator."""
+
+import time
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from reqninja import ReqNinjaClient
+from reqninja.auth import HmacAuth
+from reqninja.bench import run_benchmark
+from reqninja.cli import cli
+from reqninja.exceptions import AuthenticationError, ReqNinjaError
+from reqninja.utils import parse_duration
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler: /slow sleeps, /error returns 500."""
+    
+    protocol_version = 'HTTP/1.1'
+    seen_auth = []
+    
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(0.02)
+        EchoHandler.seen_auth.append(self.headers.get('Authorization'))
+        status = 500 if self.path == '/error' else 200
+        body = b'ok'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+class TestRunBenchmark:
+    """Test run_benchmark."""
+    
+    def test_closed_loop_request_count(self, http_server, config_with_file):
+        """Test a fixed request count is honoured exactly."""
+        base = http_server(EchoHandler)
+        client = ReqNinjaClient(config_with_file)
+        result = run_benchmark(
+            base + '/ok', concurrency=4, requests_total=50, client=client,
+            auth={'type': 'bearer', 'token': 'tok'}
+        )
+        assert result.requests == 50
+        assert result.status_counts == {200: 50}
+        assert result.errors == 0
+        assert result.bytes_received == 100
+        assert 'Bearer tok' in EchoHandler.seen_auth
+        assert result.to_dict()['latency_ms']['p99.9'] > 0
+    
+    def test_error_breakdown(self, http_server, config_with_file):
+        """Test errors are broken down by status and exception type."""
+        base = http_server(EchoHandler)
+        client = ReqNinjaClient(config_with_file)
+        result = run_benchmark(base + '/error', concurrency=2, requests_total=10,
+                               client=client)
+        assert result.status_counts == {500: 10}
+        assert result.errors == 10
+        
+        result = run_benchmark('http://127.0.0.1:1/', concurrency=1,
+                               requests_total=3, client=client)
+        assert result.exceptions == {'ConnectionError': 3}
+    
+    def test_open_loop_counts_queueing_delay(self, http_server, config_with_file):
+        """Test open-loop latency is measured from the intended send time."""
+        base = http_server(EchoHandler)
+        client = ReqNinjaClient(config_with_file)
+        # One worker, 20ms service time, a request scheduled every 5ms:
+        # the backlog must show up in the tail latency.
+        result = run_benchmark(base + '/slow', concurrency=1, requests_total=20,
+                               rate=200, client=client)
+        assert result.mode == 'open'
+        assert result.requests == 20
+        assert result.latency.percentile(99) > 150
+    
+    def test_signing_auth_applied_per_request(self, http_server, config_with_file):
+        """Test per-request auth schemes sign every request, not just the first."""
+        base = http_server(EchoHandler)
+        client = ReqNinjaClient(config_with_file)
+        EchoHandler.seen_auth = []
+        signatures = iter(range(1000))
+        
+        class Counting(HmacAuth):
+            def sign(self, method, url, data=None, json=None):
+                return {'Authorization': f'sig-{next(signatures)}'}
+        
+        with patch.object(client.auth_handler, 'scheme', lambda auth: Counting(auth)):
+            result = run_benchmark(
+                base + '/ok', concurrency=2, requests_total=6, client=client,
+                auth={'type': 'hmac', 'key_id': 'k', 'secret': 's'}
+            )
+        assert result.status_counts == {200: 6}
+        assert len(set(EchoHandler.seen_auth)) == 6
+    
+    def test_auth_failures_are_counted(self, http_server, config_with_file):
+        """Test a request whose signing fails is counted, not lost with its worker."""
+        base = http_server(EchoHandler)
+        client = ReqNinjaClient(config_with_file)
+        EchoHandler.seen_auth = []
+        signatures = iter(range(1000))
+        
+        class Failing(HmacAuth):
+            def sign(self, method, url, data=None, json=None):
+                # The first signature is taken when the benchmark is set up
+                if next(signatures) % 2 == 0:
+                    return {'Authorization': 'sig'}
+                raise AuthenticationError('token endpoint unavailable')
+        
+        with patch.object(client.auth_handler, 'scheme', lambda auth: Failing(auth)):
+            result = run_benchmark(
+                base + '/ok', concurrency=2, requests_total=6, client=client,
+                auth={'type': 'hmac', 'key_id': 'k', 'secret': 's'}
+            )
+        assert result.requests == 6
+        assert result.status_counts == {200: 3}
+        assert result.exceptions == {'AuthenticationError': 3}
+    
+    def test_rejects_stream_body(self, config_with_file, tmp_path):
+        """Test a body that can only be read once is rejected up front."""
+        body = tmp_path / 'body.bin'
+        body.write_bytes(b'x')
+        with open(body, 'rb') as f, pytest.raises(ReqNinjaError, match='stream body'):
+            run_benchmark('http://127.0.0.1:1/', method='POST', requests_total=2,
+                          client=ReqNinjaClient(config_with_file), data=f)
+    
+    def test_requires_stop_condition(self, config_with_file):
+        """Test a count or duration is required."""
+        with pytest.raises(ReqNinjaError):
+            run_benchmark('http://127.0.0.1:1/', client=ReqNinjaClient(config_with_file))
+
+
+class TestBenchCommand:
+    """Test the `reqninja bench` CLI command."""
+    
+    def test_bench_duration(self, http_server, config_with_file):
+        """Test the command runs for a duration and prints a summary."""
+        base = http_server(EchoHandler)
+        result = CliRunner().invoke(cli, [
+            '--config', str(config_with_file.config_path),
+            'bench', base + '/ok', '-c', '2', '--duration', '200ms',
+        ])
+        assert result.exit_code == 0, result.output
+        assert 'closed loop' in result.output
+        assert 'p99.9' in result.output
+
+
+def test_parse_duration():
+    """Test duration strings."""
+    assert parse_duration('60s') == 60
+    assert parse_duration('2m') == 120
+    assert parse_duration('250ms') == 0.25
+    assert parse_duration('1.5') == 1.5
+    with pytest.raises(ValueError):
+        parse_duration('soon')
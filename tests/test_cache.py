@@ -0,0 +1,313 @@
+"""Test cases for the HTTP response cache."""
+
+import gzip
+import os
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import yaml
+
+from reqninja import Config, ReqNinjaClient
+from reqninja.cache import (
+    CacheEntry, DiskCacheBackend, HttpCache, MemoryCacheBackend, parse_cache_control
+)
+
+
+class CachingHandler(BaseHTTPRequestHandler):
+    """Endpoints with different caching headers; counts hits per path."""
+    
+    protocol_version = 'HTTP/1.1'
+    calls = {}
+    
+    ROUTES = {
+        '/fresh': {'Cache-Control': 'max-age=60'},
+        '/etag': {'Cache-Control': 'no-cache', 'ETag': '"v1"'},
+        '/stale': {'Cache-Control': 'max-age=0', 'ETag': '"v1"'},
+        '/modified': {'Cache-Control': 'max-age=0',
+                      'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'},
+        '/nostore': {'Cache-Control': 'no-store, max-age=60'},
+        '/plain': {},
+        '/vary': {'Cache-Control': 'max-age=60', 'Vary': 'Accept'},
+        '/expires': {'Expires': formatdate(time.time() + 60, usegmt=True)},
+        '/gzip': {'Cache-Control': 'max-age=60', 'Content-Encoding': 'gzip'},
+    }
+    
+    def _reply(self, status, headers, body=b''):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Date', formatdate(usegmt=True))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        calls = type(self).calls
+        calls[self.path] = calls.get(self.path, 0) + 1
+        headers = dict(self.ROUTES.get(self.path, {}))
+        if ('ETag' in headers and self.headers.get('If-None-Match') == headers['ETag']) or (
+                'Last-Modified' in headers
+                and self.headers.get('If-Modified-Since') == headers['Last-Modified']):
+            headers['X-Revalidated'] = 'yes'
+            self._reply(304, headers)
+            return
+        body = f'{self.path} #{calls[self.path]} {self.headers.get("Accept")}'.encode()
+        if 'Content-Encoding' in headers:
+            body = gzip.compress(body)
+        self._reply(200, {**headers, 'Content-Type': 'text/plain'}, body)
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._reply(204, {})
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def handler():
+    return type('Handler', (CachingHandler,), {'calls': {}})
+
+
+@pytest.fixture
+def cache_config(temp_config_dir):
+    def make(cache_settings, profiles=None):
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({'cache': cache_settings, 'profiles': profiles or {}}))
+        return Config(config_file)
+    return make
+
+
+class TestCacheControl:
+    """Test header parsing and freshness."""
+    
+    def test_parse_cache_control(self):
+        """Test directives, arguments and quoted values are parsed."""
+        assert parse_cache_control('max-age=60, No-Cache, private="Set-Cookie"') == {
+            'max-age': '60', 'no-cache': None, 'private': 'Set-Cookie',
+        }
+        assert parse_cache_control(None) == {}
+    
+    def test_freshness_and_age(self):
+        """Test max-age, Age and request max-age are combined."""
+        now = time.time()
+        entry = CacheEntry('u', 200, 'OK', [('Cache-Control', 'max-age=60'), ('Age', '50')],
+                           b'', now, now)
+        assert entry.freshness_lifetime() == 60
+        assert entry.is_fresh(now, {})
+        assert not entry.is_fresh(now + 11, {})
+        assert not entry.is_fresh(now, {'max-age': '30'})
+        assert not entry.is_fresh(now, {'no-cache': None})
+    
+    def test_heuristic_freshness(self):
+        """Test Last-Modified gives a heuristic lifetime."""
+        now = time.time()
+        entry = CacheEntry('u', 200, 'OK', [
+            ('Date', formatdate(now, usegmt=True)),
+            ('Last-Modified', formatdate(now - 1000, usegmt=True)),
+        ], b'', now, now)
+        assert 99 <= entry.freshness_lifetime() <= 101
+
+
+class TestClientCache:
+    """Test the cache wired into ReqNinjaClient."""
+    
+    def test_clients_sharing_config_have_own_caches(self, http_server, cache_config, handler):
+        """Test two clients on one Config never serve from each other's cache."""
+        url = http_server(handler)
+        config = cache_config({'enabled': True})
+        first = ReqNinjaClient(config)
+        second = ReqNinjaClient(config)
+        
+        first.get(f"{url}/fresh")
+        response = second.get(f"{url}/fresh")
+        
+        assert response.cache_status == 'miss'
+        assert second.cache_stats()['stores'] == 1
+        second.clear_cache()
+        assert first.get(f"{url}/fresh").cache_status == 'hit'
+        assert second.get(f"{url}/fresh").cache_status == 'miss'
+        assert first.cache_stats()['hits'] == 1
+    
+    def test_disabled_by_default(self, http_server, config_with_file, handler):
+        """Test nothing is cached unless enabled in config."""
+        url = http_server(handler)
+        client = ReqNinjaClient(config_with_file)
+        client.get(f"{url}/fresh")
+        response = client.get(f"{url}/fresh")
+        
+        assert response.cache_status is None
+        assert handler.calls['/fresh'] == 2
+    
+    def test_fresh_hit(self, http_server, cache_config, handler):
+        """Test a fresh response is served without a round trip."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config({'enabled': True}))
+        
+        first = client.get(f"{url}/fresh")
+        second = client.get(f"{url}/fresh")
+        
+        assert first.cache_status == 'miss'
+        assert second.cache_status == 'hit'
+        assert second.text == first.text
+        assert second.headers['Age'] == '0'
+        assert second.request.method == 'GET'
+        assert handler.calls['/fresh'] == 1
+        assert client.cache_stats()['hits'] == 1
+    
+    def test_decoded_body_headers(self, http_server, cache_config, handler):
+        """Test a stored gzip response is served with headers matching its decoded body."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config({'enabled': True}))
+        
+        first = client.get(f"{url}/gzip")
+        second = client.get(f"{url}/gzip")
+        
+        assert second.cache_status == 'hit'
+        assert second.content == first.content
+        assert 'Content-Encoding' not in second.headers
+        assert second.headers['Content-Length'] == str(len(first.content))
+    
+    def test_expires(self, http_server, cache_config, handler):
+        """Test Expires alone makes a response fresh."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config({'enabled': True}))
+        client.get(f"{url}/expires")
+        assert client.get(f"{url}/expires").cache_status == 'hit'
+    
+    @pytest.mark.parametrize('path', ['/etag', '/stale', '/modified'])
+    def test_revalidation_serves_stored_body(self, http_server, cache_config, handler, path):
+        """Test stale entries are revalidated and a 304 serves the stored body."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config({'enabled': True}))
+        
+        first = client.get(f"{url}{path}")
+        second = client.get(f"{url}{path}")
+        
+        assert second.cache_status == 'revalidated'
+        assert second.status_code == 200
+        assert second.text == first.text
+        assert second.headers['X-Revalidated'] == 'yes'
+        assert handler.calls[path] == 2
+        assert client.cache_stats()['revalidations'] == 1
+    
+    def test_not_stored(self, http_server, cache_config, handler):
+        """Test no-store responses and responses without validators are not kept."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config({'enabled': True}))
+        
+        for path in ('/nostore', '/plain'):
+            client.get(f"{url}{path}")
+            assert client.get(f"{url}{path}").cache_status == 'miss'
+        assert client.cache_stats()['stores'] == 0
+    
+    def test_request_no_store_and_no_cache(self, http_server, cache_config, handler):
+        """Test request Cache-Control bypasses or revalidates the cache."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config({'enabled': True}))
+        client.get(f"{url}/fresh")
+        
+        bypass = client.get(f"{url}/fresh", headers={'Cache-Control': 'no-store'})
+        assert bypass.cache_status is None
+        forced = client.get(f"{url}/fresh", headers={'Cache-Control': 'no-cache'})
+        assert forced.cache_status == 'miss'
+        assert handler.calls['/fresh'] == 3
+    
+    def test_vary(self, http_server, cache_config, handler):
+        """Test Vary keeps responses for different request headers apart."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config({'enabled': True}))
+        
+        client.get(f"{url}/vary", headers={'Accept': 'text/plain'})
+        other = client.get(f"{url}/vary", headers={'Accept': 'application/json'})
+        
+        assert other.cache_status == 'miss'
+        assert 'application/json' in other.text
+    
+    def test_credentials_not_shared(self, http_server, cache_config, handler):
+        """Test a response fetched with one Authorization is not served to another."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config({'enabled': True}))
+        
+        client.get(f"{url}/fresh", auth={'type': 'bearer', 'token': 'a'})
+        other = client.get(f"{url}/fresh", auth={'type': 'bearer', 'token': 'b'})
+        
+        assert other.cache_status == 'miss'
+    
+    def test_unsafe_method_invalidates(self, http_server, cache_config, handler):
+        """Test a successful POST drops the stored response for its URL."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config({'enabled': True}))
+        client.get(f"{url}/fresh")
+        
+        client.post(f"{url}/fresh", data=b'x')
+        
+        assert client.get(f"{url}/fresh").cache_status == 'miss'
+        assert client.cache_stats()['invalidations'] == 1
+    
+    def test_per_profile(self, http_server, cache_config, handler):
+        """Test caching can be enabled for a single profile."""
+        url = http_server(handler)
+        client = ReqNinjaClient(cache_config(
+            {'enabled': False}, {'cached': {'base_url': url, 'cache': {'enabled': True}}}
+        ))
+        
+        client.get("/fresh", profile='cached')
+        assert client.get("/fresh", profile='cached').cache_status == 'hit'
+        assert client.get(f"{url}/fresh").cache_status is None
+    
+    def test_disk_backend(self, http_server, cache_config, handler, tmp_path):
+        """Test the disk backend persists entries across clients."""
+        url = http_server(handler)
+        settings = {'enabled': True, 'backend': 'disk', 'path': str(tmp_path / 'cache')}
+        
+        ReqNinjaClient(cache_config(settings)).get(f"{url}/fresh")
+        client = ReqNinjaClient(cache_config(settings))
+        response = client.get(f"{url}/fresh")
+        
+        assert response.cache_status == 'hit'
+        assert handler.calls['/fresh'] == 1
+        assert client.cache_stats()['entries'] == 1
+        client.clear_cache()
+        assert client.cache_stats()['entries'] == 0
+
+
+class TestBackends:
+    """Test storage backends directly."""
+    
+    def _entry(self, body: bytes) -> CacheEntry:
+        return CacheEntry('u', 200, 'OK', [('ETag', '"x"')], body, 0.0, 0.0)
+    
+    def test_memory_lru_limits(self):
+        """Test the memory backend evicts by entry count and bytes."""
+        backend = MemoryCacheBackend(max_entries=2, max_bytes=100)
+        backend.set('a', self._entry(b'1' * 10))
+        backend.set('b', self._entry(b'2' * 10))
+        backend.get('a')
+        backend.set('c', self._entry(b'3' * 10))
+        assert backend.get('b') is None
+        assert backend.get('a') is not None
+        
+        backend.set('d', self._entry(b'4' * 95))
+        assert len(backend) == 1
+        assert backend.size_bytes == 95
+    
+    def test_disk_prunes_oldest(self, tmp_path):
+        """Test the disk backend removes least recently used files over max_bytes."""
+        backend = DiskCacheBackend(str(tmp_path), max_bytes=1000)
+        backend.set('a', self._entry(b'1' * 200))
+        backend.set('b', self._entry(b'2' * 200))
+        old = time.time() - 100
+        os.utime(tmp_path / 'a.entry', (old, old))
+        backend.set('c', self._entry(b'3' * 200))
+        
+        assert backend.get('a') is None
+        assert backend.get('b').body == b'2' * 200
+        assert backend.size_bytes <= 1000
+    
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            HttpCache.from_settings({'backend': 'redis'})
@@ -0,0 +1,248 @@
+"""Test cases for per-host circuit breakers."""
+
+import asyncio
+
+import httpx
+import pytest
+import requests
+import responses
+import yaml
+
+from reqninja import AsyncReqNinjaClient, CircuitOpenError, Config, ReqNinjaClient
+from reqninja.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from reqninja.exceptions import ConfigError, ReqNinjaError
+
+
+URL = 'https://api.example.com/orders'
+
+
+def _config(temp_config_dir, **breaker):
+    config_file = temp_config_dir / 'config.yml'
+    config_file.write_text(yaml.dump({
+        'retry_policy': {'total': 0},
+        'circuit_breaker': {'enabled': True, 'window': 4, 'minimum_calls': 4, **breaker},
+    }))
+    return Config(config_file)
+
+
+class TestCircuitBreaker:
+    """Test the breaker state machine."""
+    
+    def _calls(self, breaker, outcomes, elapsed_ms=1.0):
+        for status in outcomes:
+            assert breaker.allow()
+            breaker.record(status, elapsed_ms, error=status is None)
+    
+    def test_opens_at_failure_rate(self):
+        """Test the circuit opens once the failure rate reaches the threshold."""
+        breaker = CircuitBreaker('api', window=4, minimum_calls=4, failure_rate_threshold=0.5)
+        
+        self._calls(breaker, [200, 500, 200])
+        assert breaker.state == CLOSED
+        self._calls(breaker, [None])
+        
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.snapshot()['rejected'] == 1
+    
+    def test_window_forgets_old_calls(self):
+        """Test only the last window calls count towards the rates."""
+        breaker = CircuitBreaker('api', window=4, minimum_calls=4, failure_rate_threshold=0.75)
+        
+        self._calls(breaker, [500, 500, 200, 200, 200, 500])
+        
+        assert breaker.state == CLOSED
+        assert breaker.snapshot()['failure_rate'] == 0.25
+    
+    def test_opens_on_slow_calls(self):
+        """Test slow successful calls open the circuit too."""
+        breaker = CircuitBreaker(
+            'api', window=2, minimum_calls=2, slow_call_ms=100, slow_call_rate_threshold=1.0
+        )
+        
+        self._calls(breaker, [200, 200], elapsed_ms=150)
+        
+        assert breaker.state == OPEN
+    
+    def test_half_open_trials_close_circuit(self):
+        """Test successful trial calls close an open circuit."""
+        breaker = CircuitBreaker(
+            'api', window=1, minimum_calls=1, open_seconds=0, half_open_calls=2
+        )
+        self._calls(breaker, [503])
+        assert breaker.state == OPEN
+        
+        assert breaker.allow() and breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record(200, 1.0)
+        breaker.record(200, 1.0)
+        
+        assert breaker.state == CLOSED
+    
+    def test_failed_trial_reopens_circuit(self):
+        """Test one failed trial call opens the circuit again."""
+        breaker = CircuitBreaker('api', window=1, minimum_calls=1, open_seconds=0)
+        self._calls(breaker, [503])
+        
+        assert breaker.allow()
+        breaker.record(None, 1.0, error=True)
+        
+        assert breaker.state == OPEN
+        assert breaker.snapshot()['times_opened'] == 2
+    
+    def test_release_returns_trial(self):
+        """Test a trial that ended without an outcome frees its slot."""
+        breaker = CircuitBreaker(
+            'api', window=1, minimum_calls=1, open_seconds=0, half_open_calls=1
+        )
+        self._calls(breaker, [503])
+        assert breaker.allow() and not breaker.allow()
+        
+        breaker.release()
+        
+        assert breaker.allow()
+        breaker.record(200, 1.0)
+        assert breaker.state == CLOSED
+    
+    def test_check_raises_when_open(self):
+        """Test check raises CircuitOpenError with the time left."""
+        breaker = CircuitBreaker('api', window=1, minimum_calls=1, open_seconds=30)
+        self._calls(breaker, [500])
+        
+        with pytest.raises(CircuitOpenError) as info:
+            breaker.check()
+        
+        assert info.value.name == 'api'
+        assert 0 < info.value.retry_in <= 30
+
+
+class TestClientCircuitBreaker:
+    """Test the breaker in the client request path."""
+    
+    @responses.activate
+    def test_open_circuit_fails_fast(self, temp_config_dir):
+        """Test requests to a failing host are refused without being sent."""
+        responses.add(responses.GET, URL, status=503)
+        client = ReqNinjaClient(_config(temp_config_dir))
+        
+        for _ in range(4):
+            assert client.get(URL).status_code == 503
+        with pytest.raises(CircuitOpenError):
+            client.get(URL)
+        
+        assert len(responses.calls) == 4
+        assert client.circuit_breaker_stats()['api.example.com']['state'] == OPEN
+    
+    @responses.activate
+    def test_connection_errors_count_as_failures(self, temp_config_dir):
+        """Test transport failures open the circuit."""
+        responses.add(responses.GET, URL, body=requests.exceptions.ConnectionError('refused'))
+        client = ReqNinjaClient(_config(temp_config_dir, window=2, minimum_calls=2))
+        
+        for _ in range(2):
+            with pytest.raises(ReqNinjaError) as info:
+                client.get(URL)
+            assert not isinstance(info.value, CircuitOpenError)
+        
+        with pytest.raises(CircuitOpenError):
+            client.get(URL)
+    
+    @responses.activate
+    def test_open_circuit_stops_retries(self, temp_config_dir):
+        """Test a circuit that opens mid-request ends its retries."""
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({
+            'retry_policy': {'total': 5, 'backoff_factor': 0},
+            'circuit_breaker': {'enabled': True, 'window': 2, 'minimum_calls': 2},
+        }))
+        responses.add(responses.GET, URL, status=503)
+        client = ReqNinjaClient(Config(config_file))
+        
+        response = client.get(URL)
+        
+        assert response.status_code == 503
+        assert len(responses.calls) == 2
+    
+    @responses.activate
+    def test_profile_scope(self, temp_config_dir):
+        """Test scope profile keys breakers by profile name."""
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({'profiles': {'orders': {
+            'base_url': 'https://api.example.com',
+            'circuit_breaker': {'enabled': True, 'scope': 'profile'},
+        }}}))
+        responses.add(responses.GET, URL, status=200)
+        client = ReqNinjaClient(Config(config_file))
+        
+        client.get('/orders', profile='orders')
+        client.get(URL)
+        
+        assert list(client.circuit_breaker_stats()) == ['profile:orders']
+    
+    def test_invalid_scope_rejected(self, temp_config_dir):
+        """Test an unknown scope raises ConfigError."""
+        client = ReqNinjaClient(_config(temp_config_dir, scope='region'))
+        
+        with pytest.raises(ConfigError):
+            client.get(URL)
+    
+    @responses.activate
+    def test_non_http_error_releases_trial(self, temp_config_dir):
+        """Test a trial that raises a non-HTTP error does not wedge the circuit."""
+        responses.add(responses.GET, URL, status=503)
+        responses.add(responses.GET, URL, status=200)
+        client = ReqNinjaClient(_config(
+            temp_config_dir, window=1, minimum_calls=1, open_seconds=0, half_open_calls=1
+        ))
+        client.get(URL)
+        
+        with pytest.raises(TypeError):
+            client.get(URL, not_a_requests_argument=True)
+        
+        assert client.circuit_breaker_stats()['api.example.com']['state'] == HALF_OPEN
+        assert client.get(URL).status_code == 200
+        assert client.circuit_breaker_stats()['api.example.com']['state'] == CLOSED
+    
+    def test_async_cancellation_releases_trial(self, temp_config_dir):
+        """Test a cancelled async trial does not wedge the circuit."""
+        statuses = iter([503, None, 200])
+        
+        async def handler(request):
+            status = next(statuses)
+            if status is None:
+                await asyncio.sleep(10)
+            return httpx.Response(status)
+        
+        async def main():
+            transport = httpx.MockTransport(handler)
+            config = _config(
+                temp_config_dir, window=1, minimum_calls=1, open_seconds=0, half_open_calls=1
+            )
+            async with AsyncReqNinjaClient(config, transport=transport) as client:
+                await client.get(URL)
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(client.get(URL), 0.05)
+                return await client.get(URL)
+        
+        assert asyncio.run(main()).status_code == 200
+    
+    def test_async_client_fails_fast(self, temp_config_dir):
+        """Test the async client shares the breaker behaviour."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502)
+        
+        async def main():
+            transport = httpx.MockTransport(handler)
+            config = _config(temp_config_dir, window=2, minimum_calls=2)
+            async with AsyncReqNinjaClient(config, transport=transport) as client:
+                await client.get(URL)
+                await client.get(URL)
+                with pytest.raises(CircuitOpenError):
+                    await client.get(URL)
+        
+        asyncio.run(main())
+        assert len(calls) == 2
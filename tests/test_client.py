@@ -2,6 +2,8 @@
 
 import pytest
 import json
+import requests
+from http.server import BaseHTTPRequestHandler
 from unittest.mock import patch, Mock
 
 from reqninja import get, post, ReqNinjaClient
@@ -105,10 +107,11 @@ class TestReqNinjaClient:
 class TestModuleFunctions:
     """Test module-level convenience functions."""
     
-    @patch('reqninja.client._default_client.get')
-    def test_get_function(self, mock_get):
+    @patch('reqninja.client._get_default_client')
+    def test_get_function(self, mock_default):
         """Test get convenience function."""
         mock_response = Mock()
+        mock_get = mock_default.return_value.get
         mock_get.return_value = mock_response
         
         response = get("https://example.com/api")
@@ -116,10 +119,11 @@ class TestModuleFunctions:
         mock_get.assert_called_once_with("https://example.com/api")
         assert response == mock_response
     
-    @patch('reqninja.client._default_client.post')
-    def test_post_function(self, mock_post):
+    @patch('reqninja.client._get_default_client')
+    def test_post_function(self, mock_default):
         """Test post convenience function."""
         mock_response = Mock()
+        mock_post = mock_default.return_value.post
         mock_post.return_value = mock_response
         
         data = {"key": "value"}
@@ -127,6 +131,16 @@ class TestModuleFunctions:
         
         mock_post.assert_called_once_with("https://example.com/api", json=data)
         assert response == mock_response
+    
+    def test_default_client_is_lazy_and_shared(self):
+        """Test the default client is built once, on first use."""
+        import reqninja.client as client_module
+        
+        with patch.object(client_module, '_default_client', None):
+            first = client_module._get_default_client()
+            second = client_module._get_default_client()
+            assert isinstance(first, ReqNinjaClient)
+            assert first is second
 
 
 class TestHTTPMethods:
@@ -151,3 +165,115 @@ class TestHTTPMethods:
             
             # Verify correct method was called
             assert mock_request.call_args[0][0].upper() == method.upper()
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Minimal HTTP/1.1 handler that keeps connections open."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+    
+    def log_message(self, *args):
+        pass
+
+
+class TestConnectionPool:
+    """Test connection pool sizing and stats."""
+    
+    def test_global_pool_settings(self, config_with_file):
+        """Test pool sizing from config applies to the default session."""
+        config_with_file._config_data['connection_pool'] = {
+            'pool_connections': 4, 'pool_maxsize': 32, 'pool_block': True
+        }
+        client = ReqNinjaClient(config_with_file)
+        adapter = client.session.get_adapter('https://example.com')
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 32
+        assert adapter._pool_block is True
+    
+    def test_profile_pool_settings_use_own_session(self, config_with_file):
+        """Test a profile with its own pool sizing gets a dedicated session."""
+        config_with_file._config_data['profiles']['test']['connection_pool'] = {
+            'pool_maxsize': 64
+        }
+        client = ReqNinjaClient(config_with_file)
+        
+        profile_config = config_with_file.merge_profile_config('test')
+        session = client._session_for(profile_config)
+        assert session is not client.session
+        assert session.get_adapter('https://x')._pool_maxsize == 64
+        assert client._session_for(profile_config) is session
+        
+        prod_config = config_with_file.merge_profile_config('prod')
+        assert client._session_for(prod_config) is client.session
+    
+    def test_pool_stats_reports_reuse(self, config_with_file, http_server):
+        """Test pool_stats counts new connections, idle sockets and reuse."""
+        base = http_server(KeepAliveHandler)
+        client = ReqNinjaClient(config_with_file)
+        for _ in range(5):
+            client.get(base + '/')
+        
+        stats = client.pool_stats()[base]
+        assert stats['requests'] == 5
+        assert stats['new_connections'] == 1
+        assert stats['idle_connections'] == 1
+        assert stats['pool_maxsize'] == 10
+        assert stats['reuse_ratio'] == pytest.approx(0.8)
+        client.close()
+
+
+class TestSessionCache:
+    """Test per-profile retry policies and the session cache."""
+    
+    def test_profile_retry_policy_applies(self, config_with_file):
+        """Test a profile's retry_policy builds a matching RetryPolicy."""
+        config_with_file._config_data['profiles']['test']['retry_policy'] = {
+            'total': 7, 'backoff_factor': 2.0, 'max_backoff': 30
+        }
+        client = ReqNinjaClient(config_with_file)
+        
+        policy = client._retry_policy(config_with_file.resolve_profile('test'))
+        assert policy.total == 7
+        assert policy.backoff_factor == 2.0
+        assert policy.max_backoff == 30
+        # The global policy is left untouched
+        assert client._retry_policy(config_with_file.resolve_profile()).total == 3
+        assert config_with_file.get('retry_policy.total') == 3
+        # urllib3 never retries on its own
+        assert client.session.get_adapter('https://x').max_retries.total == 0
+    
+    @patch('requests.Session.request', autospec=True)
+    def test_retries_argument_applies(self, mock_request, config_with_file):
+        """Test retries= caps attempts without needing another session."""
+        mock_request.return_value = Mock(status_code=503, headers={})
+        client = ReqNinjaClient(config_with_file)
+        
+        client.get("https://example.com/api", retries=0)
+        assert mock_request.call_count == 1
+        assert mock_request.call_args[0][0] is client.session
+    
+    def test_cache_is_bounded(self, config_with_file):
+        """Test the least recently used session is evicted and closed."""
+        config_with_file._config_data['session_cache_size'] = 2
+        client = ReqNinjaClient(config_with_file)
+        
+        def pool(size):
+            return {'connection_pool': {'pool_maxsize': size}}
+        
+        first = client._session_for(pool(1))
+        client._session_for(pool(2))
+        client._session_for(pool(1))
+        with patch.object(requests.Session, 'close') as mock_close:
+            client._session_for(pool(5))
+        
+        assert len(client._sessions) == 2
+        assert client._session_for(pool(1)) is first
+        assert mock_close.call_count == 1
+        # The default session is never evicted
+        assert client._session_for(config_with_file.resolve_profile()) is client.session
@@ -1,5 +1,6 @@
 """Test cases for ReqNinja configuration."""
 
+import os
 import pytest
 import tempfile
 from pathlib import Path
@@ -122,6 +123,17 @@ class TestConfig:
         assert 'User-Agent' in merged['headers']
         assert 'Authorization' in merged['headers']
     
+    def test_merge_connection_pool(self, config_with_file):
+        """Test profile pool settings override the global ones."""
+        config = config_with_file
+        config._config_data['connection_pool'] = {'pool_maxsize': 20, 'pool_block': True}
+        config._config_data['profiles']['test']['connection_pool'] = {'pool_maxsize': 50}
+        
+        merged = config.merge_profile_config('test')
+        assert merged['connection_pool'] == {'pool_maxsize': 50, 'pool_block': True}
+        assert config.get('connection_pool.pool_maxsize') == 20
+        assert config.merge_profile_config()['connection_pool']['pool_maxsize'] == 20
+    
     def test_env_var_expansion(self, temp_config_dir):
         """Test environment variable expansion."""
         import os
@@ -161,3 +173,65 @@ class TestConfig:
         
         with pytest.raises(ConfigError):
             Config(config_file)
+
+
+class TestResolvedProfileCache:
+    """Test memoized profile resolution and its invalidation."""
+    
+    def test_resolution_is_cached_and_immutable(self, config_with_file):
+        """Test repeated resolution returns the same read-only object."""
+        config = config_with_file
+        resolved = config.resolve_profile('test')
+        
+        assert config.resolve_profile('test') is resolved
+        assert resolved['base_url'] == 'https://api.test.com'
+        assert resolved['headers']['Authorization'] == 'Bearer test-token'
+        with pytest.raises(TypeError):
+            resolved['headers']['X-New'] = 'value'
+    
+    def test_merge_profile_config_returns_copy(self, config_with_file):
+        """Test callers may mutate merged config without touching the cache."""
+        config = config_with_file
+        merged = config.merge_profile_config('test')
+        merged['headers']['X-New'] = 'value'
+        
+        assert 'X-New' not in config.resolve_profile('test')['headers']
+        assert 'X-New' not in config.merge_profile_config('test')['headers']
+    
+    def test_invalidated_by_add_and_remove(self, config_with_file):
+        """Test add_profile/remove_profile invalidate the cache."""
+        config = config_with_file
+        before = config.resolve_profile('test')
+        
+        config.add_profile('test', {'base_url': 'https://changed.test.com'})
+        assert config.resolve_profile('test')['base_url'] == 'https://changed.test.com'
+        assert config.resolve_profile('test') is not before
+        
+        config.remove_profile('test')
+        with pytest.raises(ProfileNotFoundError):
+            config.resolve_profile('test')
+    
+    def test_invalidated_by_file_change(self, config_with_file, sample_config):
+        """Test edits to the config file on disk are picked up."""
+        config = config_with_file
+        config.MTIME_CHECK_INTERVAL = 0
+        assert config.resolve_profile('test')['base_url'] == 'https://api.test.com'
+        
+        sample_config['profiles']['test']['base_url'] = 'https://edited.test.com'
+        with open(config.config_path, 'w') as f:
+            yaml.dump(sample_config, f)
+        stat = config.config_path.stat()
+        os.utime(config.config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        assert config.resolve_profile('test')['base_url'] == 'https://edited.test.com'
+    
+    def test_invalidated_by_env_change(self, config_with_file, monkeypatch):
+        """Test a change to a referenced environment variable re-resolves."""
+        config = config_with_file
+        monkeypatch.setenv('PROD_TOKEN', 'one')
+        first = config.resolve_profile('prod')
+        assert first['headers']['Authorization'] == 'Bearer one'
+        assert config.resolve_profile('prod') is first
+        
+        monkeypatch.setenv('PROD_TOKEN', 'two')
+        assert config.resolve_profile('prod')['headers']['Authorization'] == 'Bearer two'
@@ -0,0 +1,289 @@
+"""Test cases for the DNS cache, overrides and happy-eyeballs connect."""
+
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import yaml
+
+from reqninja import Config, ReqNinjaClient
+from reqninja.dns import DNSCache, Resolver, happy_eyeballs_connect, interleave
+from reqninja.exceptions import ReqNinjaError
+
+
+class ClosingHandler(BaseHTTPRequestHandler):
+    """HTTP/1.0 handler, so every request opens a new connection."""
+    
+    def do_GET(self):
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Count getaddrinfo calls; names resolve to 127.0.0.1, .invalid ones fail."""
+    calls = []
+    real_getaddrinfo = socket.getaddrinfo
+    
+    def fake(host, port, *args, **kwargs):
+        calls.append(host)
+        if host.endswith('.invalid'):
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        address = host if host[0].isdigit() else '127.0.0.1'
+        return real_getaddrinfo(address, port, socket.AF_INET, socket.SOCK_STREAM)
+    
+    monkeypatch.setattr(socket, 'getaddrinfo', fake)
+    return calls
+
+
+def _address(family, host, port):
+    return (family, socket.SOCK_STREAM, 6, '', (host, port))
+
+
+def _client(temp_config_dir, **dns):
+    config_file = temp_config_dir / 'config.yml'
+    config_file.write_text(yaml.dump({
+        'retry_policy': {'total': 0},
+        'dns': {'enabled': True, **dns},
+    }))
+    return ReqNinjaClient(Config(config_file), metrics=True)
+
+
+class TestDNSCache:
+    """Test TTL and negative caching."""
+    
+    def test_answers_are_cached_for_ttl(self, lookups):
+        """Test a name is looked up once within its TTL."""
+        cache = DNSCache(ttl=60)
+        
+        first, first_cached = cache.lookup('api.example.com', 443)
+        second, second_cached = cache.lookup('api.example.com', 443)
+        
+        assert first == second
+        assert (first_cached, second_cached) == (False, True)
+        assert lookups == ['api.example.com']
+        assert cache.stats()['hits'] == 1
+    
+    def test_expired_answers_are_refreshed(self, lookups):
+        """Test answers are looked up again after the TTL."""
+        cache = DNSCache(ttl=0.01)
+        cache.lookup('api.example.com', 443)
+        time.sleep(0.02)
+        
+        cache.lookup('api.example.com', 443)
+        
+        assert len(lookups) == 2
+    
+    def test_failures_are_cached(self, lookups):
+        """Test a failed lookup is remembered for negative_ttl."""
+        cache = DNSCache(negative_ttl=60)
+        
+        for _ in range(3):
+            with pytest.raises(socket.gaierror):
+                cache.lookup('gone.invalid', 443)
+        
+        assert lookups == ['gone.invalid']
+        assert cache.stats()['negative_hits'] == 2
+    
+    def test_concurrent_failures_are_cached(self, monkeypatch):
+        """Test every caller sharing a failed lookup gets a gaierror."""
+        calls = []
+        
+        def slow_failure(host, port, *args, **kwargs):
+            calls.append(host)
+            time.sleep(0.05)
+            raise socket.gaierror(socket.EAI_NONAME, 'nope')
+        
+        monkeypatch.setattr(socket, 'getaddrinfo', slow_failure)
+        cache = DNSCache(negative_ttl=60)
+        
+        with ThreadPoolExecutor(4) as pool:
+            futures = [pool.submit(cache.lookup, 'down.example', 80) for _ in range(4)]
+        
+        assert all(isinstance(f.exception(), socket.gaierror) for f in futures)
+        with pytest.raises(socket.gaierror):
+            cache.lookup('down.example', 80)
+        assert calls == ['down.example']
+    
+    def test_bounded(self, lookups):
+        """Test the least recently used names are evicted."""
+        cache = DNSCache(max_entries=2)
+        for name in ('a.example', 'b.example', 'c.example'):
+            cache.lookup(name, 80)
+        
+        assert cache.stats()['entries'] == 2
+        assert cache.lookup('a.example', 80)[1] is False
+    
+    def test_concurrent_lookups_share_one_query(self, monkeypatch):
+        """Test a burst of lookups for one name makes a single query."""
+        calls = []
+        
+        def slow(host, port, *args, **kwargs):
+            calls.append(host)
+            time.sleep(0.05)
+            return [_address(socket.AF_INET, '127.0.0.1', port)]
+        
+        monkeypatch.setattr(socket, 'getaddrinfo', slow)
+        cache = DNSCache()
+        threads = [
+            threading.Thread(target=cache.lookup, args=('api.example.com', 443))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert calls == ['api.example.com']
+
+
+class TestResolver:
+    """Test overrides and happy eyeballs."""
+    
+    def test_overrides_win_over_dns(self, lookups):
+        """Test host:port and host overrides bypass DNS, like curl --resolve."""
+        resolver = Resolver(DNSCache(), {
+            'api.example.com:443': '10.0.0.5', 'cdn.example.com': ['10.0.0.6', '10.0.0.7'],
+        })
+        
+        api, api_cached = resolver.resolve('api.example.com', 443)
+        cdn, _ = resolver.resolve('CDN.example.com', 80)
+        resolver.resolve('api.example.com', 80)
+        
+        assert [a[4][0] for a in api] == ['10.0.0.5'] and api_cached
+        assert [a[4][0] for a in cdn] == ['10.0.0.6', '10.0.0.7']
+        assert lookups == ['10.0.0.5', '10.0.0.6', '10.0.0.7', 'api.example.com']
+    
+    def test_interleave_alternates_families(self):
+        """Test address families alternate, keeping the first family first."""
+        v6 = [_address(socket.AF_INET6, f'::{i}', 80) for i in range(1, 3)]
+        v4 = [_address(socket.AF_INET, f'10.0.0.{i}', 80) for i in range(1, 4)]
+        
+        ordered = interleave(v6 + v4)
+        
+        assert [a[4][0] for a in ordered] == ['::1', '10.0.0.1', '::2', '10.0.0.2', '10.0.0.3']
+    
+    def test_happy_eyeballs_skips_failed_address(self):
+        """Test a refused address moves straight on to the next one."""
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        unused = socket.socket()
+        unused.bind(('127.0.0.1', 0))
+        refused_port = unused.getsockname()[1]
+        unused.close()
+        try:
+            sock = happy_eyeballs_connect([
+                _address(socket.AF_INET, '127.0.0.1', refused_port),
+                _address(socket.AF_INET, '127.0.0.1', listener.getsockname()[1]),
+            ], timeout=2, delay=5)
+            assert sock.getpeername() == listener.getsockname()
+            assert sock.gettimeout() == 2
+            sock.close()
+        finally:
+            listener.close()
+    
+    def test_happy_eyeballs_all_failed(self):
+        """Test the last error is raised when no address connects."""
+        unused = socket.socket()
+        unused.bind(('127.0.0.1', 0))
+        port = unused.getsockname()[1]
+        unused.close()
+        
+        with pytest.raises(OSError):
+            happy_eyeballs_connect([_address(socket.AF_INET, '127.0.0.1', port)], 1, 0.05)
+
+
+class TestClientDNS:
+    """Test the DNS cache in the client transport."""
+    
+    def test_cache_hits_are_timed(self, http_server, temp_config_dir):
+        """Test new connections reuse the cached lookup and timings say so."""
+        base = http_server(ClosingHandler).replace('127.0.0.1', 'localhost')
+        client = _client(temp_config_dir)
+        
+        first = client.get(base + '/')
+        second = client.get(base + '/')
+        
+        assert (first.timings.dns_cached, second.timings.dns_cached) == (False, True)
+        assert client.dns_stats()['hits'] >= 1
+        assert client.metrics()['dns']['misses'] >= 1
+        assert 'reqninja_dns_lookups_total{result="hit"}' in client.prometheus_metrics()
+    
+    def test_profile_override(self, http_server, temp_config_dir):
+        """Test a profile override sends a made-up name to a fixed address."""
+        port = http_server(ClosingHandler).rsplit(':', 1)[1]
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({'profiles': {'pinned': {
+            'base_url': f'http://api.reqninja.invalid:{port}',
+            'dns': {'enabled': True, 'overrides': {'api.reqninja.invalid': '127.0.0.1'}},
+        }}}))
+        client = ReqNinjaClient(Config(config_file))
+        
+        response = client.get('/', profile='pinned')
+        
+        assert response.status_code == 200
+        assert response.timings.dns_cached is True
+        assert client.dns_stats()['overrides'] == 1
+        # Pinned connections are not pooled with unpinned ones
+        assert client._session_for(client.config.resolve_profile('pinned')) is not client.session
+    
+    def test_concurrent_failures_fail_alike(self, monkeypatch, temp_config_dir):
+        """Test requests sharing a failed lookup all fail as request errors."""
+        def slow_failure(host, port, *args, **kwargs):
+            time.sleep(0.05)
+            raise socket.gaierror(socket.EAI_NONAME, 'nope')
+        
+        monkeypatch.setattr(socket, 'getaddrinfo', slow_failure)
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({
+            'retry_policy': {'total': 0},
+            'dns': {'enabled': True},
+            'circuit_breaker': {'enabled': True, 'minimum_calls': 100},
+        }))
+        client = ReqNinjaClient(Config(config_file))
+        
+        with ThreadPoolExecutor(4) as pool:
+            futures = [pool.submit(client.get, 'http://down.example/') for _ in range(4)]
+        
+        errors = [f.exception() for f in futures]
+        assert all(isinstance(e, ReqNinjaError) for e in errors)
+        assert all(str(e).startswith('Request failed') for e in errors)
+        assert client.circuit_breaker_stats()['down.example']['calls'] == 4
+    
+    def test_clients_sharing_config_have_own_resolvers(self, http_server, temp_config_dir):
+        """Test a second client on one Config uses its own session and DNS cache."""
+        base = http_server(ClosingHandler).replace('127.0.0.1', 'localhost')
+        first = _client(temp_config_dir)
+        second = ReqNinjaClient(first.config)
+        config = first.config.resolve_profile()
+        
+        first.get(base + '/')
+        response = second.get(base + '/')
+        
+        assert first._session_for(config) is first.session
+        assert second._session_for(config) is second.session
+        assert response.timings.dns_cached is False
+        assert second.dns_stats()['misses'] == 1
+        second.clear_dns_cache()
+        assert second.get(base + '/').timings.dns_cached is False
+        assert first.get(base + '/').timings.dns_cached is True
+    
+    def test_disabled_by_default(self, http_server, temp_config_dir):
+        """Test the transport resolves as before unless dns.enabled is set."""
+        base = http_server(ClosingHandler)
+        client = ReqNinjaClient()
+        
+        response = client.get(base + '/')
+        
+        assert response.timings.dns_cached is None
+        assert client.dns_stats()['misses'] == 0
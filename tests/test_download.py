@@ -0,0 +1,195 @@
+"""Test cases for parallel ranged downloads."""
+
+import os
+import random
+import re
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from click.testing import CliRunner
+
+from reqninja import ReqNinjaClient
+from reqninja.cli import cli
+from reqninja.download import STATE_SUFFIX, default_filename
+from reqninja.exceptions import DownloadError
+
+
+BLOB = random.Random(12).randbytes(4 * 1024 * 1024 + 123)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves BLOB with single-range support and an ETag.
+    
+    ``truncate_from`` makes ranges starting at or after that offset drop
+    the connection halfway through, simulating an interrupted transfer.
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    accept_ranges = True
+    truncate_from = None
+    ranges_seen = []
+    
+    def _send_headers(self, status, length, extra=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(length))
+        self.send_header('ETag', '"blob-v1"')
+        if self.accept_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+    
+    def do_HEAD(self):
+        self._send_headers(200, len(BLOB))
+    
+    def do_GET(self):
+        match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if not self.accept_ranges or not match:
+            self._send_headers(200, len(BLOB))
+            self.wfile.write(BLOB)
+            return
+        start, end = int(match.group(1)), int(match.group(2))
+        type(self).ranges_seen.append((start, end))
+        body = BLOB[start:end + 1]
+        self._send_headers(206, len(body), {
+            'Content-Range': f'bytes {start}-{end}/{len(BLOB)}',
+        })
+        if self.truncate_from is not None and start >= self.truncate_from:
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def range_handler():
+    """A fresh RangeHandler subclass so tests can tweak its behaviour."""
+    return type('Handler', (RangeHandler,), {'ranges_seen': []})
+
+
+class TestDownload:
+    """Test ReqNinjaClient.download."""
+    
+    def test_parallel_ranges(self, http_server, config_with_file, tmp_path, range_handler):
+        """Test the file is assembled from concurrent ranges."""
+        url = http_server(range_handler)
+        target = tmp_path / 'blob.bin'
+        client = ReqNinjaClient(config_with_file)
+        
+        result = client.download(f"{url}/blob.bin", str(target), parts=4)
+        
+        assert result.ranged
+        assert result.parts == 4
+        assert result.size == len(BLOB)
+        assert target.read_bytes() == BLOB
+        assert len(range_handler.ranges_seen) == 4
+        assert not os.path.exists(str(target) + STATE_SUFFIX)
+        client.close()
+    
+    def test_small_file_uses_fewer_parts(self, http_server, config_with_file, tmp_path,
+                                         range_handler):
+        """Test parts are capped so each range is worth a connection."""
+        url = http_server(range_handler)
+        client = ReqNinjaClient(config_with_file)
+        
+        result = client.download(url, str(tmp_path / 'blob.bin'), parts=64)
+        
+        assert result.parts == 5
+        client.close()
+    
+    def test_fallback_without_ranges(self, http_server, config_with_file, tmp_path,
+                                     range_handler):
+        """Test servers without Accept-Ranges get a single streamed GET."""
+        range_handler.accept_ranges = False
+        url = http_server(range_handler)
+        target = tmp_path / 'blob.bin'
+        client = ReqNinjaClient(config_with_file)
+        
+        result = client.download(url, str(target), parts=4)
+        
+        assert not result.ranged
+        assert result.parts == 1
+        assert target.read_bytes() == BLOB
+        client.close()
+    
+    def test_resume_after_interruption(self, http_server, config_with_file, tmp_path,
+                                       range_handler):
+        """Test an interrupted download resumes from the state file."""
+        range_handler.truncate_from = len(BLOB) // 2
+        url = http_server(range_handler)
+        target = tmp_path / 'blob.bin'
+        state_file = str(target) + STATE_SUFFIX
+        client = ReqNinjaClient(config_with_file)
+        
+        with pytest.raises(DownloadError):
+            client.download(url, str(target), parts=4)
+        assert os.path.exists(state_file)
+        
+        range_handler.truncate_from = None
+        range_handler.ranges_seen.clear()
+        result = client.download(url, str(target), parts=4)
+        
+        assert result.resumed_bytes >= len(BLOB) // 2
+        assert target.read_bytes() == BLOB
+        assert not os.path.exists(state_file)
+        # Completed ranges were not fetched again
+        assert range_handler.ranges_seen
+        assert all(start >= len(BLOB) // 2 for start, _ in range_handler.ranges_seen)
+        client.close()
+    
+    def test_no_resume_starts_over(self, http_server, config_with_file, tmp_path,
+                                   range_handler):
+        """Test resume=False ignores saved progress."""
+        range_handler.truncate_from = len(BLOB) // 2
+        url = http_server(range_handler)
+        target = tmp_path / 'blob.bin'
+        client = ReqNinjaClient(config_with_file)
+        with pytest.raises(DownloadError):
+            client.download(url, str(target), parts=4)
+        
+        range_handler.truncate_from = None
+        result = client.download(url, str(target), parts=4, resume=False)
+        
+        assert result.resumed_bytes == 0
+        assert target.read_bytes() == BLOB
+        client.close()
+    
+    def test_http_error(self, http_server, config_with_file, tmp_path):
+        """Test an error status raises DownloadError."""
+        class MissingHandler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                self.send_error(404)
+            
+            def do_GET(self):
+                self.send_error(404)
+            
+            def log_message(self, *args):
+                pass
+        
+        url = http_server(MissingHandler)
+        client = ReqNinjaClient(config_with_file)
+        with pytest.raises(DownloadError):
+            client.download(url, str(tmp_path / 'missing'))
+        client.close()
+    
+    def test_default_filename(self):
+        """Test the output name is taken from the URL path."""
+        assert default_filename("https://x.test/files/a%20b.tar.gz?sig=1") == "a b.tar.gz"
+        assert default_filename("https://x.test/") == "index.html"
+    
+    def test_cli(self, http_server, config_with_file, tmp_path, range_handler):
+        """Test 'reqninja download' saves the file and reports the parts."""
+        url = http_server(range_handler)
+        target = tmp_path / 'cli.bin'
+        
+        result = CliRunner().invoke(cli, [
+            '--config', str(config_with_file.config_path),
+            'download', url, '-o', str(target), '--parts', '2',
+        ])
+        
+        assert result.exit_code == 0, result.output
+        assert '2 parts' in result.output
+        assert target.read_bytes() == BLOB
@@ -0,0 +1,97 @@
+"""Test cases for layered request headers."""
+
+import threading
+from unittest.mock import Mock, patch
+
+from reqninja import ReqNinjaClient
+from reqninja.headers import HeaderLayers
+
+
+class TestHeaderLayers:
+    """Test the copy-on-write header stack."""
+    
+    def test_later_layers_win_case_insensitively(self):
+        """Test upper layers override lower ones regardless of case."""
+        layers = HeaderLayers({'User-Agent': 'a', 'Accept': '*/*'}, {'user-agent': 'b'})
+        assert layers['USER-AGENT'] == 'b'
+        assert layers.to_dict() == {'Accept': '*/*', 'user-agent': 'b'}
+        assert len(layers) == 2
+    
+    def test_with_layer_does_not_copy_or_mutate_base(self):
+        """Test overlays share the base layer and leave it untouched."""
+        base = HeaderLayers({'Accept': 'json', 'X-Profile': 'p'})
+        call = base.with_layer({'Accept': 'xml'}, {'X-Call': '1'})
+        
+        assert call._base is base._base
+        assert call['Accept'] == 'xml'
+        assert call['X-Call'] == '1'
+        assert 'X-Call' not in base
+        assert base['Accept'] == 'json'
+        assert len(call) == 3
+        assert base.with_layer(None, {}) is base
+    
+    def test_none_hides_lower_header(self):
+        """Test a None value shadows the header below, as requests expects."""
+        layers = HeaderLayers({'Accept': 'json'}).with_layer({'accept': None})
+        assert layers.to_dict() == {'accept': None}
+
+
+class TestClientHeaderLayering:
+    """Test header layering through the client."""
+    
+    @patch('requests.Session.request')
+    def test_profile_headers_do_not_leak(self, mock_request, config_with_file):
+        """Test profile headers never reach the global defaults."""
+        mock_request.return_value = Mock(status_code=200)
+        client = ReqNinjaClient(config_with_file)
+        
+        client.get('/a', profile='test')
+        client.get('https://example.com/b')
+        
+        assert 'Authorization' not in mock_request.call_args[1]['headers']
+        assert 'Authorization' not in config_with_file.get('default_headers')
+    
+    @patch('requests.Session.request')
+    def test_layer_order(self, mock_request, config_with_file):
+        """Test defaults -> profile -> auth -> per-call precedence."""
+        mock_request.return_value = Mock(status_code=200)
+        client = ReqNinjaClient(config_with_file)
+        
+        client.get('/a', profile='test', auth={'type': 'bearer', 'token': 'call'})
+        sent = mock_request.call_args[1]['headers']
+        assert sent['Authorization'] == 'Bearer call'
+        assert sent['User-Agent'] == 'ReqNinja/1.0'
+        
+        client.get('/a', profile='test', auth={'type': 'bearer', 'token': 'call'},
+                   headers={'authorization': 'Custom x'})
+        assert mock_request.call_args[1]['headers']['Authorization'] == 'Custom x'
+    
+    def test_concurrent_requests_are_isolated(self, config_with_file):
+        """Test per-call headers from many threads never bleed together."""
+        seen = []
+        lock = threading.Lock()
+        
+        def fake(self, method, url, headers=None, **kwargs):
+            with lock:
+                seen.append((url, headers.get('X-Call'), headers.get('X-Other')))
+            return Mock(status_code=200)
+        
+        with patch('requests.Session.request', fake):
+            client = ReqNinjaClient(config_with_file)
+            threads = [
+                threading.Thread(
+                    target=client.get,
+                    args=(f'/r/{i}',),
+                    kwargs={'profile': 'test', 'headers': {'X-Call': str(i)}}
+                )
+                for i in range(50)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        assert len(seen) == 50
+        for url, call_header, other in seen:
+            assert url.endswith('/' + call_header)
+            assert other is None
@@ -0,0 +1,265 @@
+"""Test cases for hedged requests."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import yaml
+
+from reqninja import Config, ReqNinjaClient
+from reqninja.hedging import HedgePolicy, LatencyTracker
+
+
+class SlowFirstHandler(BaseHTTPRequestHandler):
+    """Answers the first request after 0.5s and later ones at once."""
+    
+    protocol_version = 'HTTP/1.1'
+    calls = 0
+    lock = threading.Lock()
+    
+    def do_GET(self):
+        with SlowFirstHandler.lock:
+            SlowFirstHandler.calls += 1
+            call = SlowFirstHandler.calls
+        if call == 1:
+            time.sleep(0.5)
+        body = str(call).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+class InFlightHandler(BaseHTTPRequestHandler):
+    """Answers after 0.2s, tracking the most requests in flight at once."""
+    
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+    
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        time.sleep(0.2)
+        with cls.lock:
+            cls.in_flight -= 1
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_first(http_server):
+    SlowFirstHandler.calls = 0
+    return http_server(SlowFirstHandler)
+
+
+def _client(temp_config_dir, **hedging):
+    config_file = temp_config_dir / 'config.yml'
+    config_file.write_text(yaml.dump({
+        'retry_policy': {'total': 0},
+        'hedging': {'delay_ms': 50, **hedging},
+    }))
+    return ReqNinjaClient(Config(config_file), metrics=True)
+
+
+class TestHedgePolicy:
+    """Test hedge delay and budget."""
+    
+    def test_percentile_delay_after_min_samples(self):
+        """Test the delay follows the host's recent latency percentile."""
+        policy = HedgePolicy({'delay_ms': 'p95', 'fallback_delay_ms': 200, 'min_samples': 20})
+        assert policy.delay('api') == 0.2
+        
+        for _ in range(100):
+            policy._host('api').latency.record(40.0)
+        
+        assert policy.delay('api') == pytest.approx(0.04, rel=0.1)
+    
+    def test_min_delay(self):
+        """Test the delay never drops below min_delay_ms."""
+        policy = HedgePolicy({'delay_ms': 1, 'min_delay_ms': 10})
+        assert policy.delay('api') == 0.01
+    
+    def test_invalid_percentile_rejected(self):
+        """Test an out-of-range percentile raises ValueError."""
+        with pytest.raises(ValueError):
+            HedgePolicy({'delay_ms': 'p150'})
+    
+    def test_tracker_window_rolls_over(self):
+        """Test old samples age out after two windows."""
+        tracker = LatencyTracker(window=10)
+        for _ in range(20):
+            tracker.record(500.0)
+        for _ in range(20):
+            tracker.record(5.0)
+        
+        assert tracker.percentile(95) == pytest.approx(5.0, rel=0.1)
+    
+    def test_hedge_budget_caps_hedges(self):
+        """Test hedges stop once the host's hedge budget is spent."""
+        policy = HedgePolicy({'delay_ms': 5, 'max_hedge_ratio': 0, 'burst': 1})
+        calls = []
+        
+        def send():
+            calls.append(1)
+            time.sleep(0.03)
+            return 'ok'
+        
+        for _ in range(3):
+            assert policy.run('api', send) == 'ok'
+        time.sleep(0.05)
+        policy.close()
+        
+        assert len(calls) == 4
+        assert policy.stats()['api']['hedges'] == 1
+    
+    def test_request_runs_on_calling_thread(self):
+        """Test only the hedge is handed to another thread."""
+        policy = HedgePolicy({'delay_ms': 5})
+        threads = []
+        
+        def send():
+            threads.append(threading.current_thread())
+            time.sleep(0.03 if len(threads) == 1 else 0.06)
+            return 'ok'
+        
+        policy.run('api', send)
+        time.sleep(0.05)
+        policy.close()
+        
+        assert threads[0] is threading.current_thread()
+        assert threads[1].name.startswith('reqninja-hedge')
+    
+    def test_failed_primary_falls_back_to_hedge(self):
+        """Test a hedge answers when the original request fails."""
+        policy = HedgePolicy({'delay_ms': 5})
+        attempts = []
+        
+        def send():
+            attempts.append(1)
+            if len(attempts) == 1:
+                time.sleep(0.03)
+                raise RuntimeError('reset')
+            time.sleep(0.06)
+            return 'hedge'
+        
+        assert policy.run('api', send) == 'hedge'
+        policy.close()
+
+
+class TestClientHedging:
+    """Test hedging through the client."""
+    
+    def test_hedge_wins_over_slow_request(self, slow_first, temp_config_dir):
+        """Test a slow GET is answered by its hedge."""
+        client = _client(temp_config_dir)
+        
+        started = time.perf_counter()
+        response = client.get(f'{slow_first}/item', hedge=True)
+        
+        assert time.perf_counter() - started < 0.4
+        assert response.text == '2'
+        host = slow_first.split('//', 1)[1]
+        assert client.hedge_stats()[host]['wins'] == 1
+        totals = client.metrics()['totals']
+        assert totals['hedges'] == 1 and totals['hedge_wins'] == 1
+        assert 'reqninja_hedges_total' in client.prometheus_metrics()
+        client.close()
+    
+    def test_concurrency_not_capped_by_hedge_threads(self, http_server, temp_config_dir):
+        """Test hedged requests are not limited to max_workers in flight."""
+        handler = type('Handler', (InFlightHandler,), {'in_flight': 0, 'peak': 0})
+        url = http_server(handler)
+        client = _client(temp_config_dir, enabled=True, delay_ms=5000, max_workers=4)
+        
+        with ThreadPoolExecutor(max_workers=40) as pool:
+            responses = list(pool.map(lambda i: client.get(f'{url}/{i}'), range(40)))
+        
+        assert all(r.status_code == 200 for r in responses)
+        assert handler.peak > 4
+        client.close()
+    
+    def test_hedge_retries_reach_hooks(self, http_server, temp_config_dir):
+        """Test on_retry hooks fire for retries made by the hedge."""
+        class Handler(SlowFirstHandler):
+            def do_GET(self):
+                with SlowFirstHandler.lock:
+                    SlowFirstHandler.calls += 1
+                    call = SlowFirstHandler.calls
+                if call == 1:
+                    time.sleep(0.5)
+                self.send_response(503 if call == 2 else 200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+        
+        SlowFirstHandler.calls = 0
+        url = http_server(Handler)
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({
+            'retry_policy': {'total': 1, 'backoff_factor': 0},
+            'hedging': {'delay_ms': 50},
+        }))
+        client = ReqNinjaClient(Config(config_file))
+        retries = []
+        client.hooks.register('on_retry', lambda context, attempt, status, error: retries.append(
+            (threading.current_thread().name, status)
+        ))
+        
+        response = client.get(f'{url}/item', hedge=True)
+        
+        assert response.status_code == 200
+        assert len(retries) == 1 and retries[0][1] == 503
+        assert retries[0][0].startswith('reqninja-hedge')
+        client.close()
+    
+    def test_clients_sharing_config_have_own_policies(self, temp_config_dir):
+        """Test two clients on one Config keep separate latency and hedge stats."""
+        first = _client(temp_config_dir, enabled=True)
+        second = ReqNinjaClient(first.config)
+        config = first.config.resolve_profile()
+        
+        policy = first._hedge_policy(config, None, 'GET', {})
+        
+        assert second._hedge_policy(config, None, 'GET', {}) is not policy
+        assert first._hedge_policy(config, None, 'GET', {}) is policy
+    
+    def test_enabled_in_config(self, slow_first, temp_config_dir):
+        """Test hedging.enabled hedges GETs without a per-call flag."""
+        client = _client(temp_config_dir, enabled=True)
+        
+        assert client.get(f'{slow_first}/item').text == '2'
+        client.close()
+    
+    def test_not_hedged_by_default(self, slow_first, temp_config_dir):
+        """Test requests wait for their own response unless hedging is on."""
+        client = _client(temp_config_dir)
+        
+        assert client.get(f'{slow_first}/item').text == '1'
+        assert client.hedge_stats() == {}
+    
+    def test_hedge_false_overrides_config(self, slow_first, temp_config_dir):
+        """Test hedge=False disables hedging for one call."""
+        client = _client(temp_config_dir, enabled=True)
+        
+        assert client.get(f'{slow_first}/item', hedge=False).text == '1'
+    
+    def test_requests_with_bodies_not_hedged(self, temp_config_dir):
+        """Test only bodiless GET and HEAD requests are hedged."""
+        client = _client(temp_config_dir, enabled=True)
+        config = client.config.resolve_profile()
+        
+        assert client._hedge_policy(config, None, 'GET', {}) is not None
+        assert client._hedge_policy(config, None, 'POST', {}) is None
+        assert client._hedge_policy(config, None, 'GET', {'data': b'x'}) is None
+        assert client._hedge_policy(config, None, 'GET', {'stream': True}) is None
@@ -0,0 +1,49 @@
+"""Test cases for the latency histogram."""
+
+import random
+
+import pytest
+
+from reqninja.histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Test LatencyHistogram accuracy and merging."""
+    
+    def test_percentiles_within_precision(self):
+        """Test percentiles stay within the configured relative error."""
+        rng = random.Random(42)
+        values = sorted(rng.lognormvariate(3, 1) for _ in range(20000))
+        histogram = LatencyHistogram(precision=0.01)
+        for value in values:
+            histogram.record(value)
+        
+        for pct in (50, 90, 99, 99.9):
+            exact = values[int(len(values) * pct / 100) - 1]
+            assert histogram.percentile(pct) == pytest.approx(exact, rel=0.03)
+        assert histogram.count == len(values)
+        assert histogram.min == values[0]
+        assert histogram.max == values[-1]
+    
+    def test_memory_is_bounded(self):
+        """Test bucket count depends on range, not sample count."""
+        histogram = LatencyHistogram()
+        for i in range(100000):
+            histogram.record(1 + (i % 1000) / 10.0)
+        assert len(histogram._counts) < 200
+    
+    def test_merge(self):
+        """Test merging two histograms."""
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(1.0)
+        second.record(100.0)
+        first.merge(second)
+        assert first.count == 2
+        assert first.max == 100.0
+        assert first.percentile(100) == 100.0
+    
+    def test_empty(self):
+        """Test an empty histogram reports zeros."""
+        histogram = LatencyHistogram()
+        assert histogram.percentile(99) == 0.0
+        assert histogram.mean == 0.0
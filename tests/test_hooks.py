@@ -0,0 +1,197 @@
+"""Test cases for request lifecycle hooks."""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import httpx
+import pytest
+import requests
+import responses
+import yaml
+
+from reqninja import AsyncReqNinjaClient, Config, ReqNinjaClient
+from reqninja.exceptions import ConfigError, ReqNinjaError
+from reqninja.hooks import Hooks
+
+
+class RecordingHooks:
+    """Middleware that records every event it sees."""
+    
+    events = []
+    
+    def before_request(self, context):
+        self.events.append(('before', context.method, context.url))
+        context.set_headers({'X-Trace-Id': 'trace-1'})
+    
+    def after_response(self, context, response):
+        self.events.append(('after', response.status_code))
+    
+    def on_retry(self, context, attempt, status, error):
+        self.events.append(('retry', attempt, status))
+    
+    def on_error(self, context, error):
+        self.events.append(('error', type(error).__name__))
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Fails the first request with 503, then succeeds."""
+    
+    protocol_version = 'HTTP/1.1'
+    calls = 0
+    lock = threading.Lock()
+    
+    def do_GET(self):
+        with self.lock:
+            type(self).calls += 1
+            status = 503 if type(self).calls == 1 else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def recording():
+    RecordingHooks.events = []
+    return RecordingHooks()
+
+
+def _config(temp_config_dir, **settings):
+    config_file = temp_config_dir / 'config.yml'
+    config_file.write_text(yaml.dump(settings))
+    return Config(config_file)
+
+
+class TestHooks:
+    """Test the hook chain itself."""
+    
+    def test_inactive_until_registered(self):
+        """Test an empty chain is inactive."""
+        hooks = Hooks()
+        assert not hooks.active
+        
+        hook = hooks.register('before_request', lambda context: None)
+        assert hooks.active
+        
+        hooks.remove('before_request', hook)
+        assert not hooks.active
+    
+    def test_unknown_event_raises(self):
+        """Test registering an unknown event fails."""
+        with pytest.raises(ValueError):
+            Hooks().register('on_sunrise', lambda: None)
+    
+    def test_middleware_without_hooks_raises(self):
+        """Test objects defining no hook methods are rejected."""
+        with pytest.raises(ValueError):
+            Hooks().add(object())
+
+
+class TestClientHooks:
+    """Test hooks run around client requests."""
+    
+    @responses.activate
+    def test_before_and_after_in_onion_order(self, client):
+        """Test before hooks run in order and after hooks in reverse."""
+        responses.add(responses.GET, 'https://api.example.com/x', status=200)
+        order = []
+        client.hooks.register('before_request', lambda c: order.append('before-1'))
+        client.hooks.register('before_request', lambda c: order.append('before-2'))
+        client.hooks.register('after_response', lambda c, r: order.append('after-1'))
+        client.hooks.register('after_response', lambda c, r: order.append('after-2'))
+        
+        client.get('https://api.example.com/x')
+        
+        assert order == ['before-1', 'before-2', 'after-2', 'after-1']
+    
+    @responses.activate
+    def test_before_request_can_add_headers(self, client, recording):
+        """Test headers set by a hook are sent."""
+        responses.add(responses.GET, 'https://api.example.com/x', status=200)
+        client.hooks.add(recording)
+        
+        client.get('https://api.example.com/x')
+        
+        assert responses.calls[0].request.headers['X-Trace-Id'] == 'trace-1'
+        assert recording.events == [
+            ('before', 'GET', 'https://api.example.com/x'), ('after', 200),
+        ]
+    
+    @responses.activate
+    def test_after_response_can_replace_response(self, client):
+        """Test an after_response hook may return a replacement."""
+        responses.add(responses.GET, 'https://api.example.com/x', status=200)
+        client.hooks.register('after_response', lambda c, r: 'replaced')
+        
+        assert client.get('https://api.example.com/x') == 'replaced'
+    
+    @responses.activate
+    def test_on_error(self, client, recording):
+        """Test on_error runs when the request fails."""
+        responses.add(
+            responses.GET, 'https://api.example.com/x',
+            body=requests.exceptions.ConnectionError('refused')
+        )
+        client.hooks.add(recording)
+        
+        with pytest.raises(ReqNinjaError):
+            client.get('https://api.example.com/x')
+        
+        assert recording.events[-1] == ('error', 'ReqNinjaError')
+    
+    def test_on_retry(self, http_server, temp_config_dir, recording):
+        """Test on_retry runs before urllib3 retries a failed attempt."""
+        handler = type('Handler', (FlakyHandler,), {'calls': 0})
+        url = http_server(handler)
+        client = ReqNinjaClient(_config(
+            temp_config_dir, retry_policy={'total': 2, 'backoff_factor': 0}
+        ))
+        client.hooks.add(recording)
+        
+        response = client.get(f'{url}/flaky')
+        
+        assert response.status_code == 200
+        assert recording.events[1:] == [('retry', 1, 503), ('after', 200)]
+        client.close()
+    
+    @responses.activate
+    def test_hooks_loaded_from_config(self, temp_config_dir, recording):
+        """Test hooks named in config.yml are loaded by import path."""
+        responses.add(responses.GET, 'https://api.example.com/x', status=200)
+        client = ReqNinjaClient(_config(
+            temp_config_dir, hooks=['tests.test_hooks:RecordingHooks']
+        ))
+        
+        client.get('https://api.example.com/x')
+        
+        assert RecordingHooks.events[-1] == ('after', 200)
+    
+    def test_unknown_entry_point_raises(self, temp_config_dir):
+        """Test a hook name without an entry point is a config error."""
+        with pytest.raises(ConfigError, match='No hook named'):
+            ReqNinjaClient(_config(temp_config_dir, hooks=['no-such-hook']))
+    
+    def test_async_client_runs_hooks(self, config_with_file, recording):
+        """Test the async client runs before, retry and after hooks."""
+        statuses = iter([503, 200])
+        
+        def handler(request):
+            assert request.headers['X-Trace-Id'] == 'trace-1'
+            return httpx.Response(next(statuses))
+        
+        async def main():
+            async with AsyncReqNinjaClient(
+                config_with_file, transport=httpx.MockTransport(handler)
+            ) as client:
+                client.hooks.add(recording)
+                return await client.get('https://example.com/x', retries=1)
+        
+        response = asyncio.run(main())
+        
+        assert response.status_code == 200
+        assert recording.events == [
+            ('before', 'GET', 'https://example.com/x'), ('retry', 1, 503), ('after', 200),
+        ]
@@ -0,0 +1,43 @@
+"""Test cases for import-time behaviour of ReqNinja."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+PROBE = """
+import sys
+import reqninja
+print(','.join(sorted(m for m in ('rich', 'yaml') if m in sys.modules)))
+print(reqninja.client._default_client is None)
+"""
+
+
+def _run_probe(home: Path) -> list:
+    env = dict(os.environ, HOME=str(home), USERPROFILE=str(home))
+    repo_root = Path(__file__).resolve().parent.parent
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=str(repo_root),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.splitlines()
+
+
+class TestImportSideEffects:
+    """`import reqninja` must stay cheap and side-effect free."""
+    
+    def test_import_does_not_load_heavy_modules(self, temp_config_dir):
+        """Test rich and yaml are not imported eagerly."""
+        heavy_modules, _ = _run_probe(temp_config_dir)
+        assert heavy_modules == ''
+    
+    def test_import_does_not_touch_config(self, temp_config_dir):
+        """Test no config file is read or written at import time."""
+        _, client_is_unset = _run_probe(temp_config_dir)
+        assert client_is_unset == 'True'
+        assert not (temp_config_dir / '.reqninja').exists()
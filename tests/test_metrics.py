@@ -0,0 +1,174 @@
+"""Test cases for request metrics."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+import requests
+import responses
+import yaml
+
+from reqninja import AsyncReqNinjaClient, Config, ReqNinjaClient
+from reqninja.exceptions import ReqNinjaError
+from reqninja.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def metered_client(temp_config_dir):
+    config_file = temp_config_dir / 'config.yml'
+    config_file.write_text(yaml.dump({
+        'retry_policy': {'total': 0},
+        'profiles': {'api': {'base_url': 'https://api.example.com'}},
+    }))
+    return ReqNinjaClient(Config(config_file), metrics=True)
+
+
+class TestMetricsRegistry:
+    """Test recording and exporting metrics."""
+    
+    def test_series_are_labeled(self):
+        """Test requests are grouped by profile, host, method and status class."""
+        registry = MetricsRegistry()
+        registry.record('api', 'example.com', 'get', 200, 10.0, bytes_in=100)
+        registry.record('api', 'example.com', 'GET', 204, 30.0, bytes_in=0)
+        registry.record(None, 'example.com', 'POST', 503, 5.0, retries=2, bytes_out=7)
+        
+        snapshot = registry.snapshot()
+        
+        labels = [
+            (s['profile'], s['host'], s['method'], s['status_class'])
+            for s in snapshot['series']
+        ]
+        assert labels == [
+            ('api', 'example.com', 'GET', '2xx'),
+            ('default', 'example.com', 'POST', '5xx'),
+        ]
+        assert snapshot['series'][0]['requests'] == 2
+        assert snapshot['series'][0]['latency_ms']['max'] == 30.0
+        assert snapshot['totals'] == {
+            'requests': 3, 'errors': 0, 'retries': 2, 'hedges': 0, 'hedge_wins': 0,
+            'bytes_out': 7, 'bytes_in': 100,
+        }
+    
+    def test_threads_record_into_separate_shards(self):
+        """Test concurrent recording loses no samples."""
+        registry = MetricsRegistry()
+        barrier = threading.Barrier(8)
+        
+        def work():
+            barrier.wait()
+            for _ in range(1000):
+                registry.record('p', 'h', 'GET', 200, 1.0)
+        
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        series = registry.snapshot()['series'][0]
+        assert series['requests'] == 8000
+        assert series['latency_ms']['count'] == 8000
+    
+    def test_exited_threads_are_folded(self):
+        """Test shards of finished pool threads are merged, not kept forever."""
+        registry = MetricsRegistry()
+        
+        for _ in range(5):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(lambda _: registry.record('p', 'h', 'GET', 200, 1.0), range(100)))
+            registry.record('p', 'h', 'GET', 200, 1.0)
+        
+        snapshot = registry.snapshot()
+        assert snapshot['totals']['requests'] == 505
+        assert snapshot['series'][0]['latency_ms']['count'] == 505
+        # Only the main thread's shard is still live
+        assert len(registry._shards) == 1
+    
+    def test_prometheus_export(self):
+        """Test the text exposition has counters and cumulative buckets."""
+        registry = MetricsRegistry()
+        registry.record('api', 'example.com', 'GET', 200, 20.0)
+        registry.record('api', 'example.com', 'GET', 200, 700.0)
+        
+        text = registry.to_prometheus()
+        
+        labels = 'profile="api",host="example.com",method="GET",status_class="2xx"'
+        assert '# TYPE reqninja_requests_total counter' in text
+        assert f'reqninja_requests_total{{{labels}}} 2' in text
+        assert f'reqninja_request_duration_seconds_bucket{{{labels},le="0.025"}} 1' in text
+        assert f'reqninja_request_duration_seconds_bucket{{{labels},le="1.0"}} 2' in text
+        assert f'reqninja_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+        assert f'reqninja_request_duration_seconds_count{{{labels}}} 2' in text
+    
+    def test_reset(self):
+        """Test reset discards recorded series."""
+        registry = MetricsRegistry()
+        registry.record('api', 'h', 'GET', 200, 1.0)
+        registry.reset()
+        assert registry.snapshot()['series'] == []
+
+
+class TestClientMetrics:
+    """Test the clients feed the registry."""
+    
+    def test_disabled_by_default(self, client):
+        """Test metrics are opt-in."""
+        assert client.metrics_registry is None
+        assert client.metrics() == {}
+        assert client.prometheus_metrics() == ''
+    
+    @responses.activate
+    def test_records_requests_and_bytes(self, metered_client):
+        """Test successful requests are counted with body sizes."""
+        responses.add(responses.POST, 'https://api.example.com/items', body=b'x' * 50, status=201)
+        
+        metered_client.post('/items', profile='api', data=b'hello')
+        
+        series = metered_client.metrics()['series'][0]
+        assert series['profile'] == 'api'
+        assert series['host'] == 'api.example.com'
+        assert series['status_class'] == '2xx'
+        assert series['bytes_out'] == 5
+        assert series['bytes_in'] == 50
+    
+    @responses.activate
+    def test_records_errors(self, metered_client):
+        """Test failed requests are counted as errors."""
+        responses.add(
+            responses.GET, 'https://api.example.com/down',
+            body=requests.exceptions.ConnectionError('refused')
+        )
+        
+        with pytest.raises(ReqNinjaError):
+            metered_client.get('/down', profile='api')
+        
+        totals = metered_client.metrics()['totals']
+        assert totals['requests'] == 1
+        assert totals['errors'] == 1
+    
+    def test_shared_registry(self, config_with_file):
+        """Test clients can share one registry."""
+        registry = MetricsRegistry()
+        client = ReqNinjaClient(config_with_file, metrics=registry)
+        assert client.metrics_registry is registry
+    
+    def test_async_client_records(self, config_with_file):
+        """Test the async client records into its registry."""
+        import asyncio
+        
+        def handler(request):
+            return httpx.Response(200, content=b'ok')
+        
+        async def main():
+            transport = httpx.MockTransport(handler)
+            async with AsyncReqNinjaClient(
+                config_with_file, transport=transport, metrics=True
+            ) as client:
+                await client.get('https://example.com/a')
+                return client.metrics()
+        
+        series = asyncio.run(main())['series'][0]
+        assert series['method'] == 'GET'
+        assert series['bytes_in'] == 2
@@ -0,0 +1,262 @@
+"""Test cases for OAuth2 client-credentials auth."""
+
+import base64
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs
+
+import pytest
+import yaml
+
+from reqninja import Config, ReqNinjaClient
+from reqninja.exceptions import AuthenticationError
+from reqninja.oauth2 import ClientCredentialsTokenSource
+
+
+class OAuth2Handler(BaseHTTPRequestHandler):
+    """Token endpoint at /token; /api accepts only the latest token."""
+    
+    protocol_version = 'HTTP/1.1'
+    expires_in = 3600
+    token_delay = 0.0
+    fetches = 0
+    forms = None
+    authorizations = None
+    valid = None
+    lock = threading.Lock()
+    
+    def _send(self, status, body):
+        body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        cls = type(self)
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        time.sleep(cls.token_delay)
+        with self.lock:
+            cls.fetches += 1
+            token = f'tok-{cls.fetches}'
+            cls.valid = token
+            cls.forms.append(form)
+            cls.authorizations.append(self.headers.get('Authorization'))
+        self._send(200, {'access_token': token, 'token_type': 'Bearer',
+                         'expires_in': cls.expires_in})
+    
+    def do_GET(self):
+        if self.headers.get('Authorization') != f'Bearer {type(self).valid}':
+            self._send(401, {'error': 'invalid_token'})
+        else:
+            self._send(200, {'token': type(self).valid})
+    
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        if self.headers.get('Authorization') != f'Bearer {type(self).valid}':
+            self._send(401, {'error': 'invalid_token'})
+        else:
+            self._send(200, {'body': body})
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def handler():
+    return type('Handler', (OAuth2Handler,), {'forms': [], 'authorizations': []})
+
+
+def _oauth2_client(temp_config_dir, base_url, **auth):
+    config_file = temp_config_dir / 'config.yml'
+    config_file.write_text(yaml.dump({
+        'connection_pool': {'pool_maxsize': 20},
+        'profiles': {'partner': {'base_url': base_url, 'auth': {
+            'type': 'oauth2',
+            'token_url': f'{base_url}/token',
+            'client_id': 'app',
+            'client_secret': 's3cret',
+            **auth,
+        }}},
+    }))
+    return ReqNinjaClient(Config(config_file))
+
+
+class TestClientCredentialsTokenSource:
+    """Test fetching, caching and refreshing tokens."""
+    
+    def test_token_is_fetched_once_and_reused(self, http_server, handler):
+        """Test repeated calls reuse the cached token."""
+        url = http_server(handler)
+        source = ClientCredentialsTokenSource(f'{url}/token', 'app', 's3cret', scope='read')
+        
+        assert [source.token() for _ in range(5)] == ['tok-1'] * 5
+        assert handler.fetches == 1
+        assert handler.forms[0] == {'grant_type': ['client_credentials'], 'scope': ['read']}
+        expected = base64.b64encode(b'app:s3cret').decode()
+        assert handler.authorizations[0] == f'Basic {expected}'
+    
+    def test_client_secret_post(self, http_server, handler):
+        """Test client_secret_post sends credentials in the form body."""
+        url = http_server(handler)
+        source = ClientCredentialsTokenSource(
+            f'{url}/token', 'app', 's3cret', auth_method='client_secret_post'
+        )
+        
+        source.token()
+        
+        assert handler.authorizations[0] is None
+        assert handler.forms[0]['client_id'] == ['app']
+        assert handler.forms[0]['client_secret'] == ['s3cret']
+    
+    def test_refreshes_in_background_near_expiry(self, http_server, handler):
+        """Test a token inside the refresh margin is served while a refresh runs."""
+        handler.expires_in = 30
+        handler.token_delay = 0.2
+        url = http_server(handler)
+        source = ClientCredentialsTokenSource(f'{url}/token', 'app', 's3cret', refresh_margin=60)
+        assert source.token() == 'tok-1'
+        
+        started = time.perf_counter()
+        assert source.token() == 'tok-1'
+        assert source.token() == 'tok-1'
+        assert time.perf_counter() - started < 0.1
+        
+        deadline = time.time() + 5
+        while not source.issued('tok-2') and time.time() < deadline:
+            time.sleep(0.01)
+        assert handler.fetches == 2
+        assert source.issued('tok-2')
+    
+    def test_concurrent_invalidations_share_one_refresh(self, http_server, handler):
+        """Test many callers rejected with one token trigger a single fetch."""
+        handler.token_delay = 0.1
+        url = http_server(handler)
+        source = ClientCredentialsTokenSource(f'{url}/token', 'app', 's3cret')
+        rejected = source.token()
+        
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            tokens = list(pool.map(lambda _: source.invalidate(rejected), range(10)))
+        
+        assert tokens == ['tok-2'] * 10
+        assert handler.fetches == 2
+    
+    def test_disk_cache_is_reused_across_instances(self, http_server, handler, temp_config_dir):
+        """Test a disk-cached token is reused by a new source and kept private."""
+        url = http_server(handler)
+        kwargs = {'cache': 'disk', 'cache_dir': str(temp_config_dir / 'tokens')}
+        first = ClientCredentialsTokenSource(f'{url}/token', 'app', 's3cret', **kwargs)
+        assert first.token() == 'tok-1'
+        
+        second = ClientCredentialsTokenSource(f'{url}/token', 'app', 's3cret', **kwargs)
+        
+        assert second.token() == 'tok-1'
+        assert handler.fetches == 1
+        assert os.stat(second.cache_path).st_mode & 0o777 == 0o600
+    
+    def test_token_endpoint_error_raises(self, http_server, handler):
+        """Test a failing token endpoint raises AuthenticationError."""
+        url = http_server(handler)
+        source = ClientCredentialsTokenSource(f'{url}/missing', 'app', 's3cret')
+        
+        def reject(self):
+            self._send(400, {'error': 'invalid_client'})
+        handler.do_POST = reject
+        
+        with pytest.raises(AuthenticationError, match='HTTP 400'):
+            source.token()
+
+
+class TestOAuth2Client:
+    """Test OAuth2 profiles in the client."""
+    
+    def test_profile_requests_share_token(self, http_server, handler, temp_config_dir):
+        """Test requests on an oauth2 profile send the cached bearer token."""
+        url = http_server(handler)
+        client = _oauth2_client(temp_config_dir, url)
+        
+        for _ in range(3):
+            response = client.get('/api', profile='partner')
+            assert response.status_code == 200
+        
+        assert handler.fetches == 1
+        client.close()
+    
+    def test_concurrent_401s_refresh_once(self, http_server, handler, temp_config_dir):
+        """Test a revoked token is refreshed once and every request retried."""
+        url = http_server(handler)
+        client = _oauth2_client(temp_config_dir, url)
+        assert client.get('/api', profile='partner').json() == {'token': 'tok-1'}
+        # Revoke the token server-side
+        handler.valid = 'revoked'
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(
+                lambda _: client.get('/api', profile='partner'), range(8)
+            ))
+        
+        assert [r.json() for r in responses] == [{'token': 'tok-2'}] * 8
+        assert handler.fetches == 2
+        client.close()
+    
+    def test_file_body_rewound_after_401(self, http_server, handler, temp_config_dir):
+        """Test a file body is sent in full again with the refreshed token."""
+        url = http_server(handler)
+        client = _oauth2_client(temp_config_dir, url)
+        client.get('/api', profile='partner')
+        handler.valid = 'revoked'
+        
+        response = client.put('/api', profile='partner', data=io.BytesIO(b'payload'))
+        
+        assert response.json() == {'body': 'payload'}
+        assert handler.fetches == 2
+        client.close()
+    
+    def test_explicit_authorization_is_not_refreshed(self, http_server, handler, temp_config_dir):
+        """Test a caller-supplied Authorization header is not replaced on 401."""
+        url = http_server(handler)
+        client = _oauth2_client(temp_config_dir, url)
+        
+        response = client.get(
+            '/api', profile='partner', headers={'Authorization': 'Bearer mine'}
+        )
+        
+        assert response.status_code == 401
+        assert handler.fetches == 1
+        client.close()
+    
+    def test_async_client_refreshes_on_401(self, http_server, handler, temp_config_dir):
+        """Test the async client refreshes a rejected token and retries once."""
+        import asyncio
+        
+        import httpx
+        
+        from reqninja import AsyncReqNinjaClient
+        
+        url = http_server(handler)
+        config_file = temp_config_dir / 'async.yml'
+        config_file.write_text(yaml.dump({'profiles': {'partner': {'auth': {
+            'type': 'oauth2', 'token_url': f'{url}/token', 'client_id': 'app',
+        }}}}))
+        seen = []
+        
+        def api(request):
+            seen.append(request.headers['Authorization'])
+            status = 200 if request.headers['Authorization'] == 'Bearer tok-2' else 401
+            return httpx.Response(status)
+        
+        async def main():
+            transport = httpx.MockTransport(api)
+            async with AsyncReqNinjaClient(Config(config_file), transport=transport) as client:
+                return await client.get('https://api.example.com/', profile='partner')
+        
+        response = asyncio.run(main())
+        
+        assert response.status_code == 200
+        assert seen == ['Bearer tok-1', 'Bearer tok-2']
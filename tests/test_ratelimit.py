@@ -0,0 +1,190 @@
+"""Test cases for client-side rate limiting."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+import responses
+import yaml
+
+from reqninja import AsyncReqNinjaClient, Config, ReqNinjaClient
+from reqninja.ratelimit import RateLimiter
+
+
+URL = 'https://api.partner.com/items'
+
+
+def _config(temp_config_dir, **rate_limit):
+    config_file = temp_config_dir / 'config.yml'
+    config_file.write_text(yaml.dump({'profiles': {'partner': {
+        'base_url': 'https://api.partner.com',
+        'retry_policy': {'total': 0},
+        'rate_limit': rate_limit,
+    }}}))
+    return Config(config_file)
+
+
+class TestRateLimiter:
+    """Test the token bucket."""
+    
+    def test_burst_then_paced(self):
+        """Test burst tokens are free and later callers wait their turn."""
+        limiter = RateLimiter(rate=10, burst=2)
+        
+        waits = [limiter.reserve() for _ in range(4)]
+        
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(0.1, abs=0.01)
+        assert waits[3] == pytest.approx(0.2, abs=0.01)
+        assert limiter.stats()['delayed'] == 2
+    
+    def test_rejects_non_positive_rate(self):
+        """Test a zero rate raises ValueError."""
+        with pytest.raises(ValueError):
+            RateLimiter(rate=0)
+    
+    def test_remaining_quota_slows_pace(self):
+        """Test X-RateLimit headers lower the rate to fit the window."""
+        limiter = RateLimiter(rate=100)
+        
+        limiter.update(200, {'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '5'})
+        
+        assert limiter.effective_rate == pytest.approx(2.0)
+    
+    def test_configured_rate_is_never_exceeded(self):
+        """Test generous headers do not raise the pace above the configured rate."""
+        limiter = RateLimiter(rate=5)
+        
+        limiter.update(200, {'RateLimit-Remaining': '1000', 'RateLimit-Reset': '1'})
+        
+        assert limiter.effective_rate == 5
+    
+    def test_epoch_reset(self):
+        """Test a reset given as a Unix timestamp is converted to seconds left."""
+        limiter = RateLimiter(rate=100)
+        reset = str(int(time.time()) + 10)
+        
+        limiter.update(200, {'X-RateLimit-Remaining': '20', 'X-RateLimit-Reset': reset})
+        
+        assert 1.5 <= limiter.effective_rate <= 2.5
+    
+    def test_spent_quota_pauses_until_reset(self):
+        """Test zero remaining holds callers until the window resets."""
+        limiter = RateLimiter(rate=100)
+        
+        limiter.update(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '3'})
+        
+        assert limiter.reserve() == pytest.approx(3, abs=0.05)
+    
+    def test_retry_after_pauses_callers(self):
+        """Test a 429 with Retry-After pauses every caller."""
+        limiter = RateLimiter(max_concurrency=4)
+        
+        limiter.update(429, {'Retry-After': '2'})
+        
+        assert limiter.reserve() == pytest.approx(2, abs=0.05)
+        assert limiter.stats()['throttled'] == 1
+    
+    def test_not_adaptive_ignores_headers(self):
+        """Test adaptive false keeps the configured pace."""
+        limiter = RateLimiter(rate=10, adaptive=False)
+        
+        limiter.update(429, {'Retry-After': '5', 'X-RateLimit-Remaining': '0'})
+        
+        assert limiter.reserve() == 0.0
+    
+    def test_concurrency_cap(self):
+        """Test max_concurrency bounds threads in flight."""
+        limiter = RateLimiter(max_concurrency=2)
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+        
+        def work():
+            limiter.acquire()
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+            limiter.release()
+        
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert max(peak) == 2
+
+
+class TestClientRateLimit:
+    """Test rate limits through the clients."""
+    
+    @responses.activate
+    def test_profile_requests_are_paced(self, temp_config_dir):
+        """Test requests beyond the burst wait and the wait is timed."""
+        responses.add(responses.GET, URL, status=200)
+        client = ReqNinjaClient(_config(temp_config_dir, requests_per_second=20, burst=1))
+        
+        client.get('/items', profile='partner')
+        response = client.get('/items', profile='partner')
+        
+        assert response.timings.rate_limit_wait_ms >= 40
+        assert client.rate_limit_stats()['partner']['delayed'] == 1
+    
+    @responses.activate
+    def test_clients_sharing_config_have_own_limiters(self, temp_config_dir):
+        """Test two clients on one Config do not draw from one token bucket."""
+        responses.add(responses.GET, URL, status=200)
+        config = _config(temp_config_dir, requests_per_second=20, burst=1)
+        first = ReqNinjaClient(config)
+        second = ReqNinjaClient(config)
+        
+        first.get('/items', profile='partner')
+        response = second.get('/items', profile='partner')
+        
+        assert response.timings.rate_limit_wait_ms < 40
+        assert second.rate_limit_stats()['partner']['delayed'] == 0
+        assert first.rate_limit_stats().keys() == second.rate_limit_stats().keys()
+    
+    @responses.activate
+    def test_no_rate_limit_by_default(self, temp_config_dir):
+        """Test profiles without rate_limit get no limiter."""
+        responses.add(responses.GET, URL, status=200)
+        client = ReqNinjaClient(_config(temp_config_dir))
+        
+        response = client.get('/items', profile='partner')
+        
+        assert response.timings.rate_limit_wait_ms == 0
+        assert client.rate_limit_stats() == {}
+    
+    @responses.activate
+    def test_response_headers_adapt_limiter(self, temp_config_dir):
+        """Test the client feeds response headers to the profile's limiter."""
+        responses.add(responses.GET, URL, status=200, headers={
+            'X-RateLimit-Remaining': '30', 'X-RateLimit-Reset': '60',
+        })
+        client = ReqNinjaClient(_config(temp_config_dir, requests_per_second=50))
+        
+        client.get('/items', profile='partner')
+        
+        assert client.rate_limit_stats()['partner']['effective_rate'] == pytest.approx(0.5)
+    
+    def test_async_client_respects_limit(self, temp_config_dir):
+        """Test the async client waits on the same bucket."""
+        def handler(request):
+            return httpx.Response(200)
+        
+        async def main():
+            transport = httpx.MockTransport(handler)
+            config = _config(temp_config_dir, requests_per_second=20, burst=1)
+            async with AsyncReqNinjaClient(config, transport=transport) as client:
+                started = time.perf_counter()
+                await asyncio.gather(*[client.get('/items', profile='partner') for _ in range(3)])
+                return time.perf_counter() - started
+        
+        assert asyncio.run(main()) >= 0.09
@@ -0,0 +1,218 @@
+"""Test cases for ReqNinjaResponse."""
+
+import tracemalloc
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+from click.testing import CliRunner
+from requests.structures import CaseInsensitiveDict
+
+from reqninja import ReqNinjaClient
+from reqninja import response as response_module
+from reqninja.cli import cli
+from reqninja.response import ReqNinjaResponse
+
+
+BODY_SIZE = 8 * 1024 * 1024
+LINE = b'0123456789abcdef' * 4 + b'\n'
+
+
+class LargeBodyHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler serving an 8 MiB body made of 65-byte lines."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        block = LINE * 1024
+        count = BODY_SIZE // len(block)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(block) * count))
+        self.end_headers()
+        try:
+            for _ in range(count):
+                self.wfile.write(block)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading a streamed body early
+            pass
+    
+    def log_message(self, *args):
+        pass
+
+
+class TestStreamingResponse:
+    """Test stream=True responses."""
+    
+    def test_body_left_on_socket(self, http_server, config_with_file):
+        """Test a streamed body is not read until asked for."""
+        url = http_server(LargeBodyHandler)
+        client = ReqNinjaClient(config_with_file)
+        
+        with client.get(url, stream=True) as response:
+            assert response.body_pending
+            info = response.to_dict()
+            assert info['size_bytes'] == int(response.headers['Content-Length'])
+            assert response.body_pending
+        client.close()
+    
+    def test_iter_bytes_chunk_size(self, http_server, config_with_file):
+        """Test iter_bytes yields bounded chunks covering the whole body."""
+        url = http_server(LargeBodyHandler)
+        client = ReqNinjaClient(config_with_file)
+        
+        response = client.get(url, stream=True)
+        sizes = [len(chunk) for chunk in response.iter_bytes(4096)]
+        
+        assert max(sizes) <= 4096
+        assert sum(sizes) == int(response.headers['Content-Length'])
+        assert not response.body_pending
+        client.close()
+    
+    def test_iter_lines(self, http_server, config_with_file):
+        """Test iter_lines splits the streamed body into lines."""
+        url = http_server(LargeBodyHandler)
+        client = ReqNinjaClient(config_with_file)
+        
+        response = client.get(url, stream=True)
+        lines = 0
+        for line in response.iter_lines():
+            assert line == LINE.rstrip(b'\n')
+            lines += 1
+        
+        assert lines == int(response.headers['Content-Length']) // len(LINE)
+        client.close()
+    
+    def test_save_streams_in_constant_memory(self, http_server, config_with_file, tmp_path):
+        """Test save() copies the body to disk without buffering it."""
+        url = http_server(LargeBodyHandler)
+        client = ReqNinjaClient(config_with_file)
+        target = tmp_path / 'export.bin'
+        
+        response = client.get(url, stream=True)
+        tracemalloc.start()
+        try:
+            response.save(str(target))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        size = int(response.headers['Content-Length'])
+        assert target.stat().st_size == size
+        assert peak < size // 8
+        client.close()
+    
+    def test_connection_reused_after_stream(self, http_server, config_with_file):
+        """Test a fully read stream returns its connection to the pool."""
+        url = http_server(LargeBodyHandler)
+        client = ReqNinjaClient(config_with_file)
+        
+        for _ in client.get(url, stream=True).iter_bytes():
+            pass
+        second = client.get(url)
+        
+        assert second.timings.connection_reused
+        client.close()
+    
+    def test_buffered_response_unchanged(self, http_server, config_with_file, tmp_path):
+        """Test non-streamed responses still iterate and save as before."""
+        url = http_server(LargeBodyHandler)
+        client = ReqNinjaClient(config_with_file)
+        
+        response = client.get(url)
+        assert not response.body_pending
+        assert b''.join(response.iter_bytes()) == response.content
+        
+        target = tmp_path / 'body.bin'
+        response.save(str(target), format='raw')
+        assert target.read_bytes() == response.content
+        assert response.to_dict()['size_bytes'] == len(response.content)
+        client.close()
+    
+    def test_cli_stream_save(self, http_server, config_with_file, tmp_path):
+        """Test 'reqninja http get --stream --save' writes the raw body."""
+        url = http_server(LargeBodyHandler)
+        target = tmp_path / 'out.bin'
+        
+        result = CliRunner().invoke(cli, [
+            '--config', str(config_with_file.config_path),
+            'http', 'get', url, '--stream', '--save', str(target),
+        ])
+        
+        assert result.exit_code == 0, result.output
+        assert target.stat().st_size == BODY_SIZE // len(LINE * 1024) * len(LINE * 1024)
+
+
+def _wrap(body=b'{"id": 1}', content_type='application/json'):
+    raw = requests.Response()
+    raw.status_code = 200
+    raw.reason = 'OK'
+    raw.url = 'https://api.example.com/items/1'
+    raw.headers = CaseInsensitiveDict({'Content-Type': content_type})
+    raw.encoding = 'utf-8'
+    raw._content = body
+    return ReqNinjaResponse(raw, 0.0, 0.01)
+
+
+class TestResponseObject:
+    """Test the response wrapper itself."""
+    
+    def test_compact(self):
+        """Test responses have no per-instance dict and stay small."""
+        response = _wrap()
+        
+        assert not hasattr(response, '__dict__')
+        with pytest.raises(AttributeError):
+            response.unknown_field = 1
+        
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            kept = [ReqNinjaResponse(response._response, 0.0, 0.01) for _ in range(1000)]
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert (after - before) / len(kept) < 256
+    
+    def test_common_fields(self):
+        """Test common fields read straight from the wrapped response."""
+        response = _wrap()
+        
+        assert (response.status_code, response.reason, response.ok) == (200, 'OK', True)
+        assert response.headers['content-type'] == 'application/json'
+        assert response.url == 'https://api.example.com/items/1'
+        # Anything else is still delegated
+        assert response.is_redirect is False
+    
+    def test_json_parsed_once(self):
+        """Test json() returns the same parsed object on later calls."""
+        response = _wrap()
+        
+        assert response.json() is response.json()
+        assert response.json(parse_int=str) == {'id': '1'}
+    
+    def test_invalid_json(self):
+        """Test a body that is not JSON raises ValueError."""
+        with pytest.raises(ValueError):
+            _wrap(b'<html>').json()
+    
+    def test_text_follows_encoding(self):
+        """Test text is reused until the encoding is changed."""
+        response = _wrap('caf\u00e9'.encode('utf-8'), 'text/plain')
+        
+        assert response.text == 'caf\u00e9'
+        assert response.text is response.text
+        response.encoding = 'latin-1'
+        assert response._response.encoding == 'latin-1'
+        assert response.text == 'caf\u00c3\u00a9'
+    
+    def test_console_shared(self, monkeypatch, capsys):
+        """Test printing responses creates a single rich console."""
+        monkeypatch.setattr(response_module, '_console', None)
+        
+        _wrap().pretty_print()
+        console = response_module._console
+        _wrap().pretty_print()
+        
+        assert console is not None and response_module._console is console
+        assert '"id": 1' in capsys.readouterr().out
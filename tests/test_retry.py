@@ -0,0 +1,242 @@
+"""Test cases for the retry engine: backoff, Retry-After and retry budgets."""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+import requests
+import responses
+import yaml
+
+from reqninja import AsyncReqNinjaClient, Config, ReqNinjaClient
+from reqninja.retry import RetryBudget, RetryPolicy, RetryState, parse_retry_after
+
+
+URL = 'https://api.example.com/items'
+
+
+def _config(temp_config_dir, **settings):
+    config_file = temp_config_dir / 'config.yml'
+    settings.setdefault('retry_policy', {'total': 3, 'backoff_factor': 0})
+    config_file.write_text(yaml.dump(settings))
+    return Config(config_file)
+
+
+class TestRetryPolicy:
+    """Test backoff computation."""
+    
+    def test_full_jitter_stays_below_exponential_ceiling(self):
+        """Test full jitter sleeps at most backoff_factor * 2 ** (retry - 1)."""
+        policy = RetryPolicy(backoff_factor=0.1, jitter='full')
+        for retry in range(1, 6):
+            for _ in range(50):
+                assert 0 <= policy.backoff(retry) <= 0.1 * 2 ** (retry - 1)
+    
+    def test_max_backoff_caps_every_mode(self):
+        """Test no jitter mode sleeps longer than max_backoff."""
+        for jitter in ('full', 'decorrelated', 'none'):
+            policy = RetryPolicy(backoff_factor=1, max_backoff=2, jitter=jitter)
+            assert all(policy.backoff(10, previous=50) <= 2 for _ in range(50))
+    
+    def test_decorrelated_jitter_bounds(self):
+        """Test decorrelated jitter sleeps between the base and 3x the previous sleep."""
+        policy = RetryPolicy(backoff_factor=0.5, jitter='decorrelated')
+        for _ in range(50):
+            assert 0.5 <= policy.backoff(2, previous=1.0) <= 3.0
+    
+    def test_no_jitter_is_exponential(self):
+        """Test jitter none sleeps exactly the exponential backoff."""
+        policy = RetryPolicy(backoff_factor=0.5, jitter='none')
+        assert [policy.backoff(retry) for retry in (1, 2, 3)] == [0.5, 1.0, 2.0]
+    
+    def test_unknown_jitter_rejected(self):
+        """Test an unknown jitter mode raises ValueError."""
+        with pytest.raises(ValueError):
+            RetryPolicy(jitter='random')
+    
+    def test_parse_retry_after(self):
+        """Test Retry-After is parsed from seconds and HTTP dates."""
+        assert parse_retry_after('3') == 3.0
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None
+
+
+class TestRetryState:
+    """Test retry decisions."""
+    
+    def _attempt(self, state, **outcome):
+        state.begin()
+        return state.finish(**outcome)
+    
+    def test_retry_after_overrides_backoff(self):
+        """Test Retry-After on a 429 replaces the computed backoff."""
+        state = RetryState(RetryPolicy(backoff_factor=0.1), 'GET')
+        
+        delay = self._attempt(state, status=429, headers={'Retry-After': '2'})
+        
+        assert delay == 2.0
+        assert state.attempts[0].wait_ms == 2000.0
+    
+    def test_retry_after_above_max_backoff_gives_up(self):
+        """Test a Retry-After longer than max_backoff returns the response."""
+        state = RetryState(RetryPolicy(max_backoff=5), 'GET')
+        
+        assert self._attempt(state, status=503, headers={'Retry-After': '60'}) is None
+    
+    def test_post_retried_only_on_connect_errors(self):
+        """Test non-idempotent methods retry only when nothing was sent."""
+        state = RetryState(RetryPolicy(backoff_factor=0), 'POST')
+        
+        assert self._attempt(state, status=503) is None
+        assert self._attempt(state, error=OSError('reset')) is None
+        assert self._attempt(state, error=OSError('refused'), connect_error=True) == 0.0
+    
+    def test_total_limits_attempts(self):
+        """Test at most total retries are allowed."""
+        state = RetryState(RetryPolicy(total=2, backoff_factor=0), 'GET')
+        
+        delays = [self._attempt(state, status=500) for _ in range(3)]
+        
+        assert delays == [0.0, 0.0, None]
+
+
+class TestRetryBudget:
+    """Test the per-host retry token bucket."""
+    
+    def test_budget_exhaustion_stops_retries(self):
+        """Test retries stop once the host's budget is spent."""
+        budget = RetryBudget(ratio=0, min_per_second=0, burst=1)
+        policy = RetryPolicy(total=5, backoff_factor=0)
+        
+        first = RetryState(policy, 'GET', budget)
+        first.begin()
+        second = RetryState(policy, 'GET', budget)
+        second.begin()
+        
+        assert first.finish(status=503) == 0.0
+        assert second.finish(status=503) is None
+        assert budget.exhausted == 1
+    
+    def test_requests_deposit_tokens(self):
+        """Test each request adds ratio tokens, capped at burst."""
+        budget = RetryBudget(ratio=0.5, min_per_second=0, burst=2)
+        assert budget.withdraw() and budget.withdraw()
+        assert not budget.withdraw()
+        
+        budget.deposit()
+        budget.deposit()
+        
+        assert budget.withdraw()
+    
+    @responses.activate
+    def test_client_budget_is_per_host(self, temp_config_dir):
+        """Test the client shares a budget across requests to the same host."""
+        config = _config(
+            temp_config_dir,
+            retry_budget={'ratio': 0, 'min_per_second': 0, 'burst': 1},
+        )
+        responses.add(responses.GET, URL, status=503)
+        client = ReqNinjaClient(config)
+        
+        client.get(URL)
+        client.get(URL)
+        
+        # One retry for the first request, none for the second
+        assert len(responses.calls) == 3
+        stats = client.retry_budget_stats()['api.example.com']
+        assert stats['exhausted'] == 2
+    
+    @responses.activate
+    def test_budget_follows_config_reload(self, temp_config_dir):
+        """Test editing retry_budget in the config file takes effect."""
+        config = _config(temp_config_dir, retry_budget={'enabled': False})
+        config.MTIME_CHECK_INTERVAL = 0
+        responses.add(responses.GET, URL, status=503)
+        client = ReqNinjaClient(config)
+        client.get(URL)
+        
+        config.config_path.write_text(yaml.dump({
+            'retry_policy': {'total': 3, 'backoff_factor': 0},
+            'retry_budget': {'ratio': 0, 'min_per_second': 0, 'burst': 1},
+        }))
+        stat = config.config_path.stat()
+        os.utime(config.config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        client.get(URL)
+        
+        # Four attempts unbudgeted, then one retry from a burst of one
+        assert len(responses.calls) == 4 + 2
+        assert client.retry_budget_stats()['api.example.com']['exhausted'] == 1
+    
+    @responses.activate
+    def test_budget_can_be_disabled(self, temp_config_dir):
+        """Test retry_budget.enabled false allows every configured retry."""
+        config = _config(temp_config_dir, retry_budget={'enabled': False, 'burst': 0})
+        responses.add(responses.GET, URL, status=503)
+        
+        ReqNinjaClient(config).get(URL)
+        
+        assert len(responses.calls) == 4
+
+
+class TestClientRetries:
+    """Test retries through the clients."""
+    
+    @responses.activate
+    def test_attempts_are_recorded(self, temp_config_dir):
+        """Test response.attempts lists status, latency and wait per attempt."""
+        responses.add(responses.GET, URL, status=503)
+        responses.add(responses.GET, URL, status=200)
+        client = ReqNinjaClient(_config(temp_config_dir))
+        
+        response = client.get(URL)
+        
+        assert response.status_code == 200
+        assert [attempt.status for attempt in response.attempts] == [503, 200]
+        assert [attempt.attempt for attempt in response.attempts] == [1, 2]
+        assert all(attempt.latency_ms >= 0 for attempt in response.attempts)
+        assert response.attempts[-1].wait_ms == 0
+        assert response.timings.attempts == 2
+    
+    @responses.activate
+    def test_connect_error_retried_for_post(self, temp_config_dir):
+        """Test a POST is retried when the connection could not be made."""
+        responses.add(responses.POST, URL, body=requests.exceptions.ConnectTimeout('timed out'))
+        responses.add(responses.POST, URL, status=201)
+        client = ReqNinjaClient(_config(temp_config_dir))
+        
+        response = client.post(URL, data=b'payload')
+        
+        assert response.status_code == 201
+        assert response.attempts[0].error.startswith('ConnectTimeout')
+    
+    @responses.activate
+    def test_retry_after_honoured(self, temp_config_dir, monkeypatch):
+        """Test the client sleeps for the server's Retry-After."""
+        slept = []
+        monkeypatch.setattr('reqninja.client.time.sleep', slept.append)
+        responses.add(responses.GET, URL, status=429, headers={'Retry-After': '7'})
+        responses.add(responses.GET, URL, status=200)
+        client = ReqNinjaClient(_config(temp_config_dir))
+        
+        client.get(URL)
+        
+        assert slept == [7.0]
+    
+    def test_async_attempts_are_recorded(self, temp_config_dir):
+        """Test the async client records each attempt too."""
+        statuses = iter([502, 200])
+        
+        def handler(request):
+            return httpx.Response(next(statuses))
+        
+        async def main():
+            transport = httpx.MockTransport(handler)
+            async with AsyncReqNinjaClient(_config(temp_config_dir), transport=transport) as client:
+                return await client.get(URL)
+        
+        response = asyncio.run(main())
+        
+        assert response.status_code == 200
+        assert [attempt.status for attempt in response.attempts] == [502, 200]
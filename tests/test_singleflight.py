@@ -0,0 +1,166 @@
+"""Test cases for request coalescing."""
+
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import yaml
+
+from reqninja import Config, ReqNinjaClient
+from reqninja.exceptions import ReqNinjaError
+from reqninja.singleflight import SingleFlight
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Answers after a short delay so concurrent requests overlap."""
+    
+    protocol_version = 'HTTP/1.1'
+    calls = 0
+    lock = threading.Lock()
+    
+    def _reply(self):
+        with self.lock:
+            type(self).calls += 1
+        length = int(self.headers.get('Content-Length', 0))
+        if length:
+            self.rfile.read(length)
+        time.sleep(0.2)
+        body = f'{self.path}'.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    do_GET = do_POST = _reply
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def handler():
+    return type('Handler', (SlowHandler,), {'calls': 0})
+
+
+@pytest.fixture
+def coalescing_client(temp_config_dir):
+    config_file = temp_config_dir / 'config.yml'
+    config_file.write_text(yaml.dump({
+        'single_flight': True,
+        'connection_pool': {'pool_maxsize': 20},
+    }))
+    client = ReqNinjaClient(Config(config_file))
+    yield client
+    client.close()
+
+
+def _concurrently(count, fn):
+    barrier = threading.Barrier(count)
+    
+    def call(i):
+        barrier.wait()
+        return fn(i)
+    
+    with ThreadPoolExecutor(count) as pool:
+        return list(pool.map(call, range(count)))
+
+
+class TestSingleFlight:
+    """Test SingleFlight directly."""
+    
+    def test_error_shared_with_waiters(self):
+        """Test waiters get an error of their own when the leader fails."""
+        flight = SingleFlight()
+        started = threading.Event()
+        
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ReqNinjaError("upstream down")
+        
+        def join():
+            started.wait()
+            return flight.do('key', lambda: 'unused')
+        
+        with ThreadPoolExecutor(2) as pool:
+            leader = pool.submit(flight.do, 'key', fail)
+            waiter = pool.submit(join)
+            with pytest.raises(ReqNinjaError, match="upstream down"):
+                leader.result()
+            with pytest.raises(ReqNinjaError, match="upstream down"):
+                waiter.result()
+        assert flight.stats() == {'executed': 1, 'shared': 1, 'in_flight': 0}
+    
+    def test_waiters_get_leader_exception_type(self):
+        """Test waiters raise the leader's exception type, not a generic error."""
+        flight = SingleFlight()
+        started = threading.Event()
+        
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise socket.gaierror(socket.EAI_NONAME, 'nope')
+        
+        def join():
+            started.wait()
+            return flight.do('key', lambda: 'unused')
+        
+        with ThreadPoolExecutor(2) as pool:
+            leader = pool.submit(flight.do, 'key', fail)
+            waiter = pool.submit(join)
+            with pytest.raises(socket.gaierror):
+                leader.result()
+            with pytest.raises(socket.gaierror) as raised:
+                waiter.result()
+        assert raised.value.errno == socket.EAI_NONAME
+        assert raised.value is not leader.exception()
+
+
+class TestClientSingleFlight:
+    """Test coalescing in ReqNinjaClient."""
+    
+    def test_identical_gets_share_one_call(self, http_server, coalescing_client, handler):
+        """Test concurrent identical GETs reach the server once."""
+        url = http_server(handler)
+        
+        responses = _concurrently(8, lambda i: coalescing_client.get(f"{url}/config"))
+        
+        assert handler.calls == 1
+        assert all(r.text == '/config' for r in responses)
+        assert len({id(r) for r in responses}) == 8
+        assert len({id(r.headers) for r in responses}) == 8
+        assert sum(r.coalesced for r in responses) == 7
+        assert coalescing_client.single_flight_stats()['shared'] == 7
+    
+    def test_different_requests_not_shared(self, http_server, coalescing_client, handler):
+        """Test different URLs or headers are sent separately."""
+        url = http_server(handler)
+        
+        _concurrently(4, lambda i: coalescing_client.get(f"{url}/item/{i % 2}"))
+        assert handler.calls == 2
+        
+        _concurrently(2, lambda i: coalescing_client.get(
+            f"{url}/config", headers={'X-Tenant': str(i)}
+        ))
+        assert handler.calls == 4
+    
+    def test_unsafe_methods_not_shared(self, http_server, coalescing_client, handler):
+        """Test POSTs are never coalesced."""
+        url = http_server(handler)
+        
+        _concurrently(3, lambda i: coalescing_client.post(f"{url}/submit", data=b'x'))
+        
+        assert handler.calls == 3
+    
+    def test_disabled_by_default(self, http_server, config_with_file, handler):
+        """Test coalescing is off unless configured."""
+        url = http_server(handler)
+        client = ReqNinjaClient(config_with_file)
+        
+        _concurrently(3, lambda i: client.get(f"{url}/config"))
+        
+        assert handler.calls == 3
+        client.close()
@@ -0,0 +1,165 @@
+"""Test cases for per-phase request timing."""
+
+import asyncio
+import time
+from http.server import BaseHTTPRequestHandler
+
+import httpx
+import yaml
+
+from reqninja import AsyncReqNinjaClient, Config, ReqNinjaClient
+from reqninja.timing import (
+    PhaseTimings, TimingRecorder, current_recorder, start_recording, stop_recording
+)
+
+
+class TimedHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler: /slow delays headers, /flaky fails twice."""
+    
+    protocol_version = 'HTTP/1.1'
+    flaky_calls = 0
+    
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(0.05)
+        status = 200
+        if self.path == '/flaky':
+            TimedHandler.flaky_calls += 1
+            if TimedHandler.flaky_calls < 3:
+                status = 503
+        body = b'ok'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+class TestTimingRecorder:
+    """Test the recorder and the breakdown it builds."""
+    
+    def test_finish_builds_breakdown(self):
+        """Test phases are converted to milliseconds."""
+        recorder = TimingRecorder()
+        recorder.dns_ns = 2_000_000
+        recorder.connect_ns = 3_000_000
+        recorder.send_ns = recorder.start_ns + 5_000_000
+        recorder.headers_ns = recorder.start_ns + 15_000_000
+        recorder.new_connections = 1
+        timings = recorder.finish(recorder.start_ns + 20_000_000)
+        
+        assert timings.dns_ms == 2.0
+        assert timings.connect_ms == 3.0
+        assert timings.ttfb_ms == 10.0
+        assert timings.download_ms == 5.0
+        assert timings.total_ms == 20.0
+        assert timings.attempts == 1
+        assert timings.connection_reused is False
+        assert set(timings.to_dict()) == set(PhaseTimings.__slots__)
+    
+    def test_recording_nests(self):
+        """Test stopping a recorder restores the enclosing one."""
+        outer = start_recording()
+        inner = start_recording()
+        assert current_recorder() is inner
+        stop_recording(inner)
+        assert current_recorder() is outer
+        stop_recording(outer)
+        assert current_recorder() is None
+
+
+class TestClientTimings:
+    """Test timings recorded by the sync client."""
+    
+    def test_new_then_reused_connection(self, http_server, config_with_file):
+        """Test connect phases are recorded once, then the connection is reused."""
+        url = http_server(TimedHandler)
+        client = ReqNinjaClient(config_with_file)
+        
+        first = client.get(f"{url}/").timings
+        second = client.get(f"{url}/").timings
+        
+        assert first.connection_reused is False
+        assert first.connect_ms > 0
+        assert first.dns_ms >= 0
+        assert second.connection_reused is True
+        assert second.dns_ms == 0
+        assert second.connect_ms == 0
+        assert second.tls_ms == 0
+        client.close()
+    
+    def test_ttfb_and_total(self, http_server, config_with_file):
+        """Test TTFB covers server think time and total matches elapsed_ms."""
+        url = http_server(TimedHandler)
+        client = ReqNinjaClient(config_with_file)
+        
+        response = client.get(f"{url}/slow")
+        timings = response.timings
+        
+        assert timings.ttfb_ms >= 45
+        assert timings.total_ms >= timings.ttfb_ms + timings.download_ms
+        assert response.elapsed_ms == timings.total_ms
+        assert response.to_dict()['elapsed_ms'] == timings.total_ms
+        client.close()
+    
+    def test_retry_wait(self, http_server, temp_config_dir):
+        """Test backoff between retries is reported separately."""
+        config_file = temp_config_dir / 'config.yml'
+        config_file.write_text(yaml.dump({
+            'retry_policy': {
+                'total': 3,
+                'status_forcelist': [503],
+                'backoff_factor': 0.05,
+                'jitter': 'none',
+            },
+        }))
+        TimedHandler.flaky_calls = 0
+        url = http_server(TimedHandler)
+        client = ReqNinjaClient(Config(config_file))
+        
+        response = client.get(f"{url}/flaky")
+        
+        assert response.status_code == 200
+        assert response.timings.attempts == 3
+        assert response.timings.retry_wait_ms >= 90
+        client.close()
+
+
+class TestAsyncClientTimings:
+    """Test timings recorded by the asyncio client."""
+    
+    def test_async_timings(self, http_server, config_with_file):
+        """Test httpx trace events feed the breakdown; DNS is not separable."""
+        url = http_server(TimedHandler)
+        
+        async def main():
+            async with AsyncReqNinjaClient(config_with_file) as client:
+                first = await client.get(f"{url}/slow")
+                second = await client.get(f"{url}/")
+                return first.timings, second.timings
+        
+        first, second = asyncio.run(main())
+        assert first.dns_ms is None
+        assert first.connection_reused is False
+        assert first.connect_ms > 0
+        assert first.ttfb_ms >= 45
+        assert second.connection_reused is True
+    
+    def test_async_retry_attempts(self, config_with_file):
+        """Test attempts are counted across async retries."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 2:
+                return httpx.Response(503, headers={'Retry-After': '0'})
+            return httpx.Response(200)
+        
+        async def main():
+            transport = httpx.MockTransport(handler)
+            async with AsyncReqNinjaClient(config_with_file, transport=transport) as client:
+                return await client.get("https://example.com/flaky")
+        
+        assert asyncio.run(main()).timings.attempts == 2
@@ -0,0 +1,305 @@
+"""Test cases for streaming request bodies."""
+
+import hashlib
+import json
+import mmap
+import tracemalloc
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from click.testing import CliRunner
+
+from reqninja import ReqNinjaClient
+from reqninja.cli import cli
+from reqninja.upload import MultipartEncoder, is_replayable, iter_chunks
+
+
+PAYLOAD = bytes(range(256)) * 4096 * 8
+
+
+class EchoBodyHandler(BaseHTTPRequestHandler):
+    """Reads the body (sized or chunked) and reports what arrived.
+    
+    ``fail_first`` answers the first request with 503 without reading it.
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    fail_first = False
+    calls = 0
+    
+    def _read_body(self):
+        """Yield the body in pieces without holding all of it."""
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return
+                yield self.rfile.read(size)
+                self.rfile.readline()
+        remaining = int(self.headers.get('Content-Length', 0))
+        while remaining:
+            piece = self.rfile.read(min(remaining, 65536))
+            remaining -= len(piece)
+            yield piece
+    
+    def _handle(self):
+        type(self).calls += 1
+        if self.fail_first and type(self).calls == 1:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            return
+        digest = hashlib.sha256()
+        length = 0
+        head = b''
+        for piece in self._read_body():
+            digest.update(piece)
+            length += len(piece)
+            if len(head) < 4096:
+                head += piece
+        reply = json.dumps({
+            'length': length,
+            'sha256': digest.hexdigest(),
+            'content_length': self.headers.get('Content-Length'),
+            'transfer_encoding': self.headers.get('Transfer-Encoding'),
+            'content_type': self.headers.get('Content-Type'),
+            'body': head.decode('latin-1') if length < 4096 else None,
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+    
+    do_POST = do_PUT = _handle
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def echo_handler():
+    """A fresh EchoBodyHandler subclass with its own counters."""
+    return type('Handler', (EchoBodyHandler,), {'calls': 0})
+
+
+@pytest.fixture
+def payload_file(tmp_path):
+    path = tmp_path / 'payload.bin'
+    path.write_bytes(PAYLOAD)
+    return path
+
+
+def _parse_multipart(body: bytes, content_type: str):
+    message = BytesParser(policy=HTTP).parsebytes(
+        f'Content-Type: {content_type}\r\n\r\n'.encode() + body
+    )
+    return {part.get_param('name', header='content-disposition'): part
+            for part in message.iter_parts()}
+
+
+class TestMultipartEncoder:
+    """Test the lazy multipart encoder."""
+    
+    def test_encodes_fields_and_files(self, payload_file):
+        """Test fields, paths and tuples encode into valid multipart."""
+        with MultipartEncoder([
+            ('title', 'report'),
+            ('file', payload_file),
+            ('note', ('note.txt', b'hello', 'text/plain')),
+        ]) as encoder:
+            body = encoder.read()
+            assert len(body) == len(encoder)
+            parts = _parse_multipart(body, encoder.content_type)
+        
+        assert parts['title'].get_content() == 'report'
+        assert parts['file'].get_filename() == 'payload.bin'
+        assert parts['file'].get_payload(decode=True) == PAYLOAD
+        assert parts['note'].get_content_type() == 'text/plain'
+        assert parts['note'].get_content() == 'hello'
+    
+    def test_chunked_reads_and_rewind(self, payload_file):
+        """Test small reads match a full read and seek(0) replays the body."""
+        with MultipartEncoder({'file': payload_file}) as encoder:
+            pieces = []
+            while True:
+                piece = encoder.read(1000)
+                if not piece:
+                    break
+                assert len(piece) <= 1000
+                pieces.append(piece)
+            assert encoder.tell() == len(encoder)
+            encoder.seek(0)
+            assert encoder.read() == b''.join(pieces)
+    
+    def test_unsized_file_rejected(self):
+        """Test file contents must have a known size."""
+        class Pipe:
+            def read(self, size=-1):
+                return b''
+            
+            def tell(self):
+                raise OSError("not seekable")
+        
+        with pytest.raises(ValueError):
+            MultipartEncoder({'file': ('x.bin', Pipe())})
+
+
+class TestStreamingUploads:
+    """Test streamed bodies sent by the client."""
+    
+    def test_file_object_sent_with_length(self, http_server, config_with_file,
+                                          payload_file, echo_handler):
+        """Test an open file is streamed with a Content-Length."""
+        url = http_server(echo_handler)
+        client = ReqNinjaClient(config_with_file)
+        
+        with open(payload_file, 'rb') as f:
+            result = client.post(url, data=f).json()
+        
+        assert result['content_length'] == str(len(PAYLOAD))
+        assert result['sha256'] == hashlib.sha256(PAYLOAD).hexdigest()
+        client.close()
+    
+    def test_iterator_sent_chunked(self, http_server, config_with_file,
+                                   payload_file, echo_handler):
+        """Test an iterator body is sent with chunked transfer encoding."""
+        url = http_server(echo_handler)
+        client = ReqNinjaClient(config_with_file)
+        
+        with open(payload_file, 'rb') as f:
+            result = client.post(url, data=iter_chunks(f, 4096)).json()
+        
+        assert result['transfer_encoding'] == 'chunked'
+        assert result['length'] == len(PAYLOAD)
+        client.close()
+    
+    def test_mmap_body(self, http_server, config_with_file, payload_file, echo_handler):
+        """Test a memory-mapped file can be the body."""
+        url = http_server(echo_handler)
+        client = ReqNinjaClient(config_with_file)
+        
+        with open(payload_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            result = client.put(url, data=mapped).json()
+        
+        assert result['content_length'] == str(len(PAYLOAD))
+        assert result['sha256'] == hashlib.sha256(PAYLOAD).hexdigest()
+        client.close()
+    
+    def test_multipart_streams_in_constant_memory(self, http_server, config_with_file,
+                                                  payload_file, echo_handler):
+        """Test multipart uploads do not buffer the file."""
+        url = http_server(echo_handler)
+        client = ReqNinjaClient(config_with_file)
+        
+        with MultipartEncoder({'file': payload_file}) as encoder:
+            tracemalloc.start()
+            try:
+                result = client.post(url, data=encoder).json()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        
+        assert result['content_type'] == encoder.content_type
+        assert result['content_length'] == str(len(encoder))
+        assert peak < len(PAYLOAD) // 4
+        client.close()
+    
+    def test_seekable_body_rewound_on_retry(self, http_server, config_with_file,
+                                            payload_file, echo_handler):
+        """Test a retried PUT resends a file body from the start."""
+        echo_handler.fail_first = True
+        url = http_server(echo_handler)
+        client = ReqNinjaClient(config_with_file)
+        
+        with open(payload_file, 'rb') as f:
+            response = client.put(url, data=f)
+        
+        assert echo_handler.calls == 2
+        assert response.json()['length'] == len(PAYLOAD)
+        client.close()
+    
+    def test_one_shot_body_not_retried(self, http_server, config_with_file, echo_handler):
+        """Test iterator bodies are never retried, since they cannot be replayed."""
+        echo_handler.fail_first = True
+        url = http_server(echo_handler)
+        client = ReqNinjaClient(config_with_file)
+        
+        response = client.put(url, data=iter([b'one ', b'shot']))
+        
+        assert response.status_code == 503
+        assert echo_handler.calls == 1
+        client.close()
+    
+    def test_is_replayable(self, payload_file):
+        """Test which bodies count as replayable."""
+        assert is_replayable(b'data')
+        assert is_replayable({'a': 1})
+        assert not is_replayable(iter([b'x']))
+        with open(payload_file, 'rb') as f:
+            assert is_replayable(f)
+
+
+class TestCliUploads:
+    """Test body options of the http commands."""
+    
+    def _invoke(self, config, *args, **kwargs):
+        return CliRunner().invoke(
+            cli, ['--config', str(config.config_path), 'http', *args], **kwargs
+        )
+    
+    def test_data_binary_from_file(self, http_server, config_with_file,
+                                   payload_file, echo_handler):
+        """Test --data-binary @file streams the file."""
+        url = http_server(echo_handler)
+        
+        result = self._invoke(config_with_file, 'post', url, '--raw',
+                              '--data-binary', f'@{payload_file}')
+        
+        assert result.exit_code == 0, result.output
+        reply = json.loads(result.output)
+        assert reply['content_length'] == str(len(PAYLOAD))
+        assert reply['sha256'] == hashlib.sha256(PAYLOAD).hexdigest()
+    
+    def test_piped_json_streamed(self, http_server, config_with_file, echo_handler):
+        """Test piped JSON is sent as-is with a JSON Content-Type."""
+        url = http_server(echo_handler)
+        
+        result = self._invoke(config_with_file, 'post', url, '--raw',
+                              input='  {"name": "ninja"}\n')
+        
+        assert result.exit_code == 0, result.output
+        reply = json.loads(result.output)
+        assert reply['content_type'] == 'application/json'
+        assert reply['transfer_encoding'] == 'chunked'
+        assert json.loads(reply['body']) == {'name': 'ninja'}
+    
+    def test_piped_text_keeps_content_type_unset(self, http_server, config_with_file,
+                                                 echo_handler):
+        """Test non-JSON piped input is sent without a JSON Content-Type."""
+        url = http_server(echo_handler)
+        
+        result = self._invoke(config_with_file, 'post', url, '--raw', input='plain text')
+        
+        reply = json.loads(result.output)
+        assert reply['content_type'] is None
+        assert reply['body'] == 'plain text'
+    
+    def test_form_upload(self, http_server, config_with_file, payload_file, echo_handler):
+        """Test -F fields and files are sent as streamed multipart."""
+        url = http_server(echo_handler)
+        
+        result = self._invoke(config_with_file, 'post', url, '--raw',
+                              '-F', 'title=report',
+                              '-F', f'file=@{payload_file};type=application/x-test')
+        
+        assert result.exit_code == 0, result.output
+        reply = json.loads(result.output)
+        assert reply['content_type'].startswith('multipart/form-data; boundary=')
+        assert reply['length'] > len(PAYLOAD)